@@ -12,17 +12,20 @@ import argparse
 import json
 import logging
 import os
+import signal
 import sys
+import threading
 import time
 from datetime import datetime
 
 # Local imports
 from config.database import DatabaseConfig
 from config.json_manager import json_manager
-from constants import PathConstants
+from constants import FileConstants, PathConstants
 from services.file import FileManagementService
 from services.orchestrators.database_orchestrator import DatabaseOrchestrator
 from services.orchestrators.file_orchestrator import FileOrchestrator
+from services.utilities.folder_watch_service import FolderWatchService
 from services.utilities.preload_service import PreloadService
 from ui.handlers.file_handler import FileHandler
 from ui.handlers.settings_handler import SettingsHandler
@@ -136,6 +139,10 @@ class AutoProcessCLI:
             self.file_mgmt_service,
             self.log
         )
+        
+        # Ctrl+C ครั้งแรกยกเลิกงานแบบปลอดภัย ครั้งที่สองออกทันที
+        self.cancel_requested = False
+        self.watcher = None
     
     def log(self, message):
         """Log message to console in English"""
@@ -227,8 +234,8 @@ class AutoProcessCLI:
             self.log(f"ERROR: Failed to scan files: {e}")
             return False
     
-    def process_files_automatically(self, folder_path):
-        """Process all files automatically using file handler"""
+    def process_files_automatically(self, folder_path, file_paths=None):
+        """Process all files (or only file_paths) automatically using file handler"""
         self.log("Starting automatic file processing...")
         
         # Create UI callbacks
@@ -246,7 +253,7 @@ class AutoProcessCLI:
         
         # Run automatic processing (no threading for CLI)
         try:
-            self.file_handler.run_auto_process(folder_path, ui_callbacks)
+            self.file_handler.run_auto_process(folder_path, ui_callbacks, file_paths)
             return True
         except Exception as e:
             self.log(f"ERROR: Failed to process files: {e}")
@@ -265,15 +272,94 @@ class AutoProcessCLI:
         if not self.scan_files(folder_path):
             self.log("ERROR: File scanning failed")
             return False
+        if self.cancel_requested:
+            self.log("Auto processing cancelled by user")
+            return False
         
         # Step 3: Process files automatically
         if not self.process_files_automatically(folder_path):
             self.log("ERROR: Automatic file processing failed")
             return False
+        if self.cancel_requested:
+            self.log("Auto processing cancelled by user")
+            return False
         
         self.log("SUCCESS: Auto processing completed successfully")
         return True
     
+    def run_watch(self, folder_path):
+        """
+        Watch-folder mode: process the files already in the folder, then keep running
+        and process new files as they arrive, reusing the warm database engine and settings
+        """
+        self.log(f"Starting watch mode for folder: {folder_path}")
+        
+        if not self.validate_database_connection():
+            self.log("ERROR: Database validation failed")
+            return False
+        
+        self.file_service.set_search_path(folder_path)
+        self.settings_handler.save_last_path(folder_path)
+        
+        watcher = FolderWatchService(
+            folder_path,
+            settle_seconds=float(json_manager.get('app_settings', 'watch_settle_seconds', FileConstants.WATCH_SETTLE_SECONDS)),
+            batch_seconds=float(json_manager.get('app_settings', 'watch_batch_seconds', FileConstants.WATCH_BATCH_SECONDS)),
+            poll_seconds=float(json_manager.get('app_settings', 'watch_poll_seconds', FileConstants.WATCH_POLL_SECONDS)),
+            log_callback=self.log
+        )
+        # เริ่มรับการแจ้งเตือนก่อนประมวลผลไฟล์ที่มีอยู่ ไฟล์ที่มาระหว่างนั้นจะไม่หลุด
+        watcher.start()
+        self.watcher = watcher
+        try:
+            self.process_files_automatically(folder_path)
+            # --resume ใช้กับรอบแรกเท่านั้น
+            self.file_handler.resume_run = False
+            
+            if not self.cancel_requested:
+                self.log("Waiting for new files (press Ctrl+C to stop)...")
+                watcher.run(lambda file_paths: self.process_files_automatically(folder_path, file_paths))
+            self.log("Watch mode stopped by user")
+        except KeyboardInterrupt:
+            self.log("Watch mode stopped by user")
+        finally:
+            self.watcher = None
+            watcher.stop()
+        return True
+    
+    def handle_interrupt(self, signum, frame):
+        """
+        SIGINT handler: the first Ctrl+C cancels the running work (the SQL statement on the
+        server is cancelled and staging tables are dropped), a second one exits immediately
+        """
+        if self.cancel_requested:
+            raise KeyboardInterrupt
+        self.cancel_requested = True
+        self.log("🛑 Cancelling... (press Ctrl+C again to exit immediately)")
+        self.file_handler.cancel_scan()
+        self.file_handler.cancel_operation()
+        if self.watcher is not None:
+            self.watcher.stop()
+
+
+def run_interruptible(func, *args):
+    """
+    Run func in a worker thread while the main thread waits for signals
+    
+    Python runs signal handlers only in the main thread, and only between bytecodes;
+    a main thread blocked in a long ODBC call would not see Ctrl+C until the statement ends.
+    """
+    result = {}
+    
+    def _target():
+        result['value'] = func(*args)
+    
+    worker = threading.Thread(target=_target, name="auto-process", daemon=True)
+    worker.start()
+    while worker.is_alive():
+        worker.join(0.5)
+    return result.get('value', False)
+    
 
 def main():
     """Main function"""
@@ -284,11 +370,21 @@ def main():
 Examples:
   python auto_process_cli.py C:\\path\\to\\data\\folder
   python auto_process_cli.py "C:\\Documents\\Excel Files"
+  python auto_process_cli.py C:\\path\\to\\data\\folder --reprocess
+  python auto_process_cli.py C:\\path\\to\\data\\folder --resume
+  python auto_process_cli.py C:\\path\\to\\data\\folder --watch
   
 Notes:
   - Database connection and file type settings must be configured in GUI first
   - CLI uses the same settings and services as the GUI application
   - Processes all files automatically without user interaction
+  - Files whose content was already loaded (ingest manifest) are skipped unless --reprocess is given
+  - After a crash or killed run, --resume continues each file from its last durable phase
+    (staged, validated or transferred) instead of loading it again
+  - --watch keeps running and loads new files within seconds of arrival (uses watchdog
+    file notifications when installed, otherwise polls the folder)
+  - Ctrl+C cancels safely: the running SQL statement is cancelled on the server and the
+    staging tables of the interrupted load are dropped; press Ctrl+C again to exit immediately
         """
     )
     
@@ -304,6 +400,24 @@ Notes:
         version='Auto Process CLI v3.0 (Standalone)'
     )
     
+    parser.add_argument(
+        '--reprocess',
+        action='store_true',
+        help='Load files again even if the ingest manifest shows their content was already loaded'
+    )
+    
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Continue the interrupted run of this folder from the run journal (config/run_journal.db)'
+    )
+    
+    parser.add_argument(
+        '--watch',
+        action='store_true',
+        help='Keep running and process new files as they arrive in the folder (Ctrl+C to stop)'
+    )
+    
     parser.add_argument(
         '-v', '--verbose',
         action='store_true',
@@ -331,6 +445,8 @@ Notes:
     
     # Create CLI instance
     cli = AutoProcessCLI()
+    cli.file_handler.reprocess_loaded = args.reprocess
+    cli.file_handler.resume_run = args.resume
     
     # Determine source folder
     folder_path = args.folder_path
@@ -352,7 +468,15 @@ Notes:
         sys.exit(1)
     
     # Start processing
-    success = cli.run_auto_process(folder_path)
+    signal.signal(signal.SIGINT, cli.handle_interrupt)
+    try:
+        if args.watch:
+            success = run_interruptible(cli.run_watch, folder_path)
+        else:
+            success = run_interruptible(cli.run_auto_process, folder_path)
+    except KeyboardInterrupt:
+        cli.log("Stopped by user")
+        sys.exit(130)
     
     # Exit with appropriate status
     sys.exit(0 if success else 1)
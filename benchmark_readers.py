@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Excel Reader Benchmark - Compare rows/sec of the Excel reader backends
+Reads each workbook with every available backend through PerformanceOptimizer.iter_file_chunks,
+the same streaming path used by auto process
+
+Usage: python benchmark_readers.py workbook.xlsx [workbook.xls ...] [--repeat N]
+"""
+
+# Standard library imports
+import argparse
+import os
+import sys
+import time
+
+# Local imports
+from constants import FileConstants
+from performance_optimizations import PerformanceOptimizer, format_file_size, is_calamine_available
+
+
+def benchmark_file(file_path, backend, repeat=1, verbose=False):
+    """
+    Read a workbook with one backend and return the best run
+
+    Args:
+        file_path: Workbook path
+        backend: Excel reader backend ('calamine' or 'openpyxl')
+        repeat: Number of runs (the fastest one is reported)
+        verbose: Print reader log messages
+
+    Returns:
+        tuple: (rows, seconds)
+    """
+    file_type = 'excel_xls' if file_path.lower().endswith('.xls') else 'excel'
+    best = None
+    for _ in range(max(repeat, 1)):
+        optimizer = PerformanceOptimizer(print if verbose else (lambda msg: None))
+        optimizer.set_excel_reader(backend)
+
+        rows = 0
+        start_time = time.perf_counter()
+        for chunk in optimizer.iter_file_chunks(file_path, file_type):
+            rows += len(chunk)
+        seconds = time.perf_counter() - start_time
+
+        if best is None or seconds < best[1]:
+            best = (rows, seconds)
+    return best
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Compare Excel reader backends (rows/sec)')
+    parser.add_argument('files', nargs='+', help='Workbooks to read (.xlsx or .xls)')
+    parser.add_argument('--repeat', type=int, default=1, help='Runs per backend, fastest is reported (default 1)')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Show reader log messages')
+    args = parser.parse_args()
+
+    backends = [FileConstants.EXCEL_READER_OPENPYXL]
+    if is_calamine_available():
+        backends.insert(0, FileConstants.EXCEL_READER_CALAMINE)
+    else:
+        print("⚠️ python-calamine is not installed - only openpyxl/xlrd will be measured")
+
+    for file_path in args.files:
+        if not os.path.isfile(file_path):
+            print(f"❌ File not found: {file_path}")
+            continue
+
+        print(f"\n📂 {os.path.basename(file_path)} ({format_file_size(os.path.getsize(file_path))})")
+        results = {}
+        for backend in backends:
+            try:
+                rows, seconds = benchmark_file(file_path, backend, args.repeat, args.verbose)
+            except Exception as e:
+                print(f"   {backend:<10} ❌ {e}")
+                continue
+            results[backend] = seconds
+            rate = rows / seconds if seconds > 0 else 0.0
+            print(f"   {backend:<10} {rows:>12,} rows  {seconds:>8.2f}s  {rate:>12,.0f} rows/sec")
+
+        if len(results) == len(backends) > 1:
+            baseline = results[FileConstants.EXCEL_READER_OPENPYXL]
+            fastest = results[FileConstants.EXCEL_READER_CALAMINE]
+            if fastest > 0:
+                print(f"   ⚡ calamine speedup: {baseline / fastest:.1f}x")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -114,12 +114,17 @@ class DatabaseConfig:
                 f'charset=utf8&autocommit=true'
             )
         
+        # ขนาด pool ตั้งชัดเจน จำนวน upload job พร้อมกันถูกจำกัดตาม pool + overflow
+        pool_args = {
+            'pool_size': DatabaseConstants.ENGINE_POOL_SIZE,
+            'max_overflow': DatabaseConstants.ENGINE_MAX_OVERFLOW,
+        }
         # เปิด fast_executemany เพื่อเร่งการอัปโหลด Unicode ผ่าน pyodbc
         try:
-            self.engine = create_engine(connection_string, fast_executemany=True)
+            self.engine = create_engine(connection_string, fast_executemany=True, **pool_args)
         except TypeError:
             # เผื่อกรณี SQLAlchemy รุ่นเก่า ไม่รองรับ keyword นี้
-            self.engine = create_engine(connection_string)
+            self.engine = create_engine(connection_string, **pool_args)
     
     def get_engine(self) -> Optional[Engine]:
         """
@@ -40,6 +40,39 @@ class DatabaseConstants:
         "BIT"
     ]
 
+    # Staging loader backends (see services/database/staging_loader.py)
+    STAGING_LOADER_AUTO = "auto"
+    STAGING_LOADER_PYODBC_BULK = "pyodbc_bulk"
+    STAGING_LOADER_TO_SQL = "to_sql"
+    STAGING_CHUNK_SIZE = 5000  # rows per to_sql call
+    STAGING_BULK_CHUNK_SIZE = 20000  # rows per executemany batch
+    STAGING_ROW_ID_COLUMN = "__row_id"  # ordinal of the source row, keeps file order in staging
+    SOURCE_FILE_COLUMN = "__source_file"  # staging-only: file each row came from (batched auto process)
+    
+    # Parallel staging upload (staging_upload_workers > 1)
+    STAGING_PARALLEL_HEAP = "heap"  # all workers insert into the same staging table
+    STAGING_PARALLEL_PARTITIONED = "partitioned"  # one staging table per worker, unioned afterwards
+    STAGING_MAX_WORKERS = 8  # one connection each, see ENGINE_POOL_SIZE
+    
+    # Staging -> final transfer
+    TRANSFER_BATCH_SIZE = 0  # rows per committed batch, opt-in (0 = single atomic INSERT ... SELECT)
+    TRANSFER_PROGRESS_TABLE = "__pipeline_transfer_progress"  # per-schema control table for resume
+    SHADOW_CONSTRAINT_SUFFIX = "__shadow"  # constraint names copied to the shadow table until the swap
+    
+    # Incremental upsert (dtype_settings: "_upload_mode": "upsert", "_key_columns": [...])
+    UPLOAD_MODE_REPLACE = "replace"
+    UPLOAD_MODE_UPSERT = "upsert"
+    ROW_HASH_COLUMN = "__row_hash"  # VARBINARY(32) SHA2_256 of the non-key columns' converted values
+    
+    # Concurrent upload of different logic types (upload_type_workers in app settings)
+    UPLOAD_TYPE_WORKERS = 4  # jobs at once; each job holds its target table's lock while loading
+    UPLOAD_TYPE_MAX_WORKERS = 8  # also capped so that jobs x connections per job fit the engine pool
+    
+    # SQLAlchemy engine pool (set explicitly, upload type jobs are capped against pool + overflow)
+    ENGINE_POOL_SIZE = 5
+    ENGINE_MAX_OVERFLOW = 15
+    VALIDATION_MAX_WORKERS = 3  # columns validated at once, one connection each
+
 
 # === FILE PROCESSING CONSTANTS ===
 class FileConstants:
@@ -59,6 +92,68 @@ class FileConstants:
     # Default upload folder structure
     UPLOADED_FOLDER_NAME = "Uploaded_Files"
     
+    # Excel reader backends (excel_reader in app settings)
+    EXCEL_READER_AUTO = "auto"  # calamine when python-calamine is installed, otherwise openpyxl/xlrd
+    EXCEL_READER_CALAMINE = "calamine"
+    EXCEL_READER_OPENPYXL = "openpyxl"  # openpyxl for .xlsx, xlrd for .xls
+    
+    # CSV reader backends (csv_reader in app settings)
+    CSV_READER_AUTO = "auto"  # arrow when pyarrow is installed, otherwise pandas
+    CSV_READER_ARROW = "arrow"  # pyarrow.csv streaming reader with an all-string schema
+    CSV_READER_PANDAS = "pandas"
+    ARROW_CSV_BLOCK_SIZE = 16 * 1024 * 1024  # bytes per parsed block
+    
+    # CSV encoding detection and row counting (utils/csv_utils.py)
+    CSV_ENCODINGS = ['utf-8', 'cp874']  # tried in order on a sample, latin1 is the final fallback
+    CSV_ENCODING_SAMPLE_SIZE = 1024 * 1024  # bytes decoded to detect the encoding
+    CSV_EXACT_COUNT_LIMIT = 512 * 1024 * 1024  # larger files get an estimated row count
+    CSV_COUNT_BLOCK_SIZE = 8 * 1024 * 1024  # bytes scanned per mmap slice
+    
+    # File fingerprint cache (services/file/file_fingerprint_cache.py)
+    FINGERPRINT_CACHE_SIZE = 512  # files kept per session
+    FINGERPRINT_PEEK_ROWS = 6  # header row + 5 preview rows
+    
+    # Parallel logic type detection in folder scans (scan_workers in app settings)
+    SCAN_WORKERS_DEFAULT = 0  # 0 = CPU count, 1 = detect in the scanning thread
+    PARALLEL_SCAN_MIN_FILES = 8  # fewer files are not worth starting worker processes
+    
+    # Content hashing (utils/helpers.compute_file_hash)
+    HASH_BLOCK_SIZE = 4 * 1024 * 1024  # bytes read per block
+    
+    # Row estimate of .xlsx files (utils/helpers.estimate_xlsx_rows)
+    XLSX_DIMENSION_PEEK_BYTES = 4096  # <dimension> is near the start of the sheet XML
+    
+    # Parse cache of Excel sources (parse_cache in app settings, services/file/parse_cache.py)
+    PARSE_CACHE_MAX_MB = 4096  # least recently used entries are evicted above this size
+    PARSE_CACHE_FORMAT_VERSION = 1  # bump when the cached representation changes
+    
+    # Already loaded files in auto process (ingest_manifest in app settings)
+    MANIFEST_SKIP = "skip"  # skip files whose content was loaded before
+    MANIFEST_FLAG = "flag"  # log a warning and load them again
+    MANIFEST_OFF = "off"
+    
+    # Phases of a file in the run journal (auto_process_cli.py --resume), in order
+    PHASE_PENDING = "pending"  # found in the source folder
+    PHASE_CHECKED = "checked"  # type detected and columns checked (preview only)
+    PHASE_PARSED = "parsed"  # every chunk of the file was read and handed to staging
+    PHASE_STAGED = "staged"  # every row is in the staging table
+    PHASE_VALIDATED = "validated"  # staging data passed validation, transfer started
+    PHASE_TRANSFERRED = "transferred"  # committed to the final table
+    PHASE_MOVED = "moved"  # moved to the uploaded folder (done)
+    PHASE_FAILED = "failed"
+    
+    # Watch-folder mode (auto_process_cli.py --watch, services/utilities/folder_watch_service.py)
+    WATCH_SETTLE_SECONDS = 2.0  # size/mtime unchanged this long = file copy finished
+    WATCH_BATCH_SECONDS = 5.0  # wait for more arrivals after the first ready file
+    WATCH_POLL_SECONDS = 2.0  # folder scan interval without watchdog
+    
+    # Auto process job order (job_schedule / job_priority in app settings)
+    SCHEDULE_SJF = "sjf"  # shortest estimated load time first
+    SCHEDULE_FIFO = "fifo"  # order the files were found in
+    SCHEDULE_PRIORITY = "priority"  # logic types listed in job_priority first, then shortest first
+    SCHEDULER_DEFAULT_MB_PER_SEC = 5.0  # assumed throughput of a logic type without load history
+    SCHEDULER_HISTORY_LOADS = 20  # recent loads averaged per logic type
+    
     # Date format options
     DATE_FORMAT_UK = "UK"  # day first
     DATE_FORMAT_US = "US"  # month first
@@ -103,6 +198,18 @@ class PathConstants:
     # Default search path
     DEFAULT_SEARCH_PATH = os.path.join(os.path.expanduser("~"), "Downloads")
     
+    # Parsed Excel sources cached as Parquet (parse_cache_dir in app settings)
+    PARSE_CACHE_DIR = os.path.join("cache", "parsed")
+    
+    # Ingest manifest of loaded files (services/utilities/ingest_manifest_service.py)
+    INGEST_MANIFEST_FILE = os.path.join(CONFIG_DIR, "ingest_manifest.db")
+    
+    # Checkpoint journal of auto process runs (services/utilities/run_journal_service.py)
+    RUN_JOURNAL_FILE = os.path.join(CONFIG_DIR, "run_journal.db")
+    
+    # Load times per logic type for the auto process job scheduler
+    LOAD_HISTORY_FILE = os.path.join(CONFIG_DIR, "load_history.db")
+    
 
 # === ERROR MESSAGES ===
 class ErrorMessages:
@@ -2,23 +2,41 @@
 Performance optimization utilities for PIPELINE_SQLSERVER.
 
 Provides optimized file processing capabilities:
-1. Chunked file reading for large datasets
-2. Parallel processing support
+1. Chunked file reading for large datasets (including streaming chunk iterators)
+2. Parallel processing support (including an overlapped parse/upload pipeline)
 3. Enhanced memory management
 4. Detailed progress tracking
 5. Cancellation support
 """
 
 import gc
+import importlib.util
 import logging
 import os
+import queue
 import threading
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Any, Callable, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 import pandas as pd
 
+from constants import FileConstants
+from utils.csv_utils import (
+    arrow_batch_to_frame,
+    count_csv_rows,
+    confirm_csv_encoding,
+    detect_csv_encoding,
+    is_pyarrow_available,
+    iter_arrow_csv_batches,
+)
+from utils.helpers import compute_file_hash, to_staging_text
+
+
+def is_calamine_available() -> bool:
+    """Check whether the Rust-based python-calamine reader is installed."""
+    return importlib.util.find_spec("python_calamine") is not None
+
 
 class PerformanceOptimizer:
     """Handles performance optimization for file processing operations."""
@@ -34,11 +52,37 @@ class PerformanceOptimizer:
         self.cancellation_token = threading.Event()
         self.chunk_size = 50000  # Default optimized chunk size for large files
         self.max_workers = min(4, os.cpu_count() or 1)  # Number of worker threads
+        self.excel_reader = FileConstants.EXCEL_READER_AUTO  # Excel reader backend
+        self.csv_reader = FileConstants.CSV_READER_AUTO  # CSV reader backend
+        self.raw_ingest = False  # Emit staging text as string columns, no inference/optimization
+        self.raw_stats = {'rows': 0, 'string_bytes': 0, 'object_bytes': 0}
+        self.fingerprint_cache = None  # Optional FileFingerprintCache shared with detect/preview
+        self.parse_cache = None  # Optional ParseCache of parsed Excel sources
         
     def set_cancellation_token(self, token: threading.Event) -> None:
         """Set cancellation token for operation cancellation."""
         self.cancellation_token = token
         
+    def set_excel_reader(self, reader: str) -> None:
+        """Select Excel reader backend ('auto', 'calamine' or 'openpyxl')."""
+        self.excel_reader = reader or FileConstants.EXCEL_READER_AUTO
+        
+    def set_csv_reader(self, reader: str) -> None:
+        """Select CSV reader backend ('auto', 'arrow' or 'pandas')."""
+        self.csv_reader = reader or FileConstants.CSV_READER_AUTO
+        
+    def set_fingerprint_cache(self, cache) -> None:
+        """Reuse encoding and row count already found while detecting/previewing files."""
+        self.fingerprint_cache = cache
+        
+    def set_parse_cache(self, cache) -> None:
+        """Cache parsed Excel sources on disk (None disables the cache)."""
+        self.parse_cache = cache
+        
+    def set_raw_ingest(self, enabled: bool) -> None:
+        """Enable raw ingest: readers emit string columns without dtype inference."""
+        self.raw_ingest = bool(enabled)
+        
     def get_optimal_chunk_size(self, file_size_mb: float) -> int:
         """Calculate optimal chunk size based on file size and available memory."""
         if file_size_mb < 50:
@@ -75,11 +119,17 @@ class PerformanceOptimizer:
                 self.chunk_size = optimal_chunk_size
                 self.log_callback(f"🔧 Optimized chunk size for this file: {self.chunk_size:,} rows")
             
+            self._reset_raw_stats()
+            start_time = time.perf_counter()
             if file_size_mb > 50:  # Lower threshold for chunked reading
                 self.log_callback(f"⚠️ Large File, Use Chunked Reading")
-                return self._read_large_file_chunked(file_path, file_type)
+                result = self._read_large_file_chunked(file_path, file_type)
             else:
-                return self._read_small_file(file_path, file_type)
+                result = self._read_small_file(file_path, file_type)
+            
+            if self.raw_ingest and result[0]:
+                self.log_callback(self.describe_raw_ingest(time.perf_counter() - start_time))
+            return result
                 
         except Exception as e:
             error_msg = f"❌ Error Reading File: {e}"
@@ -89,8 +139,14 @@ class PerformanceOptimizer:
     def _read_small_file(self, file_path: str, file_type: str) -> Tuple[bool, pd.DataFrame]:
         """Read small files using standard approach."""
         try:
-            if file_type == 'csv':
-                df = pd.read_csv(file_path, header=0, encoding='utf-8')
+            if file_type == 'csv' and (self.raw_ingest or self._use_arrow_csv()):
+                chunks = list(self._iter_csv(file_path, self._detect_encoding(file_path)))
+                df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+            elif file_type == 'csv':
+                df = pd.read_csv(file_path, header=0, encoding=self._detect_encoding(file_path))
+            elif self.raw_ingest or self.parse_cache is not None or self._use_calamine():
+                chunks = list(self._iter_excel_chunks(file_path, file_type))
+                df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
             elif file_type == 'excel_xls':
                 df = pd.read_excel(file_path, header=0, sheet_name=0, engine='xlrd')
             else:
@@ -111,16 +167,13 @@ class PerformanceOptimizer:
             
             if file_type == 'csv':
                 total_rows, encoding_used = self._get_csv_info(file_path)
-                self.log_callback(f"📊 Total Rows: {total_rows:,} (encoding={encoding_used})")
+                self.log_callback(f"📊 Total Rows: {self._format_row_count(file_path, total_rows)} (encoding={encoding_used})")
                 
                 # Read in chunks with proper encoding
                 chunks = self._read_csv_chunks(file_path, encoding_used)
                         
-            elif file_type == 'excel_xls':
-                chunks = self._read_xls_chunks(file_path)
-                        
-            else:  # Excel .xlsx file
-                chunks = self._read_xlsx_chunks(file_path)
+            else:  # Excel (.xlsx / .xls)
+                chunks = list(self._iter_excel_chunks(file_path, file_type))
             
             # Combine chunks with memory optimization
             if chunks:
@@ -167,144 +220,510 @@ class PerformanceOptimizer:
     
     def _get_csv_info(self, file_path: str) -> Tuple[int, str]:
         """Get CSV file information including encoding and row count."""
-        # Try UTF-8 first, then fallback to cp874/latin1 for legacy files
-        for encoding in ['utf-8', 'cp874', 'latin1']:
-            try:
-                total_rows = sum(1 for _ in open(file_path, 'r', encoding=encoding)) - 1
-                return total_rows, encoding
-            except UnicodeDecodeError:
-                continue
-        return 0, 'utf-8'  # Default fallback
+        # encoding จาก BOM/sample และนับแถวด้วย mmap (ไฟล์ใหญ่มากใช้ค่าประมาณ) ไม่ต้องอ่านทั้งไฟล์ซ้ำ
+        encoding = self._detect_encoding(file_path)
+        if self.fingerprint_cache is not None:
+            total_rows, _ = self.fingerprint_cache.get_row_count(file_path)
+        else:
+            total_rows, _ = count_csv_rows(file_path)
+        return total_rows, encoding
+    
+    def _detect_encoding(self, file_path: str) -> str:
+        """
+        CSV encoding from the fingerprint cache, or detected from the file.
+        
+        The sample-based guess is checked against the whole file first: chunks are
+        streamed into staging, so the encoding cannot change after the first chunk.
+        """
+        if self.fingerprint_cache is not None:
+            return self.fingerprint_cache.get_confirmed_encoding(file_path)
+        return confirm_csv_encoding(file_path, detect_csv_encoding(file_path))
+    
+    @staticmethod
+    def _format_row_count(file_path: str, total_rows: int) -> str:
+        """Row count text, marked '~' when count_csv_rows had to estimate."""
+        prefix = "~" if os.path.getsize(file_path) > FileConstants.CSV_EXACT_COUNT_LIMIT else ""
+        return f"{prefix}{total_rows:,}"
     
     def _read_csv_chunks(self, file_path: str, encoding: str) -> List[pd.DataFrame]:
         """Read CSV file in chunks with optimized performance."""
-        chunks = []
+        return list(self._iter_csv(file_path, encoding))
+    
+    def _use_arrow_csv(self) -> bool:
+        """Whether CSV files should be read with the pyarrow streaming reader."""
+        if self.csv_reader == FileConstants.CSV_READER_PANDAS:
+            return False
+        if is_pyarrow_available():
+            return True
+        if self.csv_reader == FileConstants.CSV_READER_ARROW:
+            self.log_callback("⚠️ pyarrow is not installed - using pandas CSV reader")
+        return False
+    
+    def _iter_csv(self, file_path: str, encoding: str) -> Iterator[pd.DataFrame]:
+        """Yield CSV chunks with the selected backend."""
+        if self._use_arrow_csv():
+            chunks = self._iter_arrow_csv_chunks(file_path, encoding)
+        else:
+            chunks = self._iter_csv_chunks(file_path, encoding)
+        return self._iter_raw_chunks(chunks) if self.raw_ingest else chunks
+    
+    def _iter_arrow_csv_chunks(self, file_path: str, encoding: str) -> Iterator[pd.DataFrame]:
+        """
+        Yield CSV chunks parsed by pyarrow with every column as string.
+        
+        No type inference and no object-dtype columns: the chunks hold Arrow-backed
+        string columns that go straight to the staging loader.
+        """
+        self.log_callback("⚡ Using Arrow CSV reader (multithreaded, all columns as string)")
         
+        total_processed = 0
+        for i, batch in enumerate(iter_arrow_csv_batches(file_path, encoding)):
+            if self.cancellation_token.is_set():
+                self.log_callback("❌ Work Cancelled")
+                return
+            
+            chunk = arrow_batch_to_frame(batch)
+            total_processed += len(chunk)
+            self.log_callback(f"📖 Chunk {i+1}: {len(chunk):,} rows (Total: {total_processed:,})")
+            yield chunk
+    
+    def _iter_csv_chunks(self, file_path: str, encoding: str) -> Iterator[pd.DataFrame]:
+        """Yield CSV chunks one at a time without keeping earlier chunks in memory."""
         import warnings
         with warnings.catch_warnings():
             warnings.filterwarnings("ignore", category=pd.errors.DtypeWarning)
             # Use optimized chunk size and memory settings
+            # raw ingest: อ่านทุกคอลัมน์เป็น string ไม่ต้องเดาชนิดข้อมูล
             chunk_reader = pd.read_csv(file_path, header=0, encoding=encoding, 
                                      chunksize=self.chunk_size, low_memory=False,
+                                     dtype=self._raw_string_dtype() if self.raw_ingest else None,
                                      engine='c')  # Use C engine for better performance
         
         self.log_callback("💡 Using optimized CSV reader with C engine")
         
         total_processed = 0
-        for i, chunk in enumerate(chunk_reader):
-            if self.cancellation_token.is_set():
-                self.log_callback("❌ Work Cancelled")
-                break
-            
-            chunks.append(chunk)
-            total_processed += len(chunk)
-            
-            # Enhanced progress feedback
-            self.log_callback(f"📖 Chunk {i+1}: {len(chunk):,} rows (Total: {total_processed:,})")
-            
-            # Aggressive memory cleanup for large files
-            if (i + 1) % 5 == 0:
-                gc.collect()
-                self.log_callback(f"🧹 Memory cleanup after {i+1} chunks")
-        
-        return chunks
+        with chunk_reader:
+            for i, chunk in enumerate(chunk_reader):
+                if self.cancellation_token.is_set():
+                    self.log_callback("❌ Work Cancelled")
+                    break
+                
+                total_processed += len(chunk)
+                
+                # Enhanced progress feedback
+                self.log_callback(f"📖 Chunk {i+1}: {len(chunk):,} rows (Total: {total_processed:,})")
+                yield chunk
+                
+                # Aggressive memory cleanup for large files
+                if (i + 1) % 5 == 0:
+                    gc.collect()
+                    self.log_callback(f"🧹 Memory cleanup after {i+1} chunks")
     
     def _read_xls_chunks(self, file_path: str) -> List[pd.DataFrame]:
         """Read XLS file in chunks."""
+        return list(self._iter_xls_chunks(file_path))
+    
+    def _iter_xls_chunks(self, file_path: str) -> Iterator[pd.DataFrame]:
+        """Yield XLS chunks one at a time."""
         import xlrd
         
-        chunks = []
-        workbook = xlrd.open_workbook(file_path)
-        worksheet = workbook.sheet_by_index(0)
-        
-        # Read headers
-        headers = [worksheet.cell_value(0, col_idx) for col_idx in range(worksheet.ncols)]
-        
-        # Read data in chunks
-        chunk_data = []
-        for row_idx in range(1, worksheet.nrows):
-            if self.cancellation_token.is_set():
-                self.log_callback("❌ Work Cancelled")
-                break
+        workbook = xlrd.open_workbook(file_path, on_demand=True)
+        try:
+            worksheet = workbook.sheet_by_index(0)
+            if worksheet.nrows == 0:
+                return
             
-            row_data = [worksheet.cell_value(row_idx, col_idx) for col_idx in range(worksheet.ncols)]
-            chunk_data.append(row_data)
+            # Read headers (ตั้งชื่อแบบเดียวกับ pd.read_excel header=0)
+            headers = self._pandas_header_names(
+                self._xls_row_values(worksheet, 0, workbook.datemode)
+            )
             
-            # Create chunk every chunk_size rows
-            if len(chunk_data) >= self.chunk_size:
-                chunk_df = pd.DataFrame(chunk_data, columns=headers)
-                chunks.append(chunk_df)
-                chunk_data = []
+            # Read data in chunks
+            chunk_data = []
+            chunk_count = 0
+            for row_idx in range(1, worksheet.nrows):
+                if self.cancellation_token.is_set():
+                    self.log_callback("❌ Work Cancelled")
+                    return
                 
-                self.log_callback(f"📖 Read Chunk {len(chunks)}: {len(chunk_df):,} rows")
-                gc.collect()
+                chunk_data.append(self._xls_row_values(worksheet, row_idx, workbook.datemode))
+                
+                # Create chunk every chunk_size rows
+                if len(chunk_data) >= self.chunk_size:
+                    chunk_df = self._rows_to_frame(chunk_data, headers)
+                    chunk_data = []
+                    chunk_count += 1
+                    
+                    self.log_callback(f"📖 Read Chunk {chunk_count}: {len(chunk_df):,} rows")
+                    yield chunk_df
+                    del chunk_df
+                    gc.collect()
+            
+            # Add remaining data
+            if chunk_data:
+                yield self._rows_to_frame(chunk_data, headers)
+        finally:
+            workbook.release_resources()
+    
+    @staticmethod
+    def _xls_row_values(worksheet, row_idx: int, datemode: int) -> list:
+        """
+        Cell values of one .xls row converted the way pandas' xlrd reader does
         
-        # Add remaining data
-        if chunk_data:
-            chunk_df = pd.DataFrame(chunk_data, columns=headers)
-            chunks.append(chunk_df)
+        Dates become datetime (time-only cells become time), booleans become bool,
+        whole numbers become int, and empty/error cells become None.
+        """
+        import xlrd
+        from datetime import time as dt_time
         
-        return chunks
+        values = []
+        for value, cell_type in zip(worksheet.row_values(row_idx), worksheet.row_types(row_idx)):
+            if cell_type in (xlrd.XL_CELL_EMPTY, xlrd.XL_CELL_BLANK, xlrd.XL_CELL_ERROR):
+                value = None
+            elif cell_type == xlrd.XL_CELL_DATE:
+                try:
+                    date_tuple = xlrd.xldate_as_tuple(value, datemode)
+                    if date_tuple[:3] == (0, 0, 0):
+                        value = dt_time(*date_tuple[3:])
+                    else:
+                        value = xlrd.xldate_as_datetime(value, datemode)
+                except (xlrd.xldate.XLDateError, ValueError):
+                    pass
+            elif cell_type == xlrd.XL_CELL_BOOLEAN:
+                value = bool(value)
+            elif cell_type == xlrd.XL_CELL_NUMBER and float(value).is_integer():
+                value = int(value)
+            values.append(value)
+        return values
+    
+    @staticmethod
+    def _pandas_header_names(values: List[Any]) -> List[Any]:
+        """Column names as pandas builds them with header=0 (blank → 'Unnamed: n', duplicates → 'name.1')."""
+        headers = []
+        seen = {}
+        for idx, value in enumerate(values):
+            if value is None or value == '':
+                value = f"Unnamed: {idx}"
+            if value in seen:
+                seen[value] += 1
+                value = f"{value}.{seen[value]}"
+            else:
+                seen[value] = 0
+            headers.append(value)
+        return headers
     
     def _read_xlsx_chunks(self, file_path: str) -> List[pd.DataFrame]:
         """Read XLSX file in chunks with optimized performance."""
+        return list(self._iter_xlsx_chunks(file_path))
+    
+    def _iter_xlsx_chunks(self, file_path: str) -> Iterator[pd.DataFrame]:
+        """Yield XLSX chunks one at a time using openpyxl read-only mode."""
         import openpyxl
         
-        chunks = []
         self.log_callback("🔄 Opening Excel file with read-only mode...")
         
         # Use read-only mode with data_only for better performance
         workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
-        worksheet = workbook.active
+        try:
+            worksheet = workbook.active
+            
+            # Get total rows for progress tracking
+            total_rows = max((worksheet.max_row or 1) - 1, 0)  # Exclude header
+            self.log_callback(f"📊 Total rows to process: {total_rows:,}")
+            
+            # Read headers using optimized method
+            headers = [cell.value for cell in next(worksheet.iter_rows(min_row=1, max_row=1))]
+            
+            # Read data in larger chunks with batch processing
+            chunk_data = []
+            processed_rows = 0
+            chunk_count = 0
+            
+            # Use iter_rows for better performance instead of cell-by-cell access
+            for row in worksheet.iter_rows(min_row=2, values_only=True):
+                if self.cancellation_token.is_set():
+                    self.log_callback("❌ Work Cancelled")
+                    return
+                
+                chunk_data.append(list(row))
+                processed_rows += 1
+                
+                # Progress feedback every 10,000 rows
+                if processed_rows % 10000 == 0 and total_rows:
+                    progress = (processed_rows / total_rows) * 100
+                    self.log_callback(f"📖 Processing: {processed_rows:,}/{total_rows:,} rows ({progress:.1f}%)")
+                
+                # Create chunk when reaching chunk_size
+                if len(chunk_data) >= self.chunk_size:
+                    chunk_df = self._rows_to_frame(chunk_data, headers)
+                    chunk_data = []
+                    chunk_count += 1
+                    self.log_callback(f"✅ Completed Chunk {chunk_count}: {len(chunk_df):,} rows")
+                    yield chunk_df
+                    
+                    # Aggressive memory cleanup for large files
+                    del chunk_df
+                    gc.collect()
+            
+            # Add remaining data
+            if chunk_data:
+                chunk_df = self._rows_to_frame(chunk_data, headers)
+                chunk_count += 1
+                self.log_callback(f"✅ Final Chunk {chunk_count}: {len(chunk_df):,} rows")
+                yield chunk_df
+            
+            self.log_callback(f"🎯 Chunking Complete: {chunk_count} chunks created")
+        finally:
+            workbook.close()
+    
+    def _use_calamine(self) -> bool:
+        """Whether Excel files should be read with python-calamine."""
+        if self.excel_reader == FileConstants.EXCEL_READER_OPENPYXL:
+            return False
+        if is_calamine_available():
+            return True
+        if self.excel_reader == FileConstants.EXCEL_READER_CALAMINE:
+            self.log_callback("⚠️ python-calamine is not installed - using openpyxl/xlrd reader")
+        return False
+    
+    def _iter_excel_chunks(self, file_path: str, file_type: str) -> Iterator[pd.DataFrame]:
+        """Yield Excel chunks with the selected backend, falling back to openpyxl/xlrd."""
+        if self.parse_cache is not None:
+            return self._iter_cached_excel_chunks(file_path, file_type)
+        chunks = self._iter_excel_backend_chunks(file_path, file_type)
+        return self._iter_raw_chunks(chunks) if self.raw_ingest else chunks
+    
+    def _iter_cached_excel_chunks(self, file_path: str, file_type: str) -> Iterator[pd.DataFrame]:
+        """
+        Yield Excel chunks from the parse cache, parsing (and caching) the workbook on a miss.
         
-        # Get total rows for progress tracking
-        total_rows = worksheet.max_row - 1  # Exclude header
-        self.log_callback(f"📊 Total rows to process: {total_rows:,}")
+        Cached chunks hold staging text, so with the cache enabled chunks are always
+        raw string columns, whether they come from the cache or from the workbook.
+        """
+        backend = FileConstants.EXCEL_READER_CALAMINE if self._use_calamine() else FileConstants.EXCEL_READER_OPENPYXL
+        try:
+            if self.fingerprint_cache is not None:
+                content_hash = self.fingerprint_cache.get_content_hash(file_path)
+            else:
+                content_hash = compute_file_hash(file_path)
+            key = self.parse_cache.make_key(content_hash, f"{file_type}:{backend}")
+        except OSError as e:
+            self.log_callback(f"⚠️ Parse cache unavailable for this file ({e}) - parsing workbook")
+            yield from self._iter_raw_chunks(self._iter_excel_backend_chunks(file_path, file_type))
+            return
         
-        # Read headers using optimized method
-        headers = [cell.value for cell in next(worksheet.iter_rows(min_row=1, max_row=1))]
+        if self.parse_cache.contains(key):
+            self.log_callback(f"⚡ Parse cache hit: {os.path.basename(file_path)} - skipping Excel parsing")
+            for chunk in self.parse_cache.iter_chunks(key, self.chunk_size, self._raw_string_dtype()):
+                if self.cancellation_token.is_set():
+                    return
+                self._count_raw_chunk(chunk)
+                yield chunk
+            return
         
-        # Read data in larger chunks with batch processing
-        chunk_data = []
-        processed_rows = 0
+        self.log_callback(f"💾 Parse cache miss: {os.path.basename(file_path)} - parsing workbook and caching result")
+        chunks = self._iter_raw_chunks(self._iter_excel_backend_chunks(file_path, file_type))
+        yield from self.parse_cache.write_through(
+            key, chunks, os.path.basename(file_path), self.cancellation_token.is_set
+        )
+    
+    def _iter_excel_backend_chunks(self, file_path: str, file_type: str) -> Iterator[pd.DataFrame]:
+        """Yield Excel chunks from calamine, or openpyxl/xlrd as fallback."""
+        if self._use_calamine():
+            try:
+                from python_calamine import CalamineWorkbook
+                workbook = CalamineWorkbook.from_path(file_path)
+            except Exception as e:
+                self.log_callback(f"⚠️ Calamine could not open file ({e}) - using openpyxl/xlrd reader")
+            else:
+                yield from self._iter_calamine_chunks(workbook)
+                return
         
-        # Use iter_rows for better performance instead of cell-by-cell access
-        for row in worksheet.iter_rows(min_row=2, values_only=True):
-            if self.cancellation_token.is_set():
-                self.log_callback("❌ Work Cancelled")
-                workbook.close()
-                break
+        if file_type == 'excel_xls':
+            yield from self._iter_xls_chunks(file_path)
+        else:
+            yield from self._iter_xlsx_chunks(file_path)
+    
+    def _iter_calamine_chunks(self, workbook) -> Iterator[pd.DataFrame]:
+        """Yield chunks of the first sheet from a python-calamine workbook (.xlsx, .xlsm, .xlsb, .xls)."""
+        self.log_callback("⚡ Using calamine Excel reader")
+        try:
+            sheet = workbook.get_sheet_by_index(0)
+            # iter_rows สตรีมทีละแถว (python-calamine >= 0.2) รุ่นเก่าใช้ to_python ทั้งชีต
+            rows = sheet.iter_rows() if hasattr(sheet, 'iter_rows') else iter(sheet.to_python())
             
-            chunk_data.append(list(row))
-            processed_rows += 1
+            header_row = next(rows, None)
+            if header_row is None:
+                return
+            headers = [self._normalize_calamine_header(value) for value in header_row]
             
-            # Progress feedback every 10,000 rows
-            if processed_rows % 10000 == 0:
-                progress = (processed_rows / total_rows) * 100
-                self.log_callback(f"📖 Processing: {processed_rows:,}/{total_rows:,} rows ({progress:.1f}%)")
+            total_rows = max((getattr(sheet, 'total_height', 0) or 0) - 1, 0)
+            if total_rows:
+                self.log_callback(f"📊 Total rows to process: {total_rows:,}")
             
-            # Create chunk when reaching chunk_size
-            if len(chunk_data) >= self.chunk_size:
-                chunk_df = pd.DataFrame(chunk_data, columns=headers)
-                chunks.append(chunk_df)
-                chunk_data = []
-                
-                chunk_num = len(chunks)
-                self.log_callback(f"✅ Completed Chunk {chunk_num}: {len(chunk_df):,} rows")
+            chunk_data = []
+            chunk_count = 0
+            for row in rows:
+                if self.cancellation_token.is_set():
+                    self.log_callback("❌ Work Cancelled")
+                    return
                 
-                # Aggressive memory cleanup for large files
-                del chunk_df
-                gc.collect()
+                chunk_data.append(row)
+                if len(chunk_data) >= self.chunk_size:
+                    chunk_count += 1
+                    chunk_df = self._calamine_rows_to_frame(chunk_data, headers)
+                    chunk_data = []
+                    self.log_callback(f"✅ Completed Chunk {chunk_count}: {len(chunk_df):,} rows")
+                    yield chunk_df
+                    del chunk_df
+            
+            if chunk_data:
+                chunk_count += 1
+                chunk_df = self._calamine_rows_to_frame(chunk_data, headers)
+                self.log_callback(f"✅ Final Chunk {chunk_count}: {len(chunk_df):,} rows")
+                yield chunk_df
+            
+            self.log_callback(f"🎯 Chunking Complete: {chunk_count} chunks created")
+        finally:
+            close = getattr(workbook, 'close', None)
+            if close:
+                close()
+    
+    @staticmethod
+    def _normalize_calamine_header(value: Any) -> Any:
+        """Match openpyxl header values (calamine returns '' for blanks and floats for numbers)."""
+        if value == '':
+            return None
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        return value
+    
+    def _calamine_rows_to_frame(self, rows: List[list], headers: List[Any]) -> pd.DataFrame:
+        """Build a chunk DataFrame, turning calamine's '' for empty cells into missing values."""
+        chunk_df = self._rows_to_frame(rows, headers)
+        # เฉพาะคอลัมน์ object (ตัวเลข/วันที่ล้วนไม่มีค่า '') อ้างอิงตามตำแหน่งเผื่อ header ซ้ำ
+        for col_idx, dtype in enumerate(chunk_df.dtypes):
+            if dtype == object:
+                column = chunk_df.iloc[:, col_idx]
+                chunk_df.isetitem(col_idx, column.mask(column.eq('')))
+        return chunk_df
+    
+    def iter_file_chunks(self, file_path: str, file_type: str = 'excel') -> Iterator[pd.DataFrame]:
+        """
+        Stream a file as DataFrame chunks so only one chunk is held in memory.
+        
+        Args:
+            file_path: Path to the file
+            file_type: File type ('excel', 'excel_xls', or 'csv')
+            
+        Yields:
+            pd.DataFrame: Chunks of at most chunk_size rows (header taken from the first row)
+            
+        Raises:
+            RuntimeError: If the operation is cancelled before the whole file was read
+        """
+        file_size_mb = os.path.getsize(file_path) / (1024 * 1024)
+        self.log_callback(f"📂 Stream File: {os.path.basename(file_path)} ({file_size_mb:.1f} MB)")
         
-        # Add remaining data
-        if chunk_data:
-            chunk_df = pd.DataFrame(chunk_data, columns=headers)
-            chunks.append(chunk_df)
-            self.log_callback(f"✅ Final Chunk {len(chunks)}: {len(chunk_df):,} rows")
+        optimal_chunk_size = self.get_optimal_chunk_size(file_size_mb)
+        if optimal_chunk_size != self.chunk_size:
+            self.chunk_size = optimal_chunk_size
+            self.log_callback(f"🔧 Optimized chunk size for this file: {self.chunk_size:,} rows")
         
-        workbook.close()
-        self.log_callback(f"🎯 Chunking Complete: {len(chunks)} chunks created")
-        return chunks
+        self._reset_raw_stats()
+        start_time = time.perf_counter()
+        if file_type == 'csv':
+            encoding_used = self._detect_encoding(file_path)
+            self.log_callback(f"🔤 Detected encoding: {encoding_used}")
+            chunk_iter = self._iter_csv(file_path, encoding_used)
+        else:
+            chunk_iter = self._iter_excel_chunks(file_path, file_type)
+        
+        yield from chunk_iter
+        
+        # ไฟล์ที่อ่านไม่ครบต้องไม่ถูกอัปโหลดบางส่วน
+        if self.cancellation_token.is_set():
+            raise RuntimeError("Work cancelled while reading file")
+        
+        if self.raw_ingest:
+            # เวลารวมนับรวมช่วงที่ผู้เรียกประมวลผล chunk ด้วย (เช่น อัปโหลด staging)
+            self.log_callback(self.describe_raw_ingest(time.perf_counter() - start_time))
+    
+    @staticmethod
+    def _raw_string_dtype() -> str:
+        """String dtype used for raw ingest (Arrow-backed when pyarrow is installed)."""
+        return "string[pyarrow]" if is_pyarrow_available() else "string"
+    
+    def _rows_to_frame(self, rows: List[list], headers: List[Any]) -> pd.DataFrame:
+        """Build a chunk DataFrame from reader rows (object columns without inference in raw ingest)."""
+        return pd.DataFrame(rows, columns=headers, dtype=object if self.raw_ingest else None)
+    
+    def _iter_raw_chunks(self, chunks: Iterator[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """Convert chunks to raw staging-text string columns."""
+        for chunk in chunks:
+            yield self._to_raw_strings(chunk)
+    
+    def _to_raw_strings(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Convert every column to a string dtype holding the text staged as NVARCHAR(MAX).
+        
+        Values are rendered with the same rules as the staging loader (to_staging_text),
+        so the loader can send string columns without converting them again.
+        """
+        string_dtype = self._raw_string_dtype()
+        # อ้างอิงตามตำแหน่งเผื่อ header ซ้ำ
+        for col_idx, dtype in enumerate(df.dtypes):
+            if dtype != object and pd.api.types.is_string_dtype(dtype):
+                continue
+            values = [to_staging_text(v) for v in df.iloc[:, col_idx].tolist()]
+            df.isetitem(col_idx, pd.array(values, dtype=string_dtype))
+        
+        self._count_raw_chunk(df)
+        return df
+    
+    def _count_raw_chunk(self, df: pd.DataFrame) -> None:
+        """Add a chunk of raw string columns to the raw ingest statistics."""
+        self.raw_stats['rows'] += len(df)
+        self.raw_stats['string_bytes'] += int(df.memory_usage(deep=True, index=False).sum())
+        self.raw_stats['object_bytes'] += self._estimate_object_bytes(df)
+    
+    @staticmethod
+    def _estimate_object_bytes(df: pd.DataFrame) -> int:
+        """Estimate the memory of the same string columns as object dtype (pointer + str object per value)."""
+        total = 0
+        for col_idx in range(len(df.columns)):
+            lengths = df.iloc[:, col_idx].str.len()
+            # str ASCII ใน CPython ใช้ 49 bytes + 1 byte ต่อตัวอักษร
+            total += 8 * len(lengths) + int(lengths.count()) * 49 + int(lengths.sum())
+        return total
+    
+    def _reset_raw_stats(self) -> None:
+        """Reset raw ingest statistics for a new file."""
+        self.raw_stats = {'rows': 0, 'string_bytes': 0, 'object_bytes': 0}
+    
+    def describe_raw_ingest(self, elapsed_seconds: float) -> str:
+        """Human-readable raw ingest summary of the last file."""
+        string_mb = self.raw_stats['string_bytes'] / 1024 / 1024
+        saved_mb = max(self.raw_stats['object_bytes'] - self.raw_stats['string_bytes'], 0) / 1024 / 1024
+        return (
+            f"🧾 Raw ingest: {self.raw_stats['rows']:,} rows as {self._raw_string_dtype()} in {elapsed_seconds:.1f}s, "
+            f"{string_mb:.1f} MB (~{saved_mb:.1f} MB less than object dtype), "
+            f"dtype inference and memory optimization skipped"
+        )
+    
+    def prefetch_chunks(self, chunks: Iterator[pd.DataFrame], max_queue_size: int = 2) -> "ChunkPrefetcher":
+        """
+        Parse chunks in a background thread while the caller uploads them.
+        
+        Args:
+            chunks: Chunk iterator (e.g. from iter_file_chunks)
+            max_queue_size: Number of parsed chunks allowed to wait for upload
+            
+        Returns:
+            ChunkPrefetcher: Iterator over the same chunks, in the same order
+        """
+        self.log_callback(f"🔀 Overlapped parse/upload pipeline (queue size {max_queue_size})")
+        return ChunkPrefetcher(chunks, max_queue_size, self.log_callback, self.cancellation_token)
     
     def process_dataframe_in_chunks(self, df: pd.DataFrame, chunk_size: int = 5000) -> List[pd.DataFrame]:
         """
@@ -455,6 +874,142 @@ class PerformanceOptimizer:
         self.log_callback("🧹 Cleaned up memory")
 
 
+class ChunkPrefetcher:
+    """
+    Bounded producer-consumer pipeline over a chunk iterator.
+    
+    A background thread pulls chunks from the source iterator (parsing) and puts
+    them into a bounded queue while the caller consumes them (uploading), so both
+    stages run at the same time. The queue size gives backpressure: the parser
+    blocks once it is max_queue_size chunks ahead of the uploader.
+    
+    Stall time is tracked per stage:
+    - producer_stall_seconds: parser waiting on a full queue (upload is the bottleneck)
+    - consumer_stall_seconds: uploader waiting on an empty queue (parse is the bottleneck)
+    """
+    
+    _DONE = object()
+    _POLL_INTERVAL = 0.1  # seconds
+    
+    def __init__(self, source: Iterator[pd.DataFrame], max_queue_size: int = 2,
+                 log_callback: Optional[Callable[[str], None]] = None,
+                 cancellation_token: Optional[threading.Event] = None) -> None:
+        """
+        Initialize chunk prefetcher and start the producer thread.
+        
+        Args:
+            source: Iterator yielding DataFrame chunks
+            max_queue_size: Maximum number of parsed chunks waiting for the consumer
+            log_callback: Callback function for logging messages
+            cancellation_token: Optional event that stops both stages when set
+        """
+        self.log_callback = log_callback or logging.info
+        self.cancellation_token = cancellation_token or threading.Event()
+        self.producer_stall_seconds = 0.0
+        self.consumer_stall_seconds = 0.0
+        self.chunks_transferred = 0
+        self._source = source
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, max_queue_size))
+        self._stop_event = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._finished = False
+        self._start_time = time.perf_counter()
+        self._thread = threading.Thread(target=self._produce, name="chunk-prefetcher", daemon=True)
+        self._thread.start()
+    
+    def _should_stop(self) -> bool:
+        return self._stop_event.is_set() or self.cancellation_token.is_set()
+    
+    def _put(self, item) -> bool:
+        """Put item into the queue, waiting while it is full. Returns False when stopped."""
+        wait_start = time.perf_counter()
+        try:
+            while not self._should_stop():
+                try:
+                    self._queue.put(item, timeout=self._POLL_INTERVAL)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        finally:
+            self.producer_stall_seconds += time.perf_counter() - wait_start
+    
+    def _produce(self) -> None:
+        try:
+            for chunk in self._source:
+                if not self._put(chunk):
+                    return
+        except BaseException as e:
+            # ส่งต่อ exception ให้ฝั่ง consumer raise ใน thread ของตัวเอง
+            self._error = e
+        finally:
+            close = getattr(self._source, 'close', None)
+            if close and self._should_stop():
+                try:
+                    close()
+                except Exception:
+                    pass
+            self._put(self._DONE)
+    
+    def __iter__(self) -> "ChunkPrefetcher":
+        return self
+    
+    def __next__(self) -> pd.DataFrame:
+        if self._finished:
+            raise StopIteration
+        
+        wait_start = time.perf_counter()
+        try:
+            while True:
+                try:
+                    item = self._queue.get(timeout=self._POLL_INTERVAL)
+                    break
+                except queue.Empty:
+                    if self.cancellation_token.is_set():
+                        self._finish()
+                        raise RuntimeError("Work cancelled while reading file")
+                    if not self._thread.is_alive() and self._queue.empty():
+                        item = self._DONE
+                        break
+        finally:
+            self.consumer_stall_seconds += time.perf_counter() - wait_start
+        
+        if item is self._DONE:
+            self._finish()
+            if self._error is not None:
+                raise self._error
+            raise StopIteration
+        
+        self.chunks_transferred += 1
+        return item
+    
+    def _finish(self) -> None:
+        if self._finished:
+            return
+        self._finished = True
+        self.log_callback(self.describe_stalls())
+    
+    def close(self) -> None:
+        """Stop the producer thread and release any queued chunks."""
+        self._stop_event.set()
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+        self._thread.join(timeout=5)
+        self._finish()
+    
+    def describe_stalls(self) -> str:
+        """Human-readable summary of stall time per stage."""
+        elapsed = time.perf_counter() - self._start_time
+        return (
+            f"⏱️ Pipeline: {self.chunks_transferred} chunks in {elapsed:.1f}s | "
+            f"parse stalled {self.producer_stall_seconds:.1f}s (queue full), "
+            f"upload stalled {self.consumer_stall_seconds:.1f}s (queue empty)"
+        )
+
+
 class LargeFileProcessor:
     """Specialized processor for handling large files."""
     
@@ -8,10 +8,20 @@ from .connection_service import ConnectionService
 from .schema_service import SchemaService
 from .data_validation_service import DataValidationService
 from .data_upload_service import DataUploadService
+from .staging_loader import (
+    BaseStagingLoader,
+    PyodbcBulkLoader,
+    ToSqlLoader,
+    create_staging_loader,
+)
 
 __all__ = [
     'ConnectionService',
     'SchemaService', 
     'DataValidationService',
-    'DataUploadService'
+    'DataUploadService',
+    'BaseStagingLoader',
+    'PyodbcBulkLoader',
+    'ToSqlLoader',
+    'create_staging_loader'
 ]
\ No newline at end of file
@@ -4,8 +4,13 @@ Data Upload Service for PIPELINE_SQLSERVER
 Handles data upload operations to database
 """
 
+import functools
+import itertools
 import json
 import logging
+import queue
+import threading
+import time
 from datetime import datetime
 from typing import Dict
 
@@ -13,7 +18,8 @@ import pandas as pd
 from sqlalchemy import inspect, text
 from sqlalchemy.exc import DBAPIError
 
-from config.json_manager import load_dtype_settings, load_column_settings
+from config.json_manager import json_manager, load_dtype_settings, load_column_settings
+from constants import DatabaseConstants, FileConstants
 from sqlalchemy.types import (
     DateTime,
     Integer as SA_Integer,
@@ -28,7 +34,21 @@ from sqlalchemy.types import (
 )
 
 from .data_validation_service import DataValidationService
-from utils.sql_utils import get_numeric_cleaning_expression
+from .staging_loader import ToSqlLoader, benchmark_staging_loaders, create_staging_loader
+from performance_optimizations import format_file_size
+from utils.cancellation import OperationCancelledError, cancellation_scope, current_token, is_cancelled, watch_engine
+from utils.sql_utils import get_conversion_check, get_conversion_expression, get_row_hash_expression
+
+
+def _cancellable(method):
+    """Run a DataUploadService method under the cancel_token keyword argument (None = not cancellable)"""
+    @functools.wraps(method)
+    def wrapper(self, *args, cancel_token=None, **kwargs):
+        if cancel_token is not None and self.engine is not None:
+            watch_engine(self.engine)
+        with cancellation_scope(cancel_token):
+            return method(self, *args, **kwargs)
+    return wrapper
 
 
 class DataUploadService:
@@ -38,6 +58,12 @@ class DataUploadService:
     Handles staging, validation, and final data upload
     """
     
+    # lock ต่อตารางปลายทาง (ใช้ร่วมทุก instance) ไม่ให้ 2 job โหลดตารางเดียวกันพร้อมกัน
+    _table_locks: Dict[str, threading.Lock] = {}
+    _table_locks_guard = threading.Lock()
+    # สร้างตาราง transfer progress ทีละ job (job แรกหลายตัวพร้อมกันจะชน "There is already an object named")
+    _progress_table_lock = threading.Lock()
+    
     def __init__(self, engine, schema_service, validation_service: DataValidationService = None) -> None:
         """
         Initialize DataUploadService
@@ -52,10 +78,50 @@ class DataUploadService:
         self.validation_service = validation_service or DataValidationService(engine)
         self.logger = logging.getLogger(__name__)
         
+        # ผลของ upload_data ครั้งล่าสุดที่สำเร็จ แยกตาม thread (job อัปโหลดหลายประเภทพร้อมกันได้)
+        self._last_upload = threading.local()
+        # callback ของ run journal ที่รับ phase ของการอัปโหลด (ต่อ thread เช่นเดียวกัน)
+        self._phase = threading.local()
+        
         # โหลดการตั้งค่าประเภทข้อมูล
         self.dtype_settings = {}
         self._load_dtype_settings()
     
+    @property
+    def last_upload(self) -> Dict:
+        """Result of this thread's last successful upload_data: {'table': 'schema.table', 'rows': n}"""
+        return getattr(self._last_upload, 'value', {})
+    
+    @last_upload.setter
+    def last_upload(self, value: Dict) -> None:
+        self._last_upload.value = value
+    
+    def _report_phase(self, phase: str, **info) -> None:
+        """Tell this thread's phase callback that a load phase is durable (errors never fail the load)"""
+        callback = getattr(self._phase, 'callback', None)
+        if callback is None:
+            return
+        try:
+            callback(phase, info)
+        except Exception as e:
+            self.logger.warning(f"Phase callback failed: {e}")
+    
+    @classmethod
+    def _get_table_lock(cls, schema_name: str, table_name: str) -> threading.Lock:
+        """Lock of one target table (shared by every DataUploadService)"""
+        key = f"{schema_name}.{table_name}".lower()
+        with cls._table_locks_guard:
+            return cls._table_locks.setdefault(key, threading.Lock())
+    
+    def _acquire_table_lock(self, schema_name: str, table_name: str, log_func=None) -> threading.Lock:
+        """Wait until no other job is loading the table, then hold its lock"""
+        table_lock = self._get_table_lock(schema_name, table_name)
+        if not table_lock.acquire(blocking=False):
+            if log_func:
+                log_func(f"⏳ Waiting for another job loading {schema_name}.{table_name}")
+            table_lock.acquire()
+        return table_lock
+    
     def _load_dtype_settings(self):
         """Load data type settings from file using JSON Manager"""
         try:
@@ -64,20 +130,50 @@ class DataUploadService:
             self.logger.warning(f"ไม่สามารถโหลด dtype_settings ได้: {e}")
             self.dtype_settings = {}
 
+    def _cleanup_cancelled_load(self, table_name: str, schema_name: str, log_func=None) -> None:
+        """
+        Drop the work tables of a cancelled load so the next run starts clean
+        
+        Staging, typed, shadow and partition tables are dropped and the transfer progress
+        is cleared (a cancelled load is never resumed). The final table keeps what the
+        server committed before the cancel (nothing in shadow/upsert mode).
+        """
+        if not table_name:
+            return
+        work_tables = [f"{table_name}__stg", f"{table_name}__typed", f"{table_name}__shadow"]
+        work_tables += [f"{table_name}__stg__p{i}" for i in range(DatabaseConstants.STAGING_MAX_WORKERS)]
+        # statement ของการ cleanup ต้องไม่ถูกยกเลิกด้วย token เดิม
+        with cancellation_scope(None):
+            try:
+                for work_table in work_tables:
+                    self._drop_table_if_exists(work_table, schema_name)
+                self._clear_transfer_progress(table_name, schema_name)
+                if log_func:
+                    log_func(f"🧹 Dropped work tables of cancelled load {schema_name}.{table_name}")
+            except Exception as e:
+                if log_func:
+                    log_func(f"⚠️ Could not clean up cancelled load {schema_name}.{table_name}: {self._short_exception_message(e)}")
+
+    @_cancellable
     def upload_data(self, df, logic_type: str, required_cols: Dict, schema_name: str = 'bronze', 
-                   log_func=None, force_recreate: bool = False, clear_existing: bool = True):
+                   log_func=None, force_recreate: bool = False, clear_existing: bool = True,
+                   phase_callback=None):
         """
         Upload data to database: create table from config, insert only configured columns,
         if database schema doesn't match, drop and recreate table
         
         Args:
-            df: DataFrame to upload
+            df: DataFrame to upload, or an iterable of DataFrame chunks (streamed into staging)
             logic_type: File type
             required_cols: Required columns and data types
             schema_name: Database schema name
             log_func: Function for logging
             force_recreate: Force table recreation (used when auto-updating data types)
             clear_existing: Whether to clear existing data (default True for backwards compatibility)
+            phase_callback: Called as (phase, info) when staging, validation, each committed
+                            transfer batch and the transfer are durable (run journal)
+            cancel_token: CancellationToken of the operation; setting it cancels the running
+                          statement and drops the staging/work tables
         """
         
         # โหลด dtype_settings ใหม่ทุกครั้งเพื่อให้ได้ค่าล่าสุดหลัง Save
@@ -86,8 +182,14 @@ class DataUploadService:
         if log_func:
             log_func("✅ Database access permissions are correct")
         
+        first_chunk = None
+        table_name = None
+        table_lock = None
+        self.last_upload = {}
+        self._phase.callback = phase_callback
         try:
-            if df is None or df.empty:
+            first_chunk, chunks = self._peek_chunks(df)
+            if first_chunk is None:
                 return False, "Empty data"
             
             if not required_cols:
@@ -96,87 +198,61 @@ class DataUploadService:
             # updated_at จะถูกเพิ่มโดย SQL ในขั้นตอนสุดท้าย
             required_cols['updated_at'] = DateTime()
             
-            table_name = None
-            try:
-                col_config = load_column_settings()
-                table_name = col_config.get("__table_names__", {}).get(logic_type)
-            except Exception:
-                table_name = None
-            if not table_name:
-                table_name = logic_type
+            table_name = self._resolve_table_name(logic_type)
+            table_lock = self._acquire_table_lock(schema_name, table_name, log_func)
+
+            # upsert: MERGE เฉพาะแถวใหม่/เปลี่ยนแปลงตาม key columns แทนการล้างตาราง
+            upsert = self._get_upload_mode(logic_type) == DatabaseConstants.UPLOAD_MODE_UPSERT
+            key_columns = self._get_key_columns(logic_type) if upsert else []
+            if upsert:
+                missing_keys = [k for k in key_columns if k not in required_cols or k == 'updated_at']
+                if not key_columns:
+                    return False, f"Upsert mode requires _key_columns in data type settings for {logic_type}"
+                if missing_keys:
+                    return False, f"Key columns not found in data type settings: {', '.join(missing_keys)}"
 
             schema_result = self.schema_service.ensure_schemas_exist([schema_name])
             if not schema_result[0]:
                 return False, f"Could not create schema: {schema_result[1]}"
 
-            insp = inspect(self.engine)
-            needs_recreate = force_recreate
-            
-            if insp.has_table(table_name, schema=schema_name) and not force_recreate:
-                db_cols = [col['name'] for col in insp.get_columns(table_name, schema=schema_name)]
-                db_col_types = {col['name']: str(col['type']).upper() for col in insp.get_columns(table_name, schema=schema_name)}
-                config_cols = list(required_cols.keys())
-                
-                if set(db_cols) != set(config_cols):
-                    msg = f"❌ Table {schema_name}.{table_name} columns do not match config"
-                    needs_recreate = True
-                else:
-                    needs_recreate = self._check_type_compatibility(db_col_types, required_cols, log_func)
+            needs_recreate = self._needs_recreate(table_name, required_cols, schema_name, force_recreate, log_func)
             
             staging_table = f"{table_name}__stg"
             # staging table ไม่รวม updated_at เพราะจะเพิ่มใน SQL ตอน transfer
             staging_cols = [col for col in required_cols.keys() if col != 'updated_at']
+            # chunks ที่มาจากหลายไฟล์ (batch) มีชื่อไฟล์ต้นทางติดมา เก็บไว้ใน staging เพื่อไล่ปัญหาย้อนกลับได้
+            if DatabaseConstants.SOURCE_FILE_COLUMN in first_chunk.columns and DatabaseConstants.SOURCE_FILE_COLUMN not in staging_cols:
+                staging_cols.append(DatabaseConstants.SOURCE_FILE_COLUMN)
             
             if log_func:
                 log_func(f"📋 Creating staging table {schema_name}.{staging_table}")
             self._create_staging_table(staging_table, staging_cols, schema_name, log_func)
+            # staging ใหม่ ทำให้ความคืบหน้าการ transfer ครั้งก่อนใช้ไม่ได้แล้ว
+            self._clear_transfer_progress(table_name, schema_name)
             
             if log_func:
-                log_func(f"📤 Uploading {len(df):,} rows to staging table")
-            self._upload_to_staging(df, staging_table, staging_cols, schema_name, log_func)
-            
-            # โหลดการตั้งค่า date format
-            date_format = 'UK'  # default
-            try:
-                if logic_type in self.dtype_settings:
-                    date_format = self.dtype_settings[logic_type].get('_date_format', 'UK')
-                    if log_func:
-                        log_func(f"📅 Using Date Format: {date_format}")
-            except Exception as e:
-                if log_func:
-                    log_func(f"⚠️ Could not load date format: {e}")
-            
-            if log_func:
-                log_func(f"🔍 Validating data in staging table")
-            validation_results = self.validation_service.validate_data_in_staging(
-                staging_table, logic_type, required_cols, schema_name, log_func, 
-                progress_callback=None, date_format=date_format
-            )
-            
-            if not validation_results['is_valid']:
-                with self.engine.begin() as conn:
-                    conn.execute(text(f"DROP TABLE {schema_name}.{staging_table}"))
-                return False, validation_results['summary']
+                if isinstance(df, pd.DataFrame):
+                    log_func(f"📤 Uploading {len(df):,} rows to staging table")
+                else:
+                    log_func("📤 Streaming chunks to staging table")
+            total_rows = self._upload_to_staging(chunks, staging_table, staging_cols, schema_name, log_func)
             
-            self._create_or_recreate_final_table(
-                table_name, required_cols, schema_name, needs_recreate, log_func, df, clear_existing
-            )
+            self._report_phase(FileConstants.PHASE_STAGED, staging_table=staging_table, rows=total_rows)
             
-            if log_func:
-                log_func(f"🔄 Transferring data from staging to main table {schema_name}.{table_name}")
-            self._transfer_data_from_staging(
-                staging_table, table_name, required_cols, schema_name, log_func, date_format
+            return self._validate_and_transfer(
+                logic_type, table_name, staging_table, required_cols, schema_name, log_func,
+                upsert, key_columns, needs_recreate, first_chunk, clear_existing, total_rows
             )
-            
-            # Keep staging table for debugging - it will be cleaned up when new data comes
-            if log_func:
-                log_func(f"✅ Keeping staging table {schema_name}.{staging_table} for debugging")
-
-            return True, f"Upload successful → {schema_name}.{table_name} (ingested NVARCHAR(MAX) then converted by dtype for {len(df):,} rows)"
         
         except Exception as e:
+            if is_cancelled(e):
+                self._cleanup_cancelled_load(table_name, schema_name, log_func)
+                if log_func:
+                    log_func("🛑 Upload cancelled")
+                return False, "Upload cancelled"
             short_msg = self._short_exception_message(e)
-            problem_hints = self._detect_problem_columns(df, required_cols)
+            # สำหรับ streaming ตรวจได้เฉพาะ chunk แรกที่ยังอยู่ในหน่วยความจำ
+            problem_hints = self._detect_problem_columns(first_chunk, required_cols) if first_chunk is not None else []
 
             if problem_hints:
                 lines = [
@@ -193,49 +269,283 @@ class DataUploadService:
             if log_func:
                 log_func(f"❌ {error_msg}")
             return False, error_msg
+        finally:
+            # หยุด reader/prefetch thread หากยังอ่านไม่จบ (เช่น validation ล้มเหลว)
+            if not isinstance(df, pd.DataFrame) and hasattr(df, 'close'):
+                df.close()
+            if table_lock is not None:
+                table_lock.release()
+            self._phase.callback = None
+
+    def _needs_recreate(self, table_name: str, required_cols: Dict, schema_name: str,
+                        force_recreate: bool = False, log_func=None) -> bool:
+        """Whether the final table must be recreated because its columns or types differ from the config"""
+        insp = inspect(self.engine)
+        needs_recreate = force_recreate
+        
+        if insp.has_table(table_name, schema=schema_name) and not force_recreate:
+            # __row_hash เป็นคอลัมน์ภายในของโหมด upsert ไม่นับรวมในการเทียบกับ config
+            db_cols = [
+                col['name'] for col in insp.get_columns(table_name, schema=schema_name)
+                if col['name'] != DatabaseConstants.ROW_HASH_COLUMN
+            ]
+            db_col_types = {col['name']: str(col['type']).upper() for col in insp.get_columns(table_name, schema=schema_name)}
+            config_cols = list(required_cols.keys())
+            
+            if set(db_cols) != set(config_cols):
+                needs_recreate = True
+            else:
+                needs_recreate = self._check_type_compatibility(db_col_types, required_cols, log_func)
+        return needs_recreate
+
+    def _validate_and_transfer(self, logic_type: str, table_name: str, staging_table: str, required_cols: Dict,
+                               schema_name: str, log_func, upsert: bool, key_columns: list, needs_recreate: bool,
+                               first_chunk, clear_existing: bool, total_rows: int):
+        """
+        Validate a filled staging table and load it into the final table
+        
+        Args:
+            first_chunk: DataFrame with the staging columns (only its column names are used)
+            total_rows: Rows in the staging table
+            
+        Returns:
+            Tuple[bool, str]: (Success status, Result message)
+        """
+        # โหลดการตั้งค่า date format
+        date_format = 'UK'  # default
+        try:
+            if logic_type in self.dtype_settings:
+                date_format = self.dtype_settings[logic_type].get('_date_format', 'UK')
+                if log_func:
+                    log_func(f"📅 Using Date Format: {date_format}")
+        except Exception as e:
+            if log_func:
+                log_func(f"⚠️ Could not load date format: {e}")
+        
+        # fused: แปลงชนิดข้อมูลครั้งเดียวลง typed table แล้วนับ error จากผลการแปลง
+        fused = self._get_validation_mode() == 'fused'
+        typed_table = f"{table_name}__typed"
+        
+        if fused:
+            if log_func:
+                log_func(f"🔍 Converting and validating staging data in one pass → {schema_name}.{typed_table}")
+            checks = self._build_typed_table(
+                staging_table, typed_table, required_cols, schema_name, log_func, date_format
+            )
+            validation_results = self.validation_service.validate_typed_table(
+                typed_table, checks, schema_name, log_func
+            )
+        else:
+            if log_func:
+                log_func(f"🔍 Validating data in staging table")
+            validation_results = self.validation_service.validate_data_in_staging(
+                staging_table, logic_type, required_cols, schema_name, log_func, 
+                progress_callback=None, date_format=date_format
+            )
+        # ผลตรวจของ validation ที่ถูกยกเลิกกลางทางไม่ครบ ห้ามรายงานเป็นข้อมูลผิด/ถูก
+        if is_cancelled():
+            raise OperationCancelledError("Operation cancelled")
+        
+        if not validation_results['is_valid']:
+            with self.engine.begin() as conn:
+                conn.execute(text(f"DROP TABLE {schema_name}.{staging_table}"))
+                if fused:
+                    conn.execute(text(f"DROP TABLE {schema_name}.{typed_table}"))
+            return False, validation_results['summary']
+        self._report_phase(FileConstants.PHASE_VALIDATED, source_table=typed_table if fused else staging_table)
+        
+        if upsert:
+            if log_func:
+                log_func(f"🔑 Upserting into {schema_name}.{table_name} on key columns: {', '.join(key_columns)}")
+            self._prepare_upsert_table(
+                table_name, required_cols, key_columns, schema_name, needs_recreate, log_func, first_chunk
+            )
+            counts = self._merge_into_final(
+                typed_table if fused else staging_table, table_name, required_cols, key_columns,
+                schema_name, log_func, date_format, converted=fused
+            )
+            if fused:
+                self._drop_table_if_exists(typed_table, schema_name)
+            self.last_upload = {'table': f"{schema_name}.{table_name}", 'rows': counts['source']}
+            self._report_phase(FileConstants.PHASE_TRANSFERRED, table=f"{schema_name}.{table_name}", rows=counts['source'])
+            return True, (
+                f"Upsert successful → {schema_name}.{table_name} "
+                f"({counts['inserted']:,} inserted, {counts['updated']:,} updated, {counts['unchanged']:,} unchanged)"
+            )
+        
+        # shadow: โหลดลงตารางเงาแล้วสลับกับตารางจริงตอนจบ ผู้อ่านไม่เห็นตารางว่าง/โหลดครึ่งเดียว
+        use_shadow = clear_existing and self._get_reload_mode() == 'shadow'
+        target_table = table_name
+        if use_shadow:
+            target_table = f"{table_name}__shadow"
+            if log_func:
+                log_func(f"🪞 Loading into shadow table {schema_name}.{target_table}")
+            self._create_table_from_config(target_table, required_cols, schema_name, first_chunk)
+            # index/constraint เหมือนตารางจริง ให้ SWITCH ได้ และไม่หายเมื่อต้องสลับด้วย rename
+            self._copy_table_objects(table_name, target_table, schema_name, log_func)
+        else:
+            self._create_or_recreate_final_table(
+                table_name, required_cols, schema_name, needs_recreate, log_func, first_chunk, clear_existing
+            )
+        
+        try:
+            if fused:
+                if log_func:
+                    log_func(f"🔄 Transferring typed data to main table {schema_name}.{target_table}")
+                self._transfer_with_load_mode(
+                    lambda: self._transfer_data_from_typed(typed_table, target_table, required_cols, schema_name, log_func),
+                    target_table, schema_name, log_func
+                )
+            else:
+                if log_func:
+                    log_func(f"🔄 Transferring data from staging to main table {schema_name}.{target_table}")
+                self._transfer_with_load_mode(
+                    lambda: self._transfer_data_from_staging(
+                        staging_table, target_table, required_cols, schema_name, log_func, date_format
+                    ),
+                    target_table, schema_name, log_func
+                )
+            
+            if use_shadow:
+                self._swap_shadow_table(table_name, target_table, required_cols, schema_name, needs_recreate, log_func)
+        except Exception:
+            # ตารางจริงยังเป็นข้อมูลเดิม ทิ้งเฉพาะตารางเงา
+            if use_shadow:
+                with cancellation_scope(None):
+                    self._drop_table_if_exists(target_table, schema_name)
+                    self._clear_transfer_progress(table_name, schema_name)
+            raise
+        
+        # Keep staging table for debugging - it will be cleaned up when new data comes
+        if log_func:
+            log_func(f"✅ Keeping staging table {schema_name}.{staging_table} for debugging")
+        
+        self.last_upload = {'table': f"{schema_name}.{table_name}", 'rows': total_rows}
+        self._report_phase(FileConstants.PHASE_TRANSFERRED, table=f"{schema_name}.{table_name}", rows=total_rows)
+        return True, f"Upload successful → {schema_name}.{table_name} (ingested NVARCHAR(MAX) then converted by dtype for {total_rows:,} rows)"
+
+    @_cancellable
+    def resume_from_staging(self, logic_type: str, required_cols: Dict, schema_name: str = 'bronze',
+                            log_func=None, expected_rows: int = None, phase_callback=None):
+        """
+        Validate and transfer a staging table left by an interrupted run, without reading the files again
+        
+        Args:
+            logic_type: File type
+            required_cols: Required columns and data types
+            schema_name: Database schema name
+            log_func: Function for logging
+            expected_rows: Rows the run staged (the staging table must still hold exactly these)
+            phase_callback: Same as in upload_data
+            cancel_token: Same as in upload_data
+            
+        Returns:
+            Tuple[bool, str]: (Success status, Result message)
+        """
+        table_name = None
+        table_lock = None
+        self.last_upload = {}
+        self._phase.callback = phase_callback
+        try:
+            self._load_dtype_settings()
+            if not required_cols:
+                return False, "Data type settings not found"
+            required_cols['updated_at'] = DateTime()
+            
+            table_name = self._resolve_table_name(logic_type)
+            table_lock = self._acquire_table_lock(schema_name, table_name, log_func)
+            staging_table = f"{table_name}__stg"
+            
+            if not inspect(self.engine).has_table(staging_table, schema=schema_name):
+                return False, f"Staging table {schema_name}.{staging_table} no longer exists"
+            staging_cols = [col['name'] for col in inspect(self.engine).get_columns(staging_table, schema=schema_name)]
+            missing = [col for col in required_cols if col != 'updated_at' and col not in staging_cols]
+            if missing:
+                return False, f"Staging table {schema_name}.{staging_table} does not match data type settings"
+            with self.engine.connect() as conn:
+                total_rows = conn.execute(text(f"SELECT COUNT(*) FROM {schema_name}.{staging_table}")).scalar()
+            if expected_rows is not None and total_rows != expected_rows:
+                return False, (
+                    f"Staging table {schema_name}.{staging_table} changed since the run "
+                    f"({total_rows:,} rows, expected {expected_rows:,})"
+                )
+            
+            upsert = self._get_upload_mode(logic_type) == DatabaseConstants.UPLOAD_MODE_UPSERT
+            key_columns = self._get_key_columns(logic_type) if upsert else []
+            if upsert and (not key_columns or any(k not in required_cols for k in key_columns)):
+                return False, f"Upsert mode requires valid _key_columns in data type settings for {logic_type}"
+            
+            if log_func:
+                log_func(f"⏩ Resuming from staging table {schema_name}.{staging_table} ({total_rows:,} rows)")
+            # typed table/ความคืบหน้า transfer จะถูกสร้างใหม่จาก staging
+            self._clear_transfer_progress(table_name, schema_name)
+            needs_recreate = self._needs_recreate(table_name, required_cols, schema_name, False, log_func)
+            template = pd.DataFrame(columns=[col for col in required_cols if col != 'updated_at'])
+            return self._validate_and_transfer(
+                logic_type, table_name, staging_table, required_cols, schema_name, log_func,
+                upsert, key_columns, needs_recreate, template, True, total_rows
+            )
+        
+        except Exception as e:
+            if is_cancelled(e):
+                self._cleanup_cancelled_load(table_name, schema_name, log_func)
+                if log_func:
+                    log_func("🛑 Upload cancelled")
+                return False, "Upload cancelled"
+            error_msg = f"Database error: {self._short_exception_message(e)}"
+            if log_func:
+                log_func(f"❌ {error_msg}")
+            return False, error_msg
+        finally:
+            if table_lock is not None:
+                table_lock.release()
+            self._phase.callback = None
 
     def _fix_column_types(self, table_name: str, required_cols: Dict, 
                          schema_name: str = 'bronze', log_func=None):
         """Fix column types to match required types for all data types"""
         try:
             with self.engine.begin() as conn:
-                # ตรวจสอบชนิดข้อมูลปัจจุบันในฐานข้อมูล
-                check_query = f"""
-                    SELECT COLUMN_NAME, DATA_TYPE, CHARACTER_MAXIMUM_LENGTH, NUMERIC_PRECISION, NUMERIC_SCALE
-                    FROM INFORMATION_SCHEMA.COLUMNS 
-                    WHERE TABLE_SCHEMA = '{schema_name}' 
-                    AND TABLE_NAME = '{table_name}'
-                """
-                result = conn.execute(text(check_query))
-                current_columns = {row.COLUMN_NAME: {
-                    'data_type': row.DATA_TYPE,
-                    'max_length': row.CHARACTER_MAXIMUM_LENGTH,
-                    'precision': row.NUMERIC_PRECISION,
-                    'scale': row.NUMERIC_SCALE
-                } for row in result.fetchall()}
-                
-                for col_name, dtype in required_cols.items():
-                    if col_name not in current_columns:
-                        continue
-                        
-                    current_col = current_columns[col_name]
-                    target_sql_type = self._get_sql_server_type(dtype)
-                    current_type_str = self._format_current_type(current_col)
-                    
-                    # เปรียบเทียบชนิดข้อมูล ถ้าเหมือนกันก็ข้าม
-                    if self._types_are_equivalent(current_type_str, target_sql_type, dtype):
-                        continue
-                    
-                    # มีการเปลี่ยนแปลง ต้อง ALTER
-                    alter_sql = f"ALTER TABLE {schema_name}.{table_name} ALTER COLUMN [{col_name}] {target_sql_type}"
-                    if log_func:
-                        log_func(f"🔧 ALTER column '{col_name}': {current_type_str} → {target_sql_type}")
-                    conn.execute(text(alter_sql))
-                    
+                self._alter_column_types(conn, table_name, required_cols, schema_name, log_func)
         except Exception as e:
             if log_func:
                 log_func(f"⚠️ Unable to alter column types: {e}")
     
+    def _alter_column_types(self, conn, table_name: str, required_cols: Dict, schema_name: str, log_func=None):
+        """ALTER the columns whose type differs from the config, on the caller's connection/transaction"""
+        # ตรวจสอบชนิดข้อมูลปัจจุบันในฐานข้อมูล
+        check_query = f"""
+            SELECT COLUMN_NAME, DATA_TYPE, CHARACTER_MAXIMUM_LENGTH, NUMERIC_PRECISION, NUMERIC_SCALE
+            FROM INFORMATION_SCHEMA.COLUMNS 
+            WHERE TABLE_SCHEMA = '{schema_name}' 
+            AND TABLE_NAME = '{table_name}'
+        """
+        result = conn.execute(text(check_query))
+        current_columns = {row.COLUMN_NAME: {
+            'data_type': row.DATA_TYPE,
+            'max_length': row.CHARACTER_MAXIMUM_LENGTH,
+            'precision': row.NUMERIC_PRECISION,
+            'scale': row.NUMERIC_SCALE
+        } for row in result.fetchall()}
+        
+        for col_name, dtype in required_cols.items():
+            if col_name not in current_columns:
+                continue
+                
+            current_col = current_columns[col_name]
+            target_sql_type = self._get_sql_server_type(dtype)
+            current_type_str = self._format_current_type(current_col)
+            
+            # เปรียบเทียบชนิดข้อมูล ถ้าเหมือนกันก็ข้าม
+            if self._types_are_equivalent(current_type_str, target_sql_type, dtype):
+                continue
+            
+            # มีการเปลี่ยนแปลง ต้อง ALTER
+            alter_sql = f"ALTER TABLE {schema_name}.{table_name} ALTER COLUMN [{col_name}] {target_sql_type}"
+            if log_func:
+                log_func(f"🔧 ALTER column '{col_name}': {current_type_str} → {target_sql_type}")
+            conn.execute(text(alter_sql))
+    
     def _get_sql_server_type(self, sa_type) -> str:
         """Convert SQLAlchemy type to SQL Server type string"""
         if isinstance(sa_type, SA_Text):
@@ -362,40 +672,609 @@ class DataUploadService:
                     DROP TABLE {schema_name}.{staging_table};
             """))
             cols_sql = ", ".join([f"[{c}] NVARCHAR(MAX) NULL" for c in staging_cols])
+            # __row_id เก็บลำดับแถวจากไฟล์ เพื่อให้ลำดับเดิมไม่หายเมื่ออัปโหลดหลาย connection พร้อมกัน
+            cols_sql += f", [{DatabaseConstants.STAGING_ROW_ID_COLUMN}] BIGINT NULL"
             conn.execute(text(f"CREATE TABLE {schema_name}.{staging_table} ({cols_sql})"))
             if log_func:
                 log_func(f"📦 Created staging table: {schema_name}.{staging_table} (NVARCHAR(MAX) for all columns)")
 
-    def _upload_to_staging(self, df, staging_table: str, staging_cols: list, schema_name: str, log_func=None):
-        """Upload data to staging table"""
-        if len(df) > 10000:
+    def _peek_chunks(self, data):
+        """
+        Normalize upload input into (first non-empty chunk, iterator over all chunks)
+        
+        Args:
+            data: DataFrame or iterable of DataFrame chunks
+            
+        Returns:
+            tuple: (first_chunk or None when there is no data, chunk iterator)
+        """
+        if data is None:
+            return None, iter(())
+        if isinstance(data, pd.DataFrame):
+            return (None if data.empty else data), iter((data,))
+
+        chunk_iter = iter(data)
+        for chunk in chunk_iter:
+            if chunk is not None and not chunk.empty:
+                return chunk, itertools.chain((chunk,), chunk_iter)
+        return None, iter(())
+
+    def _upload_to_staging(self, chunks, staging_table: str, staging_cols: list, schema_name: str, log_func=None) -> int:
+        """
+        Upload data to staging table using the configured staging loader (falls back to to_sql)
+        
+        Every row gets an ordinal __row_id so the source order survives parallel uploads.
+        
+        Args:
+            chunks: DataFrame or iterable of DataFrame chunks; each is consumed and released in turn
+            
+        Returns:
+            int: Total rows loaded into staging
+        """
+        if isinstance(chunks, pd.DataFrame):
+            chunks = (chunks,)
+
+        backend = self._get_staging_loader_backend()
+        loader = create_staging_loader(self.engine, backend)
+        workers, mode = self._get_staging_parallelism()
+        if log_func:
+            log_func(f"🚚 Staging loader: {loader.backend_name}")
+
+        batches = self._iter_staging_batches(chunks, staging_cols, loader.chunk_size)
+        if workers > 1:
+            return self._upload_to_staging_parallel(
+                batches, staging_table, staging_cols, schema_name, backend, workers, mode, log_func
+            )
+
+        load_cols = staging_cols + [DatabaseConstants.STAGING_ROW_ID_COLUMN]
+        loaders = [loader]
+        total_rows = 0
+        for batch_num, batch in enumerate(batches, 1):
+            self._load_batch_with_fallback(loaders, batch, staging_table, load_cols, schema_name, log_func)
+            total_rows += len(batch)
+            if log_func and batch_num > 1:
+                log_func(f"📤 Uploaded staging chunk {batch_num}: {len(batch):,} rows (Total: {total_rows:,})")
+
+        if log_func:
+            for used_loader in loaders:
+                if used_loader.total_rows:
+                    log_func(f"⚡ Staging throughput {used_loader.describe_throughput()} → {schema_name}.{staging_table}")
+
+        return total_rows
+
+    def _iter_staging_batches(self, chunks, staging_cols: list, batch_size: int):
+        """Slice source chunks into loader-sized batches with consecutive __row_id values"""
+        next_row_id = 1
+        token = current_token()
+        for source_chunk in chunks:
+            if token is not None:
+                token.raise_if_cancelled()
+            if source_chunk is None or source_chunk.empty:
+                continue
+            for i in range(0, len(source_chunk), batch_size):
+                batch = source_chunk.iloc[i:i + batch_size][staging_cols]
+                batch = batch.assign(**{
+                    DatabaseConstants.STAGING_ROW_ID_COLUMN: range(next_row_id, next_row_id + len(batch))
+                })
+                next_row_id += len(batch)
+                yield batch
+
+    def _load_batch_with_fallback(self, loaders: list, batch, staging_table: str, load_cols: list,
+                                  schema_name: str, log_func=None) -> None:
+        """
+        Load one batch with the last loader in loaders; when a bulk backend fails,
+        append a ToSqlLoader to loaders and use it from then on
+        """
+        active_loader = loaders[-1]
+        try:
+            active_loader.load_chunk(batch, staging_table, load_cols, schema_name)
+        except Exception as e:
+            if active_loader.backend_name == DatabaseConstants.STAGING_LOADER_TO_SQL or is_cancelled(e):
+                raise
+            # bulk backend ใช้ไม่ได้กับ server/driver นี้ ให้ใช้ to_sql กับ chunk ที่เหลือ
             if log_func:
-                log_func(f"📊 Large file ({len(df):,} rows) - uploading in chunks to staging")
-            chunk_size = 5000
-            total_chunks = (len(df) + chunk_size - 1) // chunk_size
-            for i in range(0, len(df), chunk_size):
-                chunk = df.iloc[i:i+chunk_size]
-                chunk[staging_cols].to_sql(
-                    name=staging_table,
-                    con=self.engine,
-                    schema=schema_name,
-                    if_exists='append',
-                    index=False
+                log_func(f"⚠️ {active_loader.backend_name} failed ({self._short_exception_message(e)}) - falling back to to_sql")
+            fallback_loader = ToSqlLoader(self.engine)
+            loaders.append(fallback_loader)
+            fallback_loader.load_chunk(batch, staging_table, load_cols, schema_name)
+
+    def _get_staging_parallelism(self):
+        """
+        Staging upload concurrency from app settings
+        
+        Returns:
+            tuple: (workers, mode) - mode is 'heap' or 'partitioned'
+        """
+        try:
+            workers = int(json_manager.get('app_settings', 'staging_upload_workers', 1) or 1)
+            mode = json_manager.get('app_settings', 'staging_parallel_mode', DatabaseConstants.STAGING_PARALLEL_HEAP)
+        except Exception:
+            workers, mode = 1, DatabaseConstants.STAGING_PARALLEL_HEAP
+        workers = max(1, min(workers, DatabaseConstants.STAGING_MAX_WORKERS))
+        if mode not in (DatabaseConstants.STAGING_PARALLEL_HEAP, DatabaseConstants.STAGING_PARALLEL_PARTITIONED):
+            mode = DatabaseConstants.STAGING_PARALLEL_HEAP
+        return workers, mode
+
+    def _upload_to_staging_parallel(self, batches, staging_table: str, staging_cols: list, schema_name: str,
+                                    backend: str, workers: int, mode: str, log_func=None) -> int:
+        """
+        Fan staging batches out over several pooled connections
+        
+        Each worker thread owns its own loader (and connection per batch). In 'heap' mode
+        all workers insert into the staging table; in 'partitioned' mode worker i inserts
+        into {staging_table}__p{i} and the partitions are unioned into the staging table
+        at the end. The batch queue is bounded so streaming input stays memory-bounded.
+        
+        Returns:
+            int: Total rows loaded into staging
+        """
+        load_cols = staging_cols + [DatabaseConstants.STAGING_ROW_ID_COLUMN]
+        partitioned = mode == DatabaseConstants.STAGING_PARALLEL_PARTITIONED
+        targets = [f"{staging_table}__p{i}" if partitioned else staging_table for i in range(workers)]
+        if partitioned:
+            for target in targets:
+                self._create_staging_table(target, staging_cols, schema_name)
+
+        if log_func:
+            log_func(f"🔀 Parallel staging upload: {workers} connections ({mode})")
+
+        batch_queue = queue.Queue(maxsize=workers * 2)
+        stop_event = threading.Event()
+        errors = []
+        worker_loaders = [[create_staging_loader(self.engine, backend)] for _ in range(workers)]
+        rows_lock = threading.Lock()
+        totals = {'rows': 0, 'batches': 0}
+        token = current_token()
+
+        def _worker(index: int):
+            with cancellation_scope(token):
+                _consume(index)
+
+        def _consume(index: int):
+            while True:
+                batch = batch_queue.get()
+                if batch is None:
+                    return
+                if stop_event.is_set():
+                    continue
+                try:
+                    self._load_batch_with_fallback(
+                        worker_loaders[index], batch, targets[index], load_cols, schema_name, log_func
+                    )
+                    with rows_lock:
+                        totals['rows'] += len(batch)
+                        totals['batches'] += 1
+                        if log_func:
+                            log_func(f"📤 [conn {index + 1}] Uploaded staging chunk {totals['batches']}: "
+                                     f"{len(batch):,} rows (Total: {totals['rows']:,})")
+                except Exception as e:
+                    errors.append(e)
+                    stop_event.set()
+
+        threads = [
+            threading.Thread(target=_worker, args=(i,), name=f"staging-upload-{i + 1}", daemon=True)
+            for i in range(workers)
+        ]
+        for t in threads:
+            t.start()
+
+        try:
+            try:
+                for batch in batches:
+                    if stop_event.is_set() or (token is not None and token.is_set()):
+                        break
+                    batch_queue.put(batch)
+            finally:
+                for _ in threads:
+                    batch_queue.put(None)
+                for t in threads:
+                    t.join()
+
+            if errors:
+                raise errors[0]
+            if token is not None:
+                token.raise_if_cancelled()
+
+            if partitioned:
+                cols_sql = ", ".join([f"[{c}]" for c in load_cols])
+                union_sql = " UNION ALL ".join(
+                    [f"SELECT {cols_sql} FROM {schema_name}.{target}" for target in targets]
                 )
-                chunk_num = (i // chunk_size) + 1
+                with self.engine.begin() as conn:
+                    conn.execute(text(
+                        f"INSERT INTO {schema_name}.{staging_table} WITH (TABLOCK) ({cols_sql}) {union_sql}"
+                    ))
                 if log_func:
-                    log_func(f"📤 Uploaded staging chunk {chunk_num}/{total_chunks}: {len(chunk):,} rows")
+                    log_func(f"🔗 Unioned {workers} staging partitions into {schema_name}.{staging_table}")
+        finally:
+            if partitioned:
+                with cancellation_scope(None), self.engine.begin() as conn:
+                    for target in targets:
+                        conn.execute(text(f"""
+                            IF OBJECT_ID('{schema_name}.{target}', 'U') IS NOT NULL
+                                DROP TABLE {schema_name}.{target};
+                        """))
+
+        if log_func:
+            for index, loaders in enumerate(worker_loaders):
+                for used_loader in loaders:
+                    if used_loader.total_rows:
+                        log_func(f"⚡ [conn {index + 1}] Staging throughput {used_loader.describe_throughput()}")
+
+        return totals['rows']
+
+    def _get_staging_loader_backend(self) -> str:
+        """Staging loader backend from app settings ('auto', 'pyodbc_bulk' or 'to_sql')"""
+        try:
+            return json_manager.get('app_settings', 'staging_loader', DatabaseConstants.STAGING_LOADER_AUTO)
+        except Exception:
+            return DatabaseConstants.STAGING_LOADER_AUTO
+
+    def benchmark_staging_loaders(self, df, schema_name: str = 'bronze', sample_rows: int = 50000,
+                                  log_func=None) -> Dict[str, float]:
+        """
+        Measure rows/sec of every staging loader backend on a sample of df
+        
+        Args:
+            df: DataFrame to sample from
+            schema_name: Schema name
+            sample_rows: Number of rows to load per backend
+            log_func: Function for logging
+            
+        Returns:
+            Dict[str, float]: rows/sec by backend name
+        """
+        staging_table = "__staging_loader_benchmark"
+        staging_cols = [str(c) for c in df.columns]
+        sample = df.head(sample_rows)
+        sample.columns = staging_cols
+        self._create_staging_table(staging_table, staging_cols, schema_name, log_func)
+        try:
+            return benchmark_staging_loaders(
+                self.engine, sample, staging_table, staging_cols, schema_name, log_func
+            )
+        finally:
+            with self.engine.begin() as conn:
+                conn.execute(text(f"DROP TABLE {schema_name}.{staging_table}"))
+
+    def _create_table_from_config(self, table_name: str, required_cols: Dict, schema_name: str, df):
+        """Create (or replace) an empty table with the configured column types plus updated_at"""
+        # สร้าง empty DataFrame ที่มีเฉพาะคอลัมน์ที่มีอยู่ใน df (ไม่รวม updated_at)
+        df_cols = [col for col in required_cols.keys() if col != 'updated_at']
+        df.head(0)[df_cols].to_sql(
+            name=table_name,
+            con=self.engine,
+            schema=schema_name,
+            if_exists='replace',
+            index=False,
+            dtype={col: required_cols[col] for col in df_cols}
+        )
+        # เพิ่ม updated_at column ด้วย SQL
+        with self.engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE {schema_name}.{table_name} ADD [updated_at] DATETIME2 NULL"))
+
+    def _get_upload_mode(self, logic_type: str) -> str:
+        """Upload mode of a logic type from dtype settings ('replace' by default or 'upsert')"""
+        try:
+            return self.dtype_settings.get(logic_type, {}).get('_upload_mode', DatabaseConstants.UPLOAD_MODE_REPLACE)
+        except Exception:
+            return DatabaseConstants.UPLOAD_MODE_REPLACE
+
+    def _get_key_columns(self, logic_type: str) -> list:
+        """Business key columns of a logic type from dtype settings (_key_columns)"""
+        try:
+            keys = self.dtype_settings.get(logic_type, {}).get('_key_columns', [])
+        except Exception:
+            return []
+        if isinstance(keys, str):
+            keys = [k.strip() for k in keys.split(',')]
+        return [k for k in keys if k]
+
+    def _prepare_upsert_table(self, table_name: str, required_cols: Dict, key_columns: list, schema_name: str,
+                              needs_recreate: bool, log_func, df):
+        """Create or align the final table for upsert, adding the row hash column and a key index"""
+        hash_col = DatabaseConstants.ROW_HASH_COLUMN
+        insp = inspect(self.engine)
+        
+        if needs_recreate or not insp.has_table(table_name, schema=schema_name):
+            if log_func:
+                log_func(f"📋 Creating table {schema_name}.{table_name} from data type settings")
+            self._create_table_from_config(table_name, required_cols, schema_name, df)
         else:
+            self._fix_column_types(table_name, required_cols, schema_name, log_func)
+        
+        index_name = f"IX_{table_name}__keys"
+        key_sql = ", ".join([f"[{k}]" for k in key_columns])
+        with self.engine.begin() as conn:
+            conn.execute(text(f"""
+                IF COL_LENGTH('{schema_name}.{table_name}', '{hash_col}') IS NULL
+                    ALTER TABLE {schema_name}.{table_name} ADD [{hash_col}] VARBINARY(32) NULL;
+            """))
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(text(f"""
+                    IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = '{index_name}'
+                                   AND object_id = OBJECT_ID('{schema_name}.{table_name}'))
+                        CREATE INDEX [{index_name}] ON {schema_name}.{table_name} ({key_sql});
+                """))
+        except Exception as e:
+            # เช่น key เป็น NVARCHAR(MAX) ซึ่งทำ index ไม่ได้ - MERGE ยังทำงานได้แต่ช้ากว่า
             if log_func:
-                log_func(f"📤 Uploaded data: {len(df):,} rows → {schema_name}.{staging_table}")
-            df[staging_cols].to_sql(
-                name=staging_table,
-                con=self.engine,
-                schema=schema_name,
-                if_exists='append',
-                index=False
+                log_func(f"⚠️ Could not index key columns: {self._short_exception_message(e)}")
+
+    def _merge_into_final(self, source_table: str, table_name: str, required_cols: Dict, key_columns: list,
+                          schema_name: str, log_func=None, date_format: str = 'UK', converted: bool = False) -> Dict:
+        """
+        MERGE staged rows into the final table on the key columns, touching only new or changed rows
+        
+        Source rows are converted once into a temp table with a HASHBYTES row hash of the
+        non-key columns; rows whose hash equals the stored __row_hash are left untouched.
+        When a key occurs more than once in the file the last row (highest __row_id) wins,
+        and rows with a NULL key are skipped.
+        
+        Args:
+            source_table: Staging table (NVARCHAR) or typed table when converted=True
+            table_name: Final table name
+            required_cols: Required columns and data types
+            key_columns: Business key columns
+            schema_name: Database schema name
+            log_func: Function for logging
+            date_format: Date format for staging conversion
+            converted: Whether the source already holds converted values
+            
+        Returns:
+            Dict: {'source', 'skipped', 'inserted', 'updated', 'unchanged'} row counts
+        """
+        row_id_col = DatabaseConstants.STAGING_ROW_ID_COLUMN
+        hash_col = DatabaseConstants.ROW_HASH_COLUMN
+        data_cols = [c for c in required_cols.keys() if c != 'updated_at']
+        non_key_cols = [c for c in data_cols if c not in key_columns]
+        
+        if converted:
+            source_exprs = [f"[{c}]" for c in data_cols]
+        else:
+            source_exprs = [f"{get_conversion_expression(c, required_cols[c], date_format)} AS [{c}]" for c in data_cols]
+        row_hash = get_row_hash_expression({c: required_cols[c] for c in non_key_cols})
+        
+        cols_sql = ", ".join([f"[{c}]" for c in data_cols])
+        keys_sql = ", ".join([f"[{k}]" for k in key_columns])
+        update_sql = ", ".join(
+            [f"t.[{c}] = s.[{c}]" for c in non_key_cols]
+            + [f"t.[{hash_col}] = s.[{hash_col}]", "t.[updated_at] = GETDATE()"]
+        )
+        insert_values = ", ".join([f"s.[{c}]" for c in data_cols] + [f"s.[{hash_col}]", "GETDATE()"])
+        
+        merge_sql = f"""
+            SET NOCOUNT ON;
+            DECLARE @actions TABLE ([action] NVARCHAR(10));
+            DECLARE @source_rows BIGINT, @distinct_rows BIGINT;
+            IF OBJECT_ID('tempdb..#upsert_src') IS NOT NULL DROP TABLE #upsert_src;
+            
+            SELECT @source_rows = COUNT(*) FROM {schema_name}.{source_table};
+            
+            SELECT {cols_sql}, {row_hash} AS [{hash_col}]
+            INTO #upsert_src
+            FROM (
+                SELECT d.*, ROW_NUMBER() OVER (PARTITION BY {keys_sql} ORDER BY d.[{row_id_col}] DESC) AS [__rn]
+                FROM (SELECT {', '.join(source_exprs)}, [{row_id_col}] FROM {schema_name}.{source_table}) AS d
+                WHERE {' AND '.join([f"d.[{k}] IS NOT NULL" for k in key_columns])}
+            ) AS r
+            WHERE r.[__rn] = 1;
+            SET @distinct_rows = @@ROWCOUNT;
+            
+            MERGE {schema_name}.{table_name} AS t
+            USING #upsert_src AS s
+                ON {' AND '.join([f"t.[{k}] = s.[{k}]" for k in key_columns])}
+            WHEN MATCHED AND (t.[{hash_col}] IS NULL OR t.[{hash_col}] <> s.[{hash_col}]) THEN
+                UPDATE SET {update_sql}
+            WHEN NOT MATCHED BY TARGET THEN
+                INSERT ({cols_sql}, [{hash_col}], [updated_at]) VALUES ({insert_values})
+            OUTPUT $action INTO @actions;
+            
+            DROP TABLE #upsert_src;
+            
+            SELECT @source_rows, @distinct_rows,
+                   (SELECT COUNT(*) FROM @actions WHERE [action] = 'INSERT'),
+                   (SELECT COUNT(*) FROM @actions WHERE [action] = 'UPDATE');
+        """
+        
+        start_time = time.time()
+        with self.engine.begin() as conn:
+            source_rows, distinct_rows, inserted, updated = conn.execute(text(merge_sql)).fetchone()
+        
+        counts = {
+            'source': source_rows,
+            'skipped': source_rows - distinct_rows,
+            'inserted': inserted,
+            'updated': updated,
+            'unchanged': distinct_rows - inserted - updated,
+        }
+        if log_func:
+            log_func(
+                f"✅ Upsert completed in {time.time() - start_time:.1f} seconds: "
+                f"{counts['inserted']:,} inserted, {counts['updated']:,} updated, {counts['unchanged']:,} unchanged"
+            )
+            if counts['skipped']:
+                log_func(f"⚠️ Skipped {counts['skipped']:,} rows with a NULL or duplicate key (last row per key wins)")
+        return counts
+
+    def _get_reload_mode(self) -> str:
+        """Reload mode for clear_existing uploads from app settings ('truncate' or 'shadow')"""
+        try:
+            return json_manager.get('app_settings', 'reload_mode', 'truncate')
+        except Exception:
+            return 'truncate'
+
+    def _drop_table_if_exists(self, table_name: str, schema_name: str):
+        """Drop a table if it exists"""
+        with self.engine.begin() as conn:
+            conn.execute(text(f"""
+                IF OBJECT_ID('{schema_name}.{table_name}', 'U') IS NOT NULL
+                    DROP TABLE {schema_name}.{table_name};
+            """))
+
+    def _swap_shadow_table(self, table_name: str, shadow_table: str, required_cols: Dict, schema_name: str,
+                           needs_recreate: bool, log_func=None):
+        """
+        Replace the live table with the loaded shadow table using metadata-only operations
+        
+        - Live table with the same structure: ALTER of differing column types + TRUNCATE +
+          ALTER TABLE ... SWITCH in one transaction (keeps the live table's indexes, permissions
+          and dependencies; nothing is changed when the SWITCH is not possible)
+        - Otherwise (new table, recreate, or SWITCH not possible): sp_rename inside one transaction.
+          The shadow table already has the live table's indexes and constraints
+          (_copy_table_objects); object permissions are granted again and the constraint
+          names are restored in the same transaction.
+        """
+        insp = inspect(self.engine)
+        live_exists = insp.has_table(table_name, schema=schema_name)
+
+        if live_exists and not needs_recreate:
+            try:
+                with self.engine.begin() as conn:
+                    # SWITCH ต้องการชนิดคอลัมน์ตรงกัน ปรับตารางจริงใน transaction เดียวกัน ถ้า SWITCH ไม่ได้จะ rollback ทั้งหมด
+                    self._alter_column_types(conn, table_name, required_cols, schema_name, log_func)
+                    conn.execute(text(f"TRUNCATE TABLE {schema_name}.{table_name}"))
+                    conn.execute(text(f"ALTER TABLE {schema_name}.{shadow_table} SWITCH TO {schema_name}.{table_name}"))
+                self._drop_table_if_exists(shadow_table, schema_name)
+                if log_func:
+                    log_func(f"🔀 Switched shadow table into {schema_name}.{table_name}")
+                return
+            except Exception as e:
+                if log_func:
+                    log_func(f"⚠️ SWITCH not possible ({self._short_exception_message(e)}) - swapping by rename")
+
+        old_table = f"{table_name}__old"
+        self._drop_table_if_exists(old_table, schema_name)
+        permission_sqls = self._script_table_permissions(table_name, schema_name) if live_exists else []
+        suffix = DatabaseConstants.SHADOW_CONSTRAINT_SUFFIX
+        with self.engine.begin() as conn:
+            if live_exists:
+                conn.execute(text(f"EXEC sp_rename '{schema_name}.{table_name}', '{old_table}'"))
+            conn.execute(text(f"EXEC sp_rename '{schema_name}.{shadow_table}', '{table_name}'"))
+            for permission_sql in permission_sqls:
+                conn.execute(text(permission_sql.format(table=f"{schema_name}.{table_name}")))
+            if live_exists:
+                # ลบตารางเดิมก่อน ชื่อ constraint เดิมจึงว่างให้ตั้งกลับได้
+                conn.execute(text(f"DROP TABLE {schema_name}.{old_table}"))
+            constraint_names = conn.execute(text("""
+                SELECT name FROM sys.objects
+                WHERE parent_object_id = OBJECT_ID(:full_name) AND type IN ('PK', 'UQ', 'C', 'D')
+                  AND RIGHT(name, :suffix_len) = :suffix
+            """), {'full_name': f"{schema_name}.{table_name}", 'suffix': suffix, 'suffix_len': len(suffix)}).fetchall()
+            for (constraint_name,) in constraint_names:
+                original_name = constraint_name[:-len(suffix)]
+                conn.execute(text(f"EXEC sp_rename '{schema_name}.{constraint_name}', '{original_name}', 'OBJECT'"))
+        if log_func:
+            log_func(f"🔀 Renamed shadow table to {schema_name}.{table_name}")
+            if permission_sqls:
+                log_func(f"🔐 Re-applied {len(permission_sqls)} permission(s) on {schema_name}.{table_name}")
+
+    def _copy_table_objects(self, source_table: str, target_table: str, schema_name: str, log_func=None):
+        """
+        Create the indexes, primary key/unique, check and default constraints of source_table on target_table
+        
+        Constraint names are schema-wide, so the copies get DatabaseConstants.SHADOW_CONSTRAINT_SUFFIX.
+        Objects that cannot be copied (e.g. on a column that no longer exists) and triggers
+        or foreign keys (never copied) are reported in the log.
+        """
+        full_name = f"{schema_name}.{source_table}"
+        target = f"{schema_name}.{target_table}"
+        suffix = DatabaseConstants.SHADOW_CONSTRAINT_SUFFIX
+        with self.engine.connect() as conn:
+            if conn.execute(text("SELECT OBJECT_ID(:full_name, 'U')"), {'full_name': full_name}).scalar() is None:
+                return
+            index_rows = conn.execute(text("""
+                SELECT i.index_id, i.name, i.type_desc, i.is_unique, i.is_primary_key, i.is_unique_constraint,
+                       i.filter_definition, c.name AS column_name, ic.is_descending_key, ic.is_included_column
+                FROM sys.indexes i
+                JOIN sys.index_columns ic ON ic.object_id = i.object_id AND ic.index_id = i.index_id
+                JOIN sys.columns c ON c.object_id = ic.object_id AND c.column_id = ic.column_id
+                WHERE i.object_id = OBJECT_ID(:full_name) AND i.type IN (1, 2)
+                ORDER BY i.index_id, ic.is_included_column, ic.key_ordinal, ic.index_column_id
+            """), {'full_name': full_name}).fetchall()
+            check_rows = conn.execute(text(
+                "SELECT name, definition FROM sys.check_constraints WHERE parent_object_id = OBJECT_ID(:full_name)"
+            ), {'full_name': full_name}).fetchall()
+            default_rows = conn.execute(text("""
+                SELECT dc.name, dc.definition, c.name
+                FROM sys.default_constraints dc
+                JOIN sys.columns c ON c.object_id = dc.parent_object_id AND c.column_id = dc.parent_column_id
+                WHERE dc.parent_object_id = OBJECT_ID(:full_name)
+            """), {'full_name': full_name}).fetchall()
+            not_copied = conn.execute(text("""
+                SELECT (SELECT COUNT(*) FROM sys.triggers WHERE parent_id = OBJECT_ID(:full_name)),
+                       (SELECT COUNT(*) FROM sys.foreign_keys
+                        WHERE parent_object_id = OBJECT_ID(:full_name) OR referenced_object_id = OBJECT_ID(:full_name))
+            """), {'full_name': full_name}).fetchone()
+
+        indexes = {}
+        for row in index_rows:
+            index = indexes.setdefault(row.index_id, {'row': row, 'keys': [], 'included': []})
+            if row.is_included_column:
+                index['included'].append(f"[{row.column_name}]")
+            else:
+                index['keys'].append(f"[{row.column_name}]{' DESC' if row.is_descending_key else ''}")
+
+        statements = []
+        for index in indexes.values():
+            row = index['row']
+            kind = 'CLUSTERED' if row.type_desc == 'CLUSTERED' else 'NONCLUSTERED'
+            keys = ", ".join(index['keys'])
+            if row.is_primary_key or row.is_unique_constraint:
+                constraint = 'PRIMARY KEY' if row.is_primary_key else 'UNIQUE'
+                sql = f"ALTER TABLE {target} ADD CONSTRAINT [{row.name}{suffix}] {constraint} {kind} ({keys})"
+            else:
+                sql = f"CREATE {'UNIQUE ' if row.is_unique else ''}{kind} INDEX [{row.name}] ON {target} ({keys})"
+                if index['included']:
+                    sql += f" INCLUDE ({', '.join(index['included'])})"
+                if row.filter_definition:
+                    sql += f" WHERE {row.filter_definition}"
+            statements.append((row.name, sql))
+        for name, definition in check_rows:
+            statements.append((name, f"ALTER TABLE {target} ADD CONSTRAINT [{name}{suffix}] CHECK {definition}"))
+        for name, definition, column_name in default_rows:
+            statements.append((name, f"ALTER TABLE {target} ADD CONSTRAINT [{name}{suffix}] DEFAULT {definition} FOR [{column_name}]"))
+
+        copied = 0
+        for name, sql in statements:
+            try:
+                with self.engine.begin() as conn:
+                    conn.execute(text(sql))
+                copied += 1
+            except Exception as e:
+                if log_func:
+                    log_func(f"⚠️ Could not copy {name} to {target}: {self._short_exception_message(e)}")
+        if log_func and copied:
+            log_func(f"📑 Copied {copied} index(es)/constraint(s) of {full_name} to {target}")
+        if log_func and not_copied and (not_copied[0] or not_copied[1]):
+            log_func(
+                f"⚠️ {not_copied[0]} trigger(s) and {not_copied[1]} foreign key(s) of {full_name} are not copied; "
+                f"they stay only if the shadow table can be switched in"
             )
 
+    def _script_table_permissions(self, table_name: str, schema_name: str) -> list:
+        """
+        GRANT/DENY statements for the object permissions of a table
+        
+        Returns:
+            list: Statements with a {table} placeholder for the table they are applied to
+        """
+        with self.engine.connect() as conn:
+            rows = conn.execute(text("""
+                SELECT p.state_desc, p.permission_name, pr.name
+                FROM sys.database_permissions p
+                JOIN sys.database_principals pr ON pr.principal_id = p.grantee_principal_id
+                WHERE p.class = 1 AND p.major_id = OBJECT_ID(:full_name) AND p.minor_id = 0
+            """), {'full_name': f"{schema_name}.{table_name}"}).fetchall()
+        statements = []
+        for state, permission, grantee in rows:
+            if state == 'GRANT_WITH_GRANT_OPTION':
+                statements.append(f"GRANT {permission} ON {{table}} TO [{grantee}] WITH GRANT OPTION")
+            else:
+                statements.append(f"{state} {permission} ON {{table}} TO [{grantee}]")
+        return statements
+
     def _create_or_recreate_final_table(self, table_name: str, required_cols: Dict, schema_name: str, 
                                       needs_recreate: bool, log_func, df, clear_existing: bool = True):
         """Create or recreate final table based on dtype config"""
@@ -407,19 +1286,7 @@ class DataUploadService:
             elif log_func:
                 log_func(f"📋 Creating table {schema_name}.{table_name} from data type settings")
             
-            # สร้าง empty DataFrame ที่มีเฉพาะคอลัมน์ที่มีอยู่ใน df (ไม่รวม updated_at)
-            df_cols = [col for col in required_cols.keys() if col != 'updated_at']
-            df.head(0)[df_cols].to_sql(
-                name=table_name,
-                con=self.engine,
-                schema=schema_name,
-                if_exists='replace',
-                index=False,
-                dtype={col: required_cols[col] for col in df_cols}
-            )
-            # เพิ่ม updated_at column ด้วย SQL
-            with self.engine.begin() as conn:
-                conn.execute(text(f"ALTER TABLE {schema_name}.{table_name} ADD [updated_at] DATETIME2 NULL"))
+            self._create_table_from_config(table_name, required_cols, schema_name, df)
         else:
             # แก้ไขชนิดข้อมูลสำหรับตารางที่มีอยู่แล้ว
             self._fix_column_types(table_name, required_cols, schema_name, log_func)
@@ -435,86 +1302,491 @@ class DataUploadService:
     def _transfer_data_from_staging(self, staging_table: str, table_name: str, required_cols: Dict, 
                                   schema_name: str, log_func=None, date_format: str = 'UK'):
         """Transfer data from staging to final table with type conversion"""
+        select_exprs = []
+        for col_name, sa_type in required_cols.items():
+            if col_name == 'updated_at':
+                # ใช้ GETDATE() สำหรับ updated_at แทนการเพิ่มใน Python
+                select_exprs.append(f"GETDATE() AS [{col_name}]")
+            else:
+                select_exprs.append(f"{get_conversion_expression(col_name, sa_type, date_format)} AS [{col_name}]")
+
+        self._run_transfer(staging_table, table_name, required_cols, ", ".join(select_exprs), schema_name, log_func)
+
+    def _run_transfer(self, source_table: str, table_name: str, required_cols: Dict, select_sql: str,
+                      schema_name: str, log_func=None):
+        """
+        Run INSERT ... SELECT from source table to final table
+        
+        With transfer_batch_size > 0 (opt-in) the rows are copied in __row_id ranges, one committed
+        transaction per batch. The last committed __row_id is stored in the progress control
+        table in the same transaction, so an interrupted transfer resumes after it.
         
+        Batches are not atomic as a whole: when a batched transfer fails, the target table keeps
+        the committed batches until resume_transfer() (auto_process_cli.py --resume) completes
+        it. With reload_mode 'shadow' only the shadow table is partly loaded, the live table
+        is untouched. Without batching the single INSERT ... SELECT rolls back completely.
+        """
         # Get row count for progress monitoring
         try:
             with self.engine.connect() as conn:
-                result = conn.execute(text(f"SELECT COUNT(*) FROM {schema_name}.{staging_table}"))
-                total_rows = result.scalar()
+                result = conn.execute(text(
+                    f"SELECT COUNT(*), MAX([{DatabaseConstants.STAGING_ROW_ID_COLUMN}]) FROM {schema_name}.{source_table}"
+                ))
+                total_rows, max_row_id = result.fetchone()
                 if log_func:
                     log_func(f"📊 Preparing to transfer {total_rows:,} rows with type conversion")
         except Exception as e:
             if log_func:
                 log_func(f"⚠️ Could not get row count: {e}")
-            total_rows = "unknown"
-        def _sql_type_and_expr(col_name: str, sa_type_obj) -> str:
-            col_ref = f"[{col_name}]"
-            # Basic cleaning for most data types
-            base = f"NULLIF(LTRIM(RTRIM({col_ref})), '')"
-            
-            if isinstance(sa_type_obj, (SA_Integer, SA_SmallInteger)):
-                # Use shared numeric cleaning function for consistency
-                cleaned = get_numeric_cleaning_expression(col_name)
-                return f"TRY_CONVERT(INT, {cleaned})"
-            if isinstance(sa_type_obj, SA_Float):
-                # Use shared numeric cleaning function for consistency
-                cleaned = get_numeric_cleaning_expression(col_name)
-                return f"TRY_CONVERT(FLOAT, {cleaned})"
-            if isinstance(sa_type_obj, SA_DECIMAL):
-                precision = getattr(sa_type_obj, 'precision', 18) or 18
-                scale = getattr(sa_type_obj, 'scale', 2) or 2
-                # Use shared numeric cleaning function for consistency
-                cleaned = get_numeric_cleaning_expression(col_name)
-                return f"TRY_CONVERT(DECIMAL({precision},{scale}), {cleaned})"
-            if isinstance(sa_type_obj, (SA_DATE, SA_DateTime)):
-                # Enhanced date cleaning to handle tab characters and special characters
-                date_cleaned = f"NULLIF(LTRIM(RTRIM(REPLACE(REPLACE(REPLACE({col_ref}, CHAR(9), ''), CHAR(10), ''), CHAR(13), ''))), '')"
+            total_rows, max_row_id = "unknown", None
+
+        # TABLOCK ทำให้ SQL Server log แบบ minimal ได้เมื่อปลายทางเป็น heap หรือตารางว่าง
+        table_hint = " WITH (TABLOCK)" if self._is_bulk_load_mode() else ""
+        insert_sql = (
+            f"INSERT INTO {schema_name}.{table_name}{table_hint} (" + ", ".join([f"[{c}]" for c in required_cols.keys()]) + ") "
+            f"SELECT {select_sql} FROM {schema_name}.{source_table}"
+        )
+
+        batch_size = self._get_transfer_batch_size()
+        if batch_size <= 0 or max_row_id is None:
+            with self.engine.begin() as conn:
+                if log_func:
+                    log_func(f"📝 Executing data transfer with type conversion...")
+                    log_func(f"⏳ This may take a while for large datasets, please wait...")
                 
-                if date_format == 'UK':  # DD-MM format priority
-                    return f"COALESCE(TRY_CONVERT(DATETIME, {date_cleaned}, 103), TRY_CONVERT(DATETIME, {date_cleaned}, 121), TRY_CONVERT(DATETIME, {date_cleaned}, 101))"
-                else:  # US format - MM-DD priority
-                    return f"COALESCE(TRY_CONVERT(DATETIME, {date_cleaned}, 101), TRY_CONVERT(DATETIME, {date_cleaned}, 121), TRY_CONVERT(DATETIME, {date_cleaned}, 103))"
-            if isinstance(sa_type_obj, SA_Boolean):
-                return (
-                    "CASE "
-                    f"WHEN UPPER(LTRIM(RTRIM({col_ref}))) IN ('1','TRUE','Y','YES') THEN 1 "
-                    f"WHEN UPPER(LTRIM(RTRIM({col_ref}))) IN ('0','FALSE','N','NO') THEN 0 "
-                    "ELSE NULL END"
-                )
-            target = 'NVARCHAR(MAX)' if isinstance(sa_type_obj, SA_Text) else str(sa_type_obj).upper()
-            return f"TRY_CONVERT({target}, {col_ref})"
+                start_time = time.time()
+                try:
+                    conn.execute(text(insert_sql))
+                    execution_time = time.time() - start_time
+                    if log_func:
+                        log_func(f"✅ Data transfer completed successfully in {execution_time:.1f} seconds")
+                except Exception as e:
+                    execution_time = time.time() - start_time
+                    if log_func:
+                        log_func(f"❌ Data transfer failed after {execution_time:.1f} seconds: {str(e)[:100]}...")
+                    raise
+            return
 
-        select_exprs = []
-        for col_name, sa_type in required_cols.items():
-            if col_name == 'updated_at':
-                # ใช้ GETDATE() สำหรับ updated_at แทนการเพิ่มใน Python
-                select_exprs.append(f"GETDATE() AS [{col_name}]")
-            else:
-                select_exprs.append(f"{_sql_type_and_expr(col_name, sa_type)} AS [{col_name}]")
-        select_sql = ", ".join(select_exprs)
+        self._run_batched_transfer(
+            source_table, table_name, insert_sql, schema_name, batch_size, max_row_id, log_func
+        )
 
+    def _run_batched_transfer(self, source_table: str, table_name: str, insert_sql: str, schema_name: str,
+                              batch_size: int, max_row_id: int, log_func=None):
+        """Copy __row_id ranges of batch_size rows, committing progress with every batch"""
+        row_id_col = DatabaseConstants.STAGING_ROW_ID_COLUMN
+        progress_table = f"{schema_name}.{DatabaseConstants.TRANSFER_PROGRESS_TABLE}"
+
+        self._ensure_transfer_progress_table(schema_name)
         with self.engine.begin() as conn:
-            insert_sql = (
-                f"INSERT INTO {schema_name}.{table_name} (" + ", ".join([f"[{c}]" for c in required_cols.keys()]) + ") "
-                f"SELECT {select_sql} FROM {schema_name}.{staging_table}"
+            row = conn.execute(text(
+                f"SELECT last_row_id, rows_transferred FROM {progress_table} "
+                f"WHERE source_table = :source AND target_table = :target"
+            ), {'source': source_table, 'target': table_name}).fetchone()
+            last_row_id, rows_done = (int(row[0]), int(row[1])) if row else (0, 0)
+            if not row:
+                conn.execute(text(
+                    f"INSERT INTO {progress_table} (source_table, target_table, last_row_id, rows_transferred, updated_at) "
+                    f"VALUES (:source, :target, 0, 0, SYSDATETIME())"
+                ), {'source': source_table, 'target': table_name})
+            # ดัชนีบน __row_id ทำให้แต่ละ batch อ่านเฉพาะช่วงของตัวเอง แทนการ scan ทั้งตาราง
+            conn.execute(text(f"""
+                IF NOT EXISTS (SELECT 1 FROM sys.indexes
+                               WHERE object_id = OBJECT_ID('{schema_name}.{source_table}') AND name = 'CIX_{source_table}_row_id')
+                    CREATE CLUSTERED INDEX [CIX_{source_table}_row_id] ON {schema_name}.{source_table} ([{row_id_col}]);
+            """))
+
+        if last_row_id > 0 and log_func:
+            log_func(f"⏩ Resuming transfer after row {last_row_id:,} ({rows_done:,} rows already committed)")
+
+        if log_func:
+            log_func(f"📝 Transferring in batches of {batch_size:,} rows...")
+
+        transfer_start = time.time()
+        while last_row_id < max_row_id:
+            batch_end = last_row_id + batch_size
+            batch_start_time = time.time()
+            with self.engine.begin() as conn:
+                result = conn.execute(text(
+                    f"{insert_sql} WHERE [{row_id_col}] > :start_id AND [{row_id_col}] <= :end_id"
+                ), {'start_id': last_row_id, 'end_id': batch_end})
+                batch_rows = max(result.rowcount or 0, 0)
+                conn.execute(text(
+                    f"UPDATE {progress_table} SET last_row_id = :end_id, "
+                    f"rows_transferred = rows_transferred + :rows, updated_at = SYSDATETIME() "
+                    f"WHERE source_table = :source AND target_table = :target"
+                ), {'end_id': batch_end, 'rows': batch_rows, 'source': source_table, 'target': table_name})
+            last_row_id = batch_end
+            rows_done += batch_rows
+            self._report_phase(FileConstants.PHASE_VALIDATED, source_table=source_table, committed_row_id=last_row_id)
+
+            if log_func:
+                elapsed = time.time() - batch_start_time
+                rate = batch_rows / elapsed if elapsed > 0 else 0
+                progress = min(last_row_id / max_row_id, 1.0) * 100
+                log_func(f"📦 Transferred batch: {batch_rows:,} rows ({rate:,.0f} rows/sec) - {rows_done:,} total ({progress:.1f}%)")
+
+        self._clear_transfer_progress(table_name, schema_name)
+        if log_func:
+            log_func(f"✅ Data transfer completed successfully in {time.time() - transfer_start:.1f} seconds")
+
+    def _is_bulk_load_mode(self) -> bool:
+        """Whether the opt-in minimal-logging bulk load mode is enabled in app settings"""
+        try:
+            return bool(json_manager.get('app_settings', 'bulk_load_mode', False))
+        except Exception:
+            return False
+
+    def _transfer_with_load_mode(self, transfer, table_name: str, schema_name: str, log_func=None,
+                                 recover_disabled: bool = False):
+        """
+        Run a transfer callable, wrapped in the bulk load steps when bulk_load_mode is on
+        
+        Bulk load mode disables the final table's non-unique nonclustered indexes before the
+        transfer, rebuilds them and updates statistics once afterwards (also when the transfer
+        fails), and reports the transaction log bytes flushed during the load. Nonclustered
+        indexes already disabled, e.g. by a load that crashed before its rebuild, are rebuilt too.
+        
+        Args:
+            recover_disabled: Rebuild the nonclustered indexes left disabled by an interrupted
+                load even when bulk_load_mode is off now (resume)
+        
+        Raises:
+            RuntimeError: When an index could not be rebuilt and stays disabled
+        """
+        bulk_load = self._is_bulk_load_mode()
+        if not bulk_load and not recover_disabled:
+            transfer()
+            return
+
+        log_bytes_start = None
+        if bulk_load:
+            if log_func:
+                log_func(f"🚀 Bulk load mode: TABLOCK inserts, non-unique nonclustered indexes disabled during transfer")
+            log_bytes_start = self._get_log_bytes_flushed()
+        rebuild_indexes = self._disable_nonclustered_indexes(table_name, schema_name, log_func, disable=bulk_load)
+        if not rebuild_indexes and not bulk_load:
+            transfer()
+            return
+        try:
+            transfer()
+        finally:
+            # index ที่ถูก disable ต้อง rebuild เสมอ แม้ load ล้มเหลวหรือถูกยกเลิก
+            with cancellation_scope(None):
+                still_disabled = self._rebuild_indexes_and_statistics(table_name, schema_name, rebuild_indexes, log_func)
+        # ถึงตรงนี้เมื่อ transfer สำเร็จเท่านั้น (error ของ transfer ไม่ถูกบัง)
+        if still_disabled:
+            raise RuntimeError(
+                f"Index(es) still disabled on {schema_name}.{table_name} after the load: {', '.join(still_disabled)}"
             )
+        if not bulk_load:
+            return
+
+        log_bytes_end = self._get_log_bytes_flushed()
+        if log_func:
+            if log_bytes_start is not None and log_bytes_end is not None:
+                log_func(f"🧾 Transaction log flushed during load: {format_file_size(max(log_bytes_end - log_bytes_start, 0))}")
+            else:
+                log_func(f"ℹ️ Transaction log usage not available (requires VIEW SERVER STATE permission)")
+
+    def _disable_nonclustered_indexes(self, table_name: str, schema_name: str, log_func=None,
+                                      disable: bool = True) -> list:
+        """
+        Disable the non-unique nonclustered indexes of the final table
+        
+        Unique indexes (also those of primary key / unique constraints) stay enabled, so
+        duplicates are still rejected during the load. Nonclustered indexes that are already
+        disabled are left by an interrupted load and are returned to be rebuilt as well.
+        
+        Args:
+            disable: False only collects the indexes already disabled
+        
+        Returns:
+            list: Names of the indexes to rebuild after the load
+        """
+        try:
+            with self.engine.begin() as conn:
+                rows = conn.execute(text("""
+                    SELECT i.name, i.is_disabled, i.is_unique
+                    FROM sys.indexes i
+                    WHERE i.object_id = OBJECT_ID(:full_name)
+                      AND i.type_desc = 'NONCLUSTERED'
+                      AND i.is_primary_key = 0
+                      AND i.is_unique_constraint = 0
+                """), {'full_name': f"{schema_name}.{table_name}"}).fetchall()
+                left_disabled = [row[0] for row in rows if row[1]]
+                index_names = [row[0] for row in rows if disable and not row[1] and not row[2]]
+                for index_name in index_names:
+                    conn.execute(text(f"ALTER INDEX [{index_name}] ON {schema_name}.{table_name} DISABLE"))
+            if log_func and left_disabled:
+                log_func(
+                    f"🔧 {len(left_disabled)} index(es) on {schema_name}.{table_name} were left disabled by an "
+                    f"interrupted load, they are rebuilt after this transfer"
+                )
+            if log_func and index_names:
+                log_func(f"⏸️ Disabled {len(index_names)} nonclustered index(es) on {schema_name}.{table_name}")
+            return left_disabled + index_names
+        except Exception as e:
             if log_func:
-                log_func(f"📝 Executing data transfer with type conversion...")
-                log_func(f"⏳ This may take a while for large datasets, please wait...")
-            
-            # Execute with timeout monitoring
-            import time
-            start_time = time.time()
+                log_func(f"⚠️ Could not disable indexes: {e}")
+            return []
+
+    def _rebuild_indexes_and_statistics(self, table_name: str, schema_name: str, disabled_indexes: list,
+                                        log_func=None) -> list:
+        """
+        Rebuild indexes disabled for the load (one statement each) and update statistics once
+        
+        Returns:
+            list: Names of the indexes that could not be rebuilt and are still disabled
+        """
+        start_time = time.time()
+        still_disabled = []
+        # rebuild แยกทีละ statement: index ที่ล้มเหลวไม่ทำให้ index อื่น rollback ไปด้วย
+        for index_name in disabled_indexes:
             try:
-                result = conn.execute(text(insert_sql))
-                execution_time = time.time() - start_time
-                if log_func:
-                    log_func(f"✅ Data transfer completed successfully in {execution_time:.1f} seconds")
+                with self.engine.begin() as conn:
+                    conn.execute(text(f"ALTER INDEX [{index_name}] ON {schema_name}.{table_name} REBUILD"))
             except Exception as e:
-                execution_time = time.time() - start_time
+                still_disabled.append(index_name)
                 if log_func:
-                    log_func(f"❌ Data transfer failed after {execution_time:.1f} seconds: {str(e)[:100]}...")
-                raise
+                    log_func(f"❌ Could not rebuild index {index_name} on {schema_name}.{table_name}: {self._short_exception_message(e)}")
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(text(f"UPDATE STATISTICS {schema_name}.{table_name}"))
+        except Exception as e:
+            if log_func:
+                log_func(f"⚠️ Could not update statistics on {schema_name}.{table_name}: {e}")
+        if log_func:
+            rebuilt = len(disabled_indexes) - len(still_disabled)
+            log_func(f"🔧 Rebuilt {rebuilt} index(es) and updated statistics in {time.time() - start_time:.1f} seconds")
+        return still_disabled
+
+    def _get_log_bytes_flushed(self):
+        """
+        Cumulative 'Log Bytes Flushed/sec' counter of the current database
+        
+        Returns:
+            Optional[int]: Bytes flushed so far, or None without VIEW SERVER STATE permission
+        """
+        try:
+            with self.engine.connect() as conn:
+                value = conn.execute(text("""
+                    SELECT cntr_value
+                    FROM sys.dm_os_performance_counters
+                    WHERE counter_name = 'Log Bytes Flushed/sec'
+                      AND instance_name = DB_NAME()
+                """)).scalar()
+            return int(value) if value is not None else None
+        except Exception:
+            return None
+
+    def _get_transfer_batch_size(self) -> int:
+        """Transfer batch size from app settings (0 disables batching)"""
+        try:
+            return int(json_manager.get('app_settings', 'transfer_batch_size', DatabaseConstants.TRANSFER_BATCH_SIZE))
+        except Exception:
+            return DatabaseConstants.TRANSFER_BATCH_SIZE
+
+    def _ensure_transfer_progress_table(self, schema_name: str):
+        """
+        Create transfer progress control table if it doesn't exist
+        
+        Runs in its own committed transaction under a class-level lock; error 2714 (created
+        meanwhile by another process) is ignored.
+        """
+        progress_table = DatabaseConstants.TRANSFER_PROGRESS_TABLE
+        with self._progress_table_lock, self.engine.begin() as conn:
+            conn.execute(text(f"""
+                IF OBJECT_ID('{schema_name}.{progress_table}', 'U') IS NULL
+                BEGIN TRY
+                    CREATE TABLE {schema_name}.{progress_table} (
+                        source_table NVARCHAR(256) NOT NULL,
+                        target_table NVARCHAR(256) NOT NULL,
+                        last_row_id BIGINT NOT NULL,
+                        rows_transferred BIGINT NOT NULL,
+                        updated_at DATETIME2 NOT NULL,
+                        CONSTRAINT PK_{progress_table} PRIMARY KEY (target_table, source_table)
+                    );
+                END TRY
+                BEGIN CATCH
+                    IF ERROR_NUMBER() <> 2714 THROW;
+                END CATCH
+            """))
+
+    def _clear_transfer_progress(self, table_name: str, schema_name: str):
+        """Forget transfer progress of a target table (new load or finished transfer)"""
+        progress_table = DatabaseConstants.TRANSFER_PROGRESS_TABLE
+        with self.engine.begin() as conn:
+            conn.execute(text(f"""
+                IF OBJECT_ID('{schema_name}.{progress_table}', 'U') IS NOT NULL
+                    DELETE FROM {schema_name}.{progress_table} WHERE target_table IN (:target, :shadow);
+            """), {'target': table_name, 'shadow': f"{table_name}__shadow"})
+
+    @_cancellable
+    def resume_transfer(self, logic_type: str, required_cols: Dict, schema_name: str = 'bronze', log_func=None,
+                        phase_callback=None):
+        """
+        Resume an interrupted batched transfer from the last committed batch
+        
+        Args:
+            logic_type: File type
+            required_cols: Required columns and data types
+            schema_name: Database schema name
+            log_func: Function for logging
+            phase_callback: Same as in upload_data
+            cancel_token: Same as in upload_data
+            
+        Returns:
+            Tuple[bool, str]: (Success status, Result message)
+        """
+        table_name = None
+        table_lock = None
+        self.last_upload = {}
+        self._phase.callback = phase_callback
+        try:
+            self._load_dtype_settings()
+            table_name = self._resolve_table_name(logic_type)
+            table_lock = self._acquire_table_lock(schema_name, table_name, log_func)
+            required_cols['updated_at'] = DateTime()
+            progress_table = DatabaseConstants.TRANSFER_PROGRESS_TABLE
+
+            row = None
+            if inspect(self.engine).has_table(progress_table, schema=schema_name):
+                with self.engine.connect() as conn:
+                    row = conn.execute(text(
+                        f"SELECT TOP 1 source_table, target_table FROM {schema_name}.{progress_table} "
+                        f"WHERE target_table IN (:target, :shadow)"
+                    ), {'target': table_name, 'shadow': f"{table_name}__shadow"}).fetchone()
+
+            if not row:
+                return False, f"No interrupted transfer found for {schema_name}.{table_name}"
+
+            source_table, target_table = row[0], row[1]
+            if not inspect(self.engine).has_table(source_table, schema=schema_name):
+                self._clear_transfer_progress(table_name, schema_name)
+                return False, f"Source table {schema_name}.{source_table} no longer exists"
+
+            if log_func:
+                log_func(f"🔄 Resuming transfer {schema_name}.{source_table} → {schema_name}.{target_table}")
+
+            if source_table.endswith('__typed'):
+                transfer = lambda: self._transfer_data_from_typed(
+                    source_table, target_table, required_cols, schema_name, log_func
+                )
+            else:
+                transfer = lambda: self._transfer_data_from_staging(
+                    source_table, target_table, required_cols, schema_name, log_func, self._get_date_format(logic_type)
+                )
+            # index ที่ load ที่ค้าง disable ไว้ต้องถูก rebuild แม้ bulk_load_mode จะถูกปิดไปแล้ว
+            self._transfer_with_load_mode(transfer, target_table, schema_name, log_func, recover_disabled=True)
+            if target_table != table_name:
+                self._swap_shadow_table(table_name, target_table, required_cols, schema_name, False, log_func)
+            self.last_upload = {'table': f"{schema_name}.{table_name}", 'rows': None}
+            self._report_phase(FileConstants.PHASE_TRANSFERRED, table=f"{schema_name}.{table_name}")
+            return True, f"Transfer resumed and completed → {schema_name}.{table_name}"
+
+        except Exception as e:
+            if is_cancelled(e):
+                self._cleanup_cancelled_load(table_name, schema_name, log_func)
+                if log_func:
+                    log_func("🛑 Upload cancelled")
+                return False, "Upload cancelled"
+            error_msg = f"Database error: {self._short_exception_message(e)}"
+            if log_func:
+                log_func(f"❌ {error_msg}")
+            return False, error_msg
+        finally:
+            if table_lock is not None:
+                table_lock.release()
+            self._phase.callback = None
+
+    def _resolve_table_name(self, logic_type: str) -> str:
+        """Final table name of a logic type from column settings (falls back to logic type)"""
+        table_name = None
+        try:
+            col_config = load_column_settings()
+            table_name = col_config.get("__table_names__", {}).get(logic_type)
+        except Exception:
+            table_name = None
+        return table_name or logic_type
+
+    def _get_date_format(self, logic_type: str) -> str:
+        """Date format of a logic type from dtype settings ('UK' by default)"""
+        try:
+            return self.dtype_settings.get(logic_type, {}).get('_date_format', 'UK')
+        except Exception:
+            return 'UK'
+
+    def _get_validation_mode(self) -> str:
+        """Validation mode from app settings ('single_pass', 'per_column' or 'fused')"""
+        try:
+            return json_manager.get('app_settings', 'validation_mode', 'single_pass')
+        except Exception:
+            return 'single_pass'
+
+    def _build_typed_table(self, staging_table: str, typed_table: str, required_cols: Dict,
+                           schema_name: str, log_func=None, date_format: str = 'UK') -> list:
+        """
+        Convert staging into a typed table in one pass (each TRY_CONVERT evaluated once per cell)
+        
+        The conversions are computed in a CROSS APPLY and materialized; for every checked column
+        a [__bad_n] column keeps the raw value where conversion failed (NULL otherwise), so
+        validation only has to count non-NULL markers.
+        
+        Returns:
+            list: Checks as dicts {'column', 'validation_type', 'bad_column'}
+        """
+        apply_exprs = []
+        select_exprs = []
+        checks = []
+        for i, (col_name, sa_type) in enumerate(required_cols.items()):
+            if col_name == 'updated_at':
+                continue
+            converted = f"c.[__c{i}]"
+            apply_exprs.append(f"{get_conversion_expression(col_name, sa_type, date_format)} AS [__c{i}]")
+            select_exprs.append(f"{converted} AS [{col_name}]")
+
+            check = get_conversion_check(col_name, sa_type)
+            if check:
+                bad_column = f"__bad_{i}"
+                error_condition = check['error_condition'].format(converted=converted)
+                select_exprs.append(
+                    f"CASE WHEN {error_condition} THEN CAST({check['example_expression']} AS NVARCHAR(4000)) END AS [{bad_column}]"
+                )
+                checks.append({
+                    'column': col_name,
+                    'validation_type': check['validation_type'],
+                    'bad_column': bad_column
+                })
+        select_exprs.append(f"s.[{DatabaseConstants.STAGING_ROW_ID_COLUMN}] AS [{DatabaseConstants.STAGING_ROW_ID_COLUMN}]")
+
+        start_time = time.time()
+        with self.engine.begin() as conn:
+            conn.execute(text(f"""
+                IF OBJECT_ID('{schema_name}.{typed_table}', 'U') IS NOT NULL
+                    DROP TABLE {schema_name}.{typed_table};
+            """))
+            # คอลัมน์ดิบใน staging อ้างอิงได้โดยไม่ต้องระบุ s. เพราะคอลัมน์ของ c ชื่อ __c{n}
+            conn.execute(text(
+                f"SELECT {', '.join(select_exprs)} "
+                f"INTO {schema_name}.{typed_table} "
+                f"FROM {schema_name}.{staging_table} AS s "
+                f"CROSS APPLY (SELECT {', '.join(apply_exprs)}) AS c"
+            ))
+        if log_func:
+            log_func(f"✅ Converted staging to typed table in {time.time() - start_time:.1f} seconds ({len(checks)} checked columns)")
+        return checks
+
+    def _transfer_data_from_typed(self, typed_table: str, table_name: str, required_cols: Dict,
+                                  schema_name: str, log_func=None):
+        """Transfer already converted rows from typed table to final table, then drop typed table"""
+        select_exprs = [
+            "GETDATE()" if col_name == 'updated_at' else f"[{col_name}]"
+            for col_name in required_cols.keys()
+        ]
+        self._run_transfer(typed_table, table_name, required_cols, ", ".join(select_exprs), schema_name, log_func)
+        with self.engine.begin() as conn:
+            conn.execute(text(f"DROP TABLE {schema_name}.{typed_table}"))
 
     def _short_exception_message(self, exc: Exception) -> str:
         """Extract short exception message"""
@@ -58,6 +58,22 @@ class DataValidationService:
             date_format=date_format
         )
     
+    def validate_typed_table(self, typed_table: str, checks: list, schema_name: str = 'bronze',
+                             log_func=None) -> Dict:
+        """
+        Validate conversion results of a typed table built in fused mode
+        
+        Args:
+            typed_table: Typed table name
+            checks: Checks from DataUploadService._build_typed_table
+            schema_name: Schema name
+            log_func: Function for logging
+            
+        Returns:
+            Dict: Validation results {'is_valid': bool, 'issues': [...], 'summary': str}
+        """
+        return self.main_validator.validate_typed_table(typed_table, checks, schema_name, log_func)
+
     def get_validation_statistics(self, staging_table: str, schema_name: str = 'bronze') -> Dict:
         """
         Get validation statistics for a staging table
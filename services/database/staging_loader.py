@@ -0,0 +1,237 @@
+"""
+Staging Loader for PIPELINE_SQLSERVER
+
+Pluggable backends for loading DataFrame chunks into NVARCHAR(MAX) staging tables:
+- PyodbcBulkLoader: raw pyodbc executemany with fast_executemany and explicit setinputsizes
+- ToSqlLoader: pandas DataFrame.to_sql (fallback)
+"""
+
+import logging
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import text
+
+from constants import DatabaseConstants
+from utils.cancellation import register_cursor
+from utils.helpers import frame_to_staging_rows
+
+
+class BaseStagingLoader(ABC):
+    """
+    Abstract base class for staging loaders
+
+    Tracks rows and elapsed time so each backend can report its rows/sec
+    """
+
+    backend_name = "base"
+    chunk_size = DatabaseConstants.STAGING_CHUNK_SIZE
+
+    def __init__(self, engine) -> None:
+        """
+        Initialize staging loader
+
+        Args:
+            engine: SQLAlchemy engine instance
+        """
+        self.engine = engine
+        self.logger = logging.getLogger(__name__)
+        self.total_rows = 0
+        self.total_seconds = 0.0
+
+    @classmethod
+    def is_available(cls, engine) -> bool:
+        """Check whether this backend can be used with the given engine"""
+        return True
+
+    @abstractmethod
+    def _load_chunk(self, chunk, staging_table: str, staging_cols: List[str], schema_name: str) -> int:
+        """
+        Load a single chunk into the staging table
+
+        Returns:
+            int: Number of rows loaded
+        """
+        pass
+
+    def load_chunk(self, chunk, staging_table: str, staging_cols: List[str], schema_name: str) -> int:
+        """
+        Load a single chunk and record throughput statistics
+
+        Args:
+            chunk: DataFrame chunk
+            staging_table: Staging table name
+            staging_cols: Staging columns in insert order
+            schema_name: Schema name
+
+        Returns:
+            int: Number of rows loaded
+        """
+        start_time = time.perf_counter()
+        rows = self._load_chunk(chunk, staging_table, staging_cols, schema_name)
+        self.total_seconds += time.perf_counter() - start_time
+        self.total_rows += rows
+        return rows
+
+    @property
+    def rows_per_second(self) -> float:
+        """Average throughput of all chunks loaded so far"""
+        if self.total_seconds <= 0:
+            return 0.0
+        return self.total_rows / self.total_seconds
+
+    def reset_stats(self) -> None:
+        """Reset throughput statistics"""
+        self.total_rows = 0
+        self.total_seconds = 0.0
+
+    def describe_throughput(self) -> str:
+        """Human-readable throughput summary"""
+        return (
+            f"{self.backend_name}: {self.total_rows:,} rows in {self.total_seconds:.1f}s "
+            f"({self.rows_per_second:,.0f} rows/sec)"
+        )
+
+
+class PyodbcBulkLoader(BaseStagingLoader):
+    """
+    Bulk loader using pyodbc fast_executemany
+
+    Binds every staging column as NVARCHAR(MAX) with setinputsizes so the driver
+    sends one parameter array per batch instead of describing each value
+    """
+
+    backend_name = DatabaseConstants.STAGING_LOADER_PYODBC_BULK
+    chunk_size = DatabaseConstants.STAGING_BULK_CHUNK_SIZE
+
+    @classmethod
+    def is_available(cls, engine) -> bool:
+        """Available only for SQLAlchemy engines using the pyodbc driver"""
+        try:
+            import pyodbc  # noqa: F401
+        except ImportError:
+            return False
+        return getattr(getattr(engine, 'dialect', None), 'driver', None) == 'pyodbc'
+
+    def _load_chunk(self, chunk, staging_table: str, staging_cols: List[str], schema_name: str) -> int:
+        import pyodbc
+
+        rows = frame_to_staging_rows(chunk, staging_cols)
+        if not rows:
+            return 0
+
+        cols_sql = ", ".join([f"[{c}]" for c in staging_cols])
+        placeholders = ", ".join(["?"] * len(staging_cols))
+        insert_sql = f"INSERT INTO {schema_name}.{staging_table} ({cols_sql}) VALUES ({placeholders})"
+
+        raw_conn = self.engine.raw_connection()
+        try:
+            cursor = raw_conn.cursor()
+            try:
+                cursor.fast_executemany = True
+                # ขนาด 0 = NVARCHAR(MAX) ป้องกัน driver เดาขนาดจากแถวแรก
+                cursor.setinputsizes([(pyodbc.SQL_WVARCHAR, 0, 0)] * len(staging_cols))
+                # raw cursor ไม่ผ่าน event ของ engine จึงลงทะเบียนให้ยกเลิกได้เอง
+                with register_cursor(cursor):
+                    cursor.executemany(insert_sql, rows)
+                raw_conn.commit()
+            except Exception:
+                raw_conn.rollback()
+                raise
+            finally:
+                cursor.close()
+        finally:
+            raw_conn.close()
+
+        return len(rows)
+
+
+class ToSqlLoader(BaseStagingLoader):
+    """Fallback loader using pandas DataFrame.to_sql"""
+
+    backend_name = DatabaseConstants.STAGING_LOADER_TO_SQL
+    chunk_size = DatabaseConstants.STAGING_CHUNK_SIZE
+
+    def _load_chunk(self, chunk, staging_table: str, staging_cols: List[str], schema_name: str) -> int:
+        if len(chunk) == 0:
+            return 0
+        chunk[staging_cols].to_sql(
+            name=staging_table,
+            con=self.engine,
+            schema=schema_name,
+            if_exists='append',
+            index=False
+        )
+        return len(chunk)
+
+
+STAGING_LOADERS = {
+    DatabaseConstants.STAGING_LOADER_PYODBC_BULK: PyodbcBulkLoader,
+    DatabaseConstants.STAGING_LOADER_TO_SQL: ToSqlLoader,
+}
+
+
+def create_staging_loader(engine, backend: str = DatabaseConstants.STAGING_LOADER_AUTO) -> BaseStagingLoader:
+    """
+    Create staging loader for the requested backend
+
+    Args:
+        engine: SQLAlchemy engine instance
+        backend: 'auto', 'pyodbc_bulk' or 'to_sql' ('auto' picks bulk when available)
+
+    Returns:
+        BaseStagingLoader: Loader instance (to_sql if the backend is unknown or unavailable)
+    """
+    if backend == DatabaseConstants.STAGING_LOADER_AUTO or backend not in STAGING_LOADERS:
+        backend = DatabaseConstants.STAGING_LOADER_PYODBC_BULK
+
+    loader_cls = STAGING_LOADERS[backend]
+    if not loader_cls.is_available(engine):
+        loader_cls = ToSqlLoader
+    return loader_cls(engine)
+
+
+def benchmark_staging_loaders(engine, df, staging_table: str, staging_cols: List[str],
+                              schema_name: str, log_func: Optional[Callable[[str], None]] = None) -> Dict[str, float]:
+    """
+    Load the same DataFrame with every available backend and measure rows/sec
+
+    The staging table is truncated before each run and after the last one
+
+    Args:
+        engine: SQLAlchemy engine instance
+        df: Sample DataFrame
+        staging_table: Existing staging table name
+        staging_cols: Staging columns
+        schema_name: Schema name
+        log_func: Function for logging
+
+    Returns:
+        Dict[str, float]: rows/sec by backend name
+    """
+    results = {}
+    for backend, loader_cls in STAGING_LOADERS.items():
+        if not loader_cls.is_available(engine):
+            if log_func:
+                log_func(f"⏭️ Skipping {backend}: backend not available")
+            continue
+
+        with engine.begin() as conn:
+            conn.execute(text(f"TRUNCATE TABLE {schema_name}.{staging_table}"))
+
+        loader = loader_cls(engine)
+        try:
+            for i in range(0, len(df), loader.chunk_size):
+                loader.load_chunk(df.iloc[i:i + loader.chunk_size], staging_table, staging_cols, schema_name)
+            results[backend] = loader.rows_per_second
+            if log_func:
+                log_func(f"⏱️ {loader.describe_throughput()}")
+        except Exception as e:
+            if log_func:
+                log_func(f"⚠️ {backend} failed during benchmark: {e}")
+
+    with engine.begin() as conn:
+        conn.execute(text(f"TRUNCATE TABLE {schema_name}.{staging_table}"))
+
+    return results
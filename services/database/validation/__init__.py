@@ -8,6 +8,7 @@ from .date_validator import DateValidator
 from .string_validator import StringValidator
 from .boolean_validator import BooleanValidator
 from .schema_validator import SchemaValidator
+from .single_pass_validator import SinglePassValidator
 from .index_manager import IndexManager
 from .main_validator import MainValidator
 
@@ -18,6 +19,7 @@ __all__ = [
     'StringValidator',
     'BooleanValidator',
     'SchemaValidator',
+    'SinglePassValidator',
     'IndexManager',
     'MainValidator'
 ]
@@ -47,6 +47,44 @@ class BaseValidator(ABC):
         """
         pass
     
+    def get_rule_fragments(self, columns: List, **kwargs) -> List[Dict]:
+        """
+        สร้าง rule fragments สำหรับ single-pass validation (SinglePassValidator)
+        
+        Validator ที่รองรับ single-pass ควร override method นี้
+        
+        Args:
+            columns: List of columns to validate (same format as validate())
+            **kwargs: Additional parameters
+            
+        Returns:
+            List[Dict]: Rules created by create_rule()
+        """
+        return []
+    
+    def create_rule(self, validation_type: str, column: str, error_condition: str,
+                    example_expression: str = None, **kwargs) -> Dict:
+        """
+        สร้าง rule fragment หนึ่งรายการ
+        
+        Args:
+            validation_type: Type of validation (same as in issue dict)
+            column: Column name
+            error_condition: SQL predicate that is true for invalid rows
+            example_expression: SQL expression for example values (default: raw column)
+            **kwargs: Additional issue data
+            
+        Returns:
+            Dict: Rule fragment
+        """
+        return {
+            'validation_type': validation_type,
+            'column': column,
+            'error_condition': error_condition,
+            'example_expression': example_expression or self.safe_column_name(column),
+            'issue_data': kwargs
+        }
+    
     def safe_column_name(self, col_name: str) -> str:
         """
         สร้าง column name ที่ปลอดภัยสำหรับ SQL query
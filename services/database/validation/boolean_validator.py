@@ -73,19 +73,13 @@ class BooleanValidator(BaseValidator):
         Returns:
             Dict: Validation issue หรือ None ถ้าไม่มีปัญหา
         """
-        safe_col = self.safe_column_name(col)
-        
-        # สร้าง expression สำหรับทำความสะอาดข้อมูล
-        cleaned_col_expression = f"UPPER(LTRIM(RTRIM(ISNULL({safe_col}, ''))))"
-        
-        # สร้าง list ของค่าที่ยอมรับได้
-        valid_values_str = "','".join(self.VALID_BOOLEAN_VALUES)
+        where_condition = self._build_boolean_error_condition(col)
         
         # นับจำนวน error
         error_query = f"""
             SELECT COUNT(*) as error_count
             FROM {schema_name}.{staging_table}
-            WHERE {cleaned_col_expression} NOT IN ('{valid_values_str}')
+            WHERE {where_condition}
         """
         
         result = self.execute_query_safely(
@@ -99,7 +93,6 @@ class BooleanValidator(BaseValidator):
         
         if error_count > 0:
             # ดึงตัวอย่างข้อมูลที่มีปัญหา
-            where_condition = f"{cleaned_col_expression} NOT IN ('{valid_values_str}')"
             examples = self.get_sample_examples(
                 conn, staging_table, schema_name, where_condition, col
             )
@@ -115,6 +108,46 @@ class BooleanValidator(BaseValidator):
         
         return None
     
+    def _build_boolean_error_condition(self, col: str) -> str:
+        """
+        สร้าง WHERE condition สำหรับหาค่าที่ไม่ใช่ boolean
+        
+        Args:
+            col: Column name
+            
+        Returns:
+            str: WHERE condition
+        """
+        safe_col = self.safe_column_name(col)
+        
+        # สร้าง expression สำหรับทำความสะอาดข้อมูล
+        cleaned_col_expression = f"UPPER(LTRIM(RTRIM(ISNULL({safe_col}, ''))))"
+        
+        # สร้าง list ของค่าที่ยอมรับได้
+        valid_values_str = "','".join(self.VALID_BOOLEAN_VALUES)
+        
+        return f"{cleaned_col_expression} NOT IN ('{valid_values_str}')"
+    
+    def get_rule_fragments(self, columns: List, **kwargs) -> List[Dict]:
+        """
+        สร้าง rule fragments ของคอลัมน์ boolean สำหรับ single-pass validation
+        
+        Args:
+            columns: List of column names
+            **kwargs: Additional parameters
+            
+        Returns:
+            List[Dict]: Rule fragments
+        """
+        return [
+            self.create_rule(
+                'boolean_validation', col,
+                self._build_boolean_error_condition(col),
+                valid_values=list(self.VALID_BOOLEAN_VALUES)
+            )
+            for col in columns
+        ]
+    
     def get_boolean_columns(self, required_cols: Dict) -> List[str]:
         """
         ดึงรายชื่อคอลัมน์ที่เป็นประเภท boolean
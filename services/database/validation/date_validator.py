@@ -239,6 +239,28 @@ class DateValidator(BaseValidator):
         except Exception:
             return []
     
+    def get_rule_fragments(self, columns: List, **kwargs) -> List[Dict]:
+        """
+        สร้าง rule fragments ของคอลัมน์วันที่สำหรับ single-pass validation
+        
+        Args:
+            columns: List of column names
+            **kwargs: Additional parameters including 'date_format'
+            
+        Returns:
+            List[Dict]: Rule fragments
+        """
+        date_format = kwargs.get('date_format', 'UK')
+        return [
+            self.create_rule(
+                'date_validation', col,
+                self._build_date_error_condition(self.get_cleaned_column_expression(col, 'date'), date_format),
+                date_format_used=date_format,
+                debug_info=[]
+            )
+            for col in columns
+        ]
+    
     def get_date_columns(self, required_cols: Dict) -> List[str]:
         """
         ดึงรายชื่อคอลัมน์ที่เป็นประเภทวันที่
@@ -13,7 +13,11 @@ from .date_validator import DateValidator
 from .string_validator import StringValidator
 from .boolean_validator import BooleanValidator
 from .schema_validator import SchemaValidator
+from .single_pass_validator import SinglePassValidator
 from .index_manager import IndexManager
+from constants import DatabaseConstants
+from config.json_manager import json_manager
+from utils.cancellation import OperationCancelledError, cancellation_scope, current_token, is_cancelled
 
 
 class MainValidator(BaseValidator):
@@ -38,6 +42,7 @@ class MainValidator(BaseValidator):
         self.string_validator = StringValidator(engine)
         self.boolean_validator = BooleanValidator(engine)
         self.schema_validator = SchemaValidator(engine)
+        self.single_pass_validator = SinglePassValidator(engine)
         self.index_manager = IndexManager(engine)
     
     def validate(self, conn, staging_table: str, schema_name: str, columns: List, 
@@ -106,13 +111,12 @@ class MainValidator(BaseValidator):
                 log_func(f"📊 Validating {total_rows:,} rows in staging table")
             
             # Phase 2: Create temporary indexes for performance
-            if progress_callback:
-                progress_callback(0.15, "Index Creation", "Creating temporary indexes for faster validation...")
-            
-            if log_func:
-                log_func(f"   🚀 Creating temporary indexes for better performance...")
-            
-            index_count = self.index_manager.create_temp_indexes(staging_table, required_cols, schema_name, log_func)
+            # single-pass อ่านทั้งตารางครั้งเดียวอยู่แล้ว index ชั่วคราวจึงไม่ช่วยและเสียเวลาสร้าง
+            single_pass = self._use_single_pass()
+            indexes_created = False
+            if not single_pass:
+                self._create_temp_indexes(staging_table, required_cols, schema_name, log_func, progress_callback)
+                indexes_created = True
             
             # Phase 3: Schema compatibility check
             if progress_callback:
@@ -134,30 +138,50 @@ class MainValidator(BaseValidator):
                 log_func(f"   📋 Running {len(validation_phases)} validation phases...")
             
             # Phase 5-8: Run validation phases
-            phase_progress_step = 0.6 / len(validation_phases) if validation_phases else 0
-            base_progress = 0.3
-            
-            for i, (phase_name, phase_data) in enumerate(validation_phases.items(), 1):
-                current_progress = base_progress + (i * phase_progress_step)
-                
+            all_issues = None
+            if single_pass and validation_phases:
                 if progress_callback:
-                    progress_callback(current_progress, f"Validation Phase {i}", f"Running {phase_name}...")
-                
-                if log_func:
-                    log_func(f"   ⏳ Phase {i}/{len(validation_phases)}: {phase_name}...")
-                
-                phase_issues = self._run_validation_phase(
-                    phase_name, phase_data, schema_name, staging_table, 
-                    total_rows, log_func, progress_callback, current_progress, date_format
-                )
+                    progress_callback(0.3, "Single-pass Validation", "Checking all columns in one scan...")
+                try:
+                    all_issues = self._run_single_pass_validation(
+                        validation_phases, schema_name, staging_table, total_rows, log_func, date_format
+                    )
+                except Exception as single_pass_error:
+                    if is_cancelled(single_pass_error):
+                        raise
+                    if log_func:
+                        log_func(f"   ⚠️ Single-pass validation failed, falling back to per-column validation: {single_pass_error}")
+                    self._create_temp_indexes(staging_table, required_cols, schema_name, log_func, progress_callback)
+                    indexes_created = True
+            
+            if all_issues is None:
+                all_issues = []
+                phase_progress_step = 0.6 / len(validation_phases) if validation_phases else 0
+                base_progress = 0.3
                 
-                # Process phase results
-                for issue in phase_issues:
-                    if issue['percentage'] > 10:
-                        validation_results['is_valid'] = False
-                        validation_results['issues'].append(issue)
-                    elif issue['percentage'] > 1:
-                        validation_results['warnings'].append(issue)
+                for i, (phase_name, phase_data) in enumerate(validation_phases.items(), 1):
+                    if is_cancelled():
+                        raise OperationCancelledError("Operation cancelled")
+                    current_progress = base_progress + (i * phase_progress_step)
+                    
+                    if progress_callback:
+                        progress_callback(current_progress, f"Validation Phase {i}", f"Running {phase_name}...")
+                    
+                    if log_func:
+                        log_func(f"   ⏳ Phase {i}/{len(validation_phases)}: {phase_name}...")
+                    
+                    all_issues.extend(self._run_validation_phase(
+                        phase_name, phase_data, schema_name, staging_table, 
+                        total_rows, log_func, progress_callback, current_progress, date_format
+                    ))
+            
+            # Process phase results
+            for issue in all_issues:
+                if issue['percentage'] > 10:
+                    validation_results['is_valid'] = False
+                    validation_results['issues'].append(issue)
+                elif issue['percentage'] > 1:
+                    validation_results['warnings'].append(issue)
             
             # Phase 9: Final summary
             if progress_callback:
@@ -166,10 +190,11 @@ class MainValidator(BaseValidator):
             validation_results['summary'] = self._generate_summary(validation_results, log_func)
             
             # Cleanup: ลบ temporary indexes
-            if log_func:
-                log_func(f"   🧹 Cleaning up temporary indexes...")
-            
-            self.index_manager.drop_temp_indexes(staging_table, required_cols, schema_name, log_func)
+            if indexes_created:
+                if log_func:
+                    log_func(f"   🧹 Cleaning up temporary indexes...")
+                
+                self.index_manager.drop_temp_indexes(staging_table, required_cols, schema_name, log_func)
             
             if progress_callback:
                 progress_callback(1.0, "Completed", validation_results['summary'])
@@ -177,6 +202,81 @@ class MainValidator(BaseValidator):
             return validation_results
             
         except Exception as e:
+            if is_cancelled(e):
+                raise
+            validation_results = {
+                'is_valid': False,
+                'issues': [],
+                'warnings': [],
+                'summary': f"Error validating data: {str(e)}"
+            }
+            if log_func:
+                log_func(f"❌ {validation_results['summary']}")
+            return validation_results
+    
+    def validate_typed_table(self, typed_table: str, checks: List[Dict], schema_name: str = 'bronze',
+                             log_func=None) -> Dict:
+        """
+        Validate a typed table produced by fused validate-and-convert
+        
+        Each check points at a [__bad_n] column that holds the raw value where conversion
+        failed, so all columns are counted in one scan without converting again.
+        
+        Args:
+            typed_table: Typed table name
+            checks: List of {'column', 'validation_type', 'bad_column'}
+            schema_name: Schema name
+            log_func: Function for logging
+            
+        Returns:
+            Dict: Validation results {'is_valid': bool, 'issues': [...], 'summary': str}
+        """
+        try:
+            validation_results = {
+                'is_valid': True,
+                'issues': [],
+                'warnings': [],
+                'summary': ''
+            }
+            
+            total_rows = self._get_total_rows(typed_table, schema_name)
+            if total_rows == 0:
+                validation_results['is_valid'] = False
+                validation_results['summary'] = "No data in staging table"
+                return validation_results
+            
+            if log_func:
+                log_func(f"📊 Validating {total_rows:,} converted rows")
+            
+            rules = [
+                self.single_pass_validator.create_rule(
+                    check['validation_type'], check['column'],
+                    f"[{check['bad_column']}] IS NOT NULL", f"[{check['bad_column']}]"
+                )
+                for check in checks
+            ]
+            
+            issues = []
+            if rules:
+                with self.engine.connect() as conn:
+                    issues = self.single_pass_validator.validate_rules(
+                        conn, typed_table, schema_name, rules, total_rows, log_func
+                    )
+            self._log_phase_issues("Type Conversion", issues, log_func)
+            
+            for issue in issues:
+                if issue['percentage'] > 10:
+                    validation_results['is_valid'] = False
+                    validation_results['issues'].append(issue)
+                elif issue['percentage'] > 1:
+                    validation_results['warnings'].append(issue)
+            
+            validation_results['summary'] = self._generate_summary(validation_results, log_func)
+            return validation_results
+            
+        except Exception as e:
+            if is_cancelled(e):
+                raise
             validation_results = {
                 'is_valid': False,
                 'issues': [],
@@ -187,6 +287,94 @@ class MainValidator(BaseValidator):
                 log_func(f"❌ {validation_results['summary']}")
             return validation_results
     
+    def _use_single_pass(self) -> bool:
+        """
+        Check whether single-pass validation is enabled
+        
+        Returns:
+            bool: True unless app setting 'validation_mode' is 'per_column'
+        """
+        try:
+            return json_manager.get('app_settings', 'validation_mode', 'single_pass') != 'per_column'
+        except Exception:
+            return True
+    
+    def _create_temp_indexes(self, staging_table: str, required_cols: Dict, schema_name: str,
+                             log_func, progress_callback) -> None:
+        """Create temporary indexes used by per-column validation"""
+        if progress_callback:
+            progress_callback(0.15, "Index Creation", "Creating temporary indexes for faster validation...")
+        
+        if log_func:
+            log_func(f"   🚀 Creating temporary indexes for better performance...")
+        
+        self.index_manager.create_temp_indexes(staging_table, required_cols, schema_name, log_func)
+    
+    def _run_single_pass_validation(self, validation_phases: Dict, schema_name: str, staging_table: str,
+                                    total_rows: int, log_func, date_format: str) -> List[Dict]:
+        """
+        Run all validation phases as one aggregate query (per batch of rules)
+        
+        Args:
+            validation_phases: Validation phases configuration
+            schema_name: Schema name
+            staging_table: Staging table name
+            total_rows: Total number of rows
+            log_func: Logging function
+            date_format: Date format preference
+            
+        Returns:
+            List[Dict]: All validation issues
+        """
+        rules = []
+        rule_phase = {}
+        for phase_name, phase_data in validation_phases.items():
+            phase_rules = phase_data['validator'].get_rule_fragments(phase_data['columns'], date_format=date_format)
+            for rule in phase_rules:
+                rule_phase[(rule['validation_type'], rule['column'])] = phase_name
+            rules.extend(phase_rules)
+        
+        if log_func:
+            log_func(f"   ⏳ Single-pass validation: {len(rules)} rules across {len(validation_phases)} phases...")
+        
+        with self.engine.connect() as conn:
+            issues = self.single_pass_validator.validate_rules(
+                conn, staging_table, schema_name, rules, total_rows, log_func
+            )
+        
+        for phase_name in validation_phases:
+            phase_issues = [
+                issue for issue in issues
+                if rule_phase.get((issue['validation_type'], issue['column'])) == phase_name
+            ]
+            self._log_phase_issues(phase_name, phase_issues, log_func)
+        
+        return issues
+    
+    def _log_phase_issues(self, phase_name: str, issues: List[Dict], log_func) -> None:
+        """
+        Log issues found by a validation phase
+        
+        Args:
+            phase_name: Name of the validation phase
+            issues: Issues found in this phase
+            log_func: Logging function
+        """
+        if not log_func:
+            return
+        
+        if issues:
+            log_func(f"      ❌ Found {len(issues)} issue type(s) in {phase_name}")
+            
+            for issue in issues:
+                if issue['error_count'] > 0:
+                    status = "❌" if issue['percentage'] > 10 else "⚠️"
+                    column_name = issue['column'] if isinstance(issue['column'], str) else str(issue['column'])
+                    examples = issue['examples'][:100] if isinstance(issue['examples'], str) else str(issue['examples'])[:100]
+                    log_func(f"      {status} {column_name}: {issue['error_count']:,} invalid rows ({issue['percentage']}%) Examples: {examples}")
+        else:
+            log_func(f"      ✅ {phase_name} - No issues found")
+    
     def _get_total_rows(self, staging_table: str, schema_name: str) -> int:
         """
         Get total number of rows in staging table
@@ -301,21 +489,11 @@ class MainValidator(BaseValidator):
                     )
             
             # Log results
-            if issues:
-                if log_func:
-                    log_func(f"      ❌ Found {len(issues)} issue type(s) in {phase_name}")
-                
-                for issue in issues:
-                    if log_func and issue['error_count'] > 0:
-                        status = "❌" if issue['percentage'] > 10 else "⚠️"
-                        column_name = issue['column'] if isinstance(issue['column'], str) else str(issue['column'])
-                        examples = issue['examples'][:100] if isinstance(issue['examples'], str) else str(issue['examples'])[:100]
-                        log_func(f"      {status} {column_name}: {issue['error_count']:,} invalid rows ({issue['percentage']}%) Examples: {examples}")
-            else:
-                if log_func:
-                    log_func(f"      ✅ {phase_name} - No issues found")
+            self._log_phase_issues(phase_name, issues, log_func)
                     
         except Exception as phase_error:
+            if is_cancelled(phase_error):
+                raise
             if log_func:
                 log_func(f"      ⚠️ Could not run {phase_name}: {phase_error}")
         
@@ -341,11 +519,12 @@ class MainValidator(BaseValidator):
             List[Dict]: All validation issues
         """
         all_issues = []
+        token = current_token()
         
         def validate_single_column(col):
             """ตรวจสอบคอลัมน์เดียวในแต่ละ thread"""
             try:
-                with self.engine.connect() as conn:
+                with cancellation_scope(token), self.engine.connect() as conn:
                     return validator.validate(
                         conn, staging_table, schema_name, [col], 
                         total_rows, chunk_size, None, **kwargs  # ไม่ส่ง log_func เพื่อป้องกัน race condition
@@ -355,7 +534,7 @@ class MainValidator(BaseValidator):
         
         try:
             # ใช้ ThreadPoolExecutor สำหรับ parallel processing
-            max_workers = min(len(columns), 3)  # จำกัดจำนวน threads ไม่เกิน 3
+            max_workers = min(len(columns), DatabaseConstants.VALIDATION_MAX_WORKERS)  # จำกัดจำนวน threads (1 connection ต่อ thread)
             
             if log_func:
                 log_func(f"      🔄 Processing {len(columns)} columns in parallel ({max_workers} threads)...")
@@ -380,6 +559,8 @@ class MainValidator(BaseValidator):
                 log_func(f"      ✅ Parallel validation completed: {len(all_issues)} total issue(s)")
                 
         except Exception as e:
+            if is_cancelled(e):
+                raise
             if log_func:
                 log_func(f"      ⚠️ Parallel validation failed, falling back to sequential: {e}")
             # Fallback เป็นแบบปกติ
@@ -68,12 +68,13 @@ class NumericValidator(BaseValidator):
         # สร้าง expression สำหรับทำความสะอาดข้อมูล
         cleaned_col_expression = self.get_cleaned_column_expression(col, 'numeric')
         
+        where_condition = self._build_numeric_error_condition(cleaned_col_expression)
+        
         # นับจำนวน error
         error_query = f"""
             SELECT COUNT(*) as error_count
             FROM {schema_name}.{staging_table}
-            WHERE TRY_CAST({cleaned_col_expression} AS FLOAT) IS NULL 
-              AND NULLIF({cleaned_col_expression}, '') IS NOT NULL
+            WHERE {where_condition}
         """
         
         result = self.execute_query_safely(
@@ -87,11 +88,6 @@ class NumericValidator(BaseValidator):
         
         if error_count > 0:
             # ดึงตัวอย่างข้อมูลที่มีปัญหา
-            where_condition = f"""
-                TRY_CAST({cleaned_col_expression} AS FLOAT) IS NULL 
-                AND NULLIF({cleaned_col_expression}, '') IS NOT NULL
-            """
-            
             examples = self.get_sample_examples(
                 conn, staging_table, schema_name, where_condition, col
             )
@@ -106,6 +102,40 @@ class NumericValidator(BaseValidator):
         
         return None
     
+    def _build_numeric_error_condition(self, cleaned_col_expression: str) -> str:
+        """
+        สร้าง WHERE condition สำหรับหาข้อมูลที่ไม่ใช่ตัวเลข
+        
+        Args:
+            cleaned_col_expression: Cleaned column expression
+            
+        Returns:
+            str: WHERE condition
+        """
+        return f"""
+                TRY_CAST({cleaned_col_expression} AS FLOAT) IS NULL 
+                AND NULLIF({cleaned_col_expression}, '') IS NOT NULL
+            """
+    
+    def get_rule_fragments(self, columns: List, **kwargs) -> List[Dict]:
+        """
+        สร้าง rule fragments ของคอลัมน์ตัวเลขสำหรับ single-pass validation
+        
+        Args:
+            columns: List of column names
+            **kwargs: Additional parameters
+            
+        Returns:
+            List[Dict]: Rule fragments
+        """
+        return [
+            self.create_rule(
+                'numeric_validation', col,
+                self._build_numeric_error_condition(self.get_cleaned_column_expression(col, 'numeric'))
+            )
+            for col in columns
+        ]
+    
     def get_numeric_columns(self, required_cols: Dict) -> List[str]:
         """
         ดึงรายชื่อคอลัมน์ที่เป็นประเภทตัวเลข
@@ -0,0 +1,154 @@
+"""
+Single-pass validation module
+
+Evaluates the rule fragments of all validators in one SUM(CASE ...) aggregate,
+so one scan of the staging table replaces one COUNT(*) scan per column and rule
+"""
+
+from typing import Dict, List
+from sqlalchemy import text
+
+from .base_validator import BaseValidator
+
+
+class SinglePassValidator(BaseValidator):
+    """
+    Validator ที่รวม rule ของทุกคอลัมน์ไว้ใน query เดียว
+    
+    - นับ error ของทุก rule ด้วย SELECT SUM(CASE WHEN ... THEN 1 ELSE 0 END) ครั้งเดียวต่อ batch
+    - ดึงตัวอย่างของทุก rule ที่ล้มเหลวด้วย UNION ALL query เดียวต่อ batch
+    """
+    
+    # จำกัดจำนวน rule ต่อ query เพื่อไม่ให้ query ใหญ่เกินไป
+    RULES_PER_QUERY = 100
+    EXAMPLES_PER_RULE = 3
+    
+    def validate(self, conn, staging_table: str, schema_name: str, columns: List, 
+                total_rows: int, chunk_size: int, log_func=None, **kwargs) -> List[Dict]:
+        """
+        ตรวจสอบข้อมูลตาม rule fragments
+        
+        Args:
+            conn: Database connection
+            staging_table: Staging table name
+            schema_name: Schema name
+            columns: List of rule fragments (from BaseValidator.create_rule)
+            total_rows: Total number of rows
+            chunk_size: Chunk size for processing (unused in this implementation)
+            log_func: Logging function
+            **kwargs: Additional parameters
+            
+        Returns:
+            List[Dict]: List of validation issues
+        """
+        return self.validate_rules(conn, staging_table, schema_name, columns, total_rows, log_func)
+    
+    def validate_rules(self, conn, staging_table: str, schema_name: str, rules: List[Dict],
+                       total_rows: int, log_func=None) -> List[Dict]:
+        """
+        นับ error ของทุก rule แล้วดึงตัวอย่างเฉพาะ rule ที่ล้มเหลว
+        
+        Args:
+            conn: Database connection
+            staging_table: Staging table name
+            schema_name: Schema name
+            rules: List of rule fragments
+            total_rows: Total number of rows
+            log_func: Logging function
+            
+        Returns:
+            List[Dict]: List of validation issues (same format as the per-type validators)
+            
+        Raises:
+            Exception: When an aggregate query fails (caller may fall back to per-column validation)
+        """
+        error_counts = []
+        for start in range(0, len(rules), self.RULES_PER_QUERY):
+            batch = rules[start:start + self.RULES_PER_QUERY]
+            error_counts.extend(self._count_errors(conn, staging_table, schema_name, batch))
+        
+        failed = [(rule, count) for rule, count in zip(rules, error_counts) if count > 0]
+        if log_func:
+            scans = (len(rules) + self.RULES_PER_QUERY - 1) // self.RULES_PER_QUERY
+            log_func(f"      🔎 Checked {len(rules)} rules in {scans} scan(s): {len(failed)} rule(s) with errors")
+        
+        examples_by_rule = {}
+        for start in range(0, len(failed), self.RULES_PER_QUERY):
+            batch = [rule for rule, _ in failed[start:start + self.RULES_PER_QUERY]]
+            examples_by_rule.update(
+                self._get_examples(conn, staging_table, schema_name, batch, start, log_func)
+            )
+        
+        issues = []
+        for index, (rule, error_count) in enumerate(failed):
+            issues.append(self.create_issue_dict(
+                validation_type=rule['validation_type'],
+                column=rule['column'],
+                error_count=error_count,
+                total_rows=total_rows,
+                examples=examples_by_rule.get(index, []),
+                **rule['issue_data']
+            ))
+        
+        return issues
+    
+    def _count_errors(self, conn, staging_table: str, schema_name: str, rules: List[Dict]) -> List[int]:
+        """
+        นับ error ของหลาย rule ด้วยการ scan ตารางครั้งเดียว
+        
+        Args:
+            conn: Database connection
+            staging_table: Staging table name
+            schema_name: Schema name
+            rules: Rule fragments in this batch
+            
+        Returns:
+            List[int]: Error count per rule (same order as rules)
+        """
+        aggregates = ",\n".join([
+            f"SUM(CASE WHEN {rule['error_condition']} THEN 1 ELSE 0 END) AS r{i}"
+            for i, rule in enumerate(rules)
+        ])
+        query = f"""
+            SELECT {aggregates}
+            FROM {schema_name}.{staging_table}
+        """
+        row = conn.execute(text(query)).fetchone()
+        return [int(value or 0) for value in row]
+    
+    def _get_examples(self, conn, staging_table: str, schema_name: str, rules: List[Dict],
+                      offset: int, log_func=None) -> Dict[int, List[str]]:
+        """
+        ดึงตัวอย่างของหลาย rule ด้วย UNION ALL query เดียว
+        
+        Args:
+            conn: Database connection
+            staging_table: Staging table name
+            schema_name: Schema name
+            rules: Failed rule fragments in this batch
+            offset: Index of the first rule of this batch in the failed list
+            log_func: Logging function
+            
+        Returns:
+            Dict[int, List[str]]: Example values by index in the failed list
+        """
+        branches = [
+            f"""SELECT * FROM (
+                SELECT TOP {self.EXAMPLES_PER_RULE} {offset + i} AS rule_index,
+                       CAST({rule['example_expression']} AS NVARCHAR(4000)) AS example_value
+                FROM {schema_name}.{staging_table}
+                WHERE {rule['error_condition']}
+            ) AS e{i}"""
+            for i, rule in enumerate(rules)
+        ]
+        query = "\nUNION ALL\n".join(branches)
+        
+        examples = {}
+        try:
+            for row in conn.execute(text(query)).fetchall():
+                examples.setdefault(row.rule_index, []).append(str(row.example_value))
+        except Exception as e:
+            # ตัวอย่างเป็นข้อมูลเสริม ไม่ต้องทำให้ validation ล้มเหลว
+            if log_func:
+                log_func(f"      ⚠️ Could not fetch examples: {e}")
+        return examples
@@ -66,13 +66,13 @@ class StringValidator(BaseValidator):
         Returns:
             Dict: Validation issue หรือ None ถ้าไม่มีปัญหา
         """
-        safe_col = self.safe_column_name(col)
+        where_condition = self._build_length_error_condition(col, max_length)
         
         # นับจำนวน error
         error_query = f"""
             SELECT COUNT(*) as error_count
             FROM {schema_name}.{staging_table}
-            WHERE LEN(ISNULL({safe_col}, '')) > {max_length}
+            WHERE {where_condition}
         """
         
         result = self.execute_query_safely(
@@ -87,9 +87,9 @@ class StringValidator(BaseValidator):
         if error_count > 0:
             # ดึงตัวอย่างข้อมูลที่มีปัญหา (แสดงเฉพาะ 30 ตัวอักษรแรก)
             examples_query = f"""
-                SELECT TOP 3 LEFT({safe_col}, 30) + '...' as example_value
+                SELECT TOP 3 {self._build_length_example_expression(col)} as example_value
                 FROM {schema_name}.{staging_table}
-                WHERE LEN(ISNULL({safe_col}, '')) > {max_length}
+                WHERE {where_condition}
             """
             
             examples_result = self.execute_query_safely(
@@ -111,6 +111,35 @@ class StringValidator(BaseValidator):
         
         return None
     
+    def _build_length_error_condition(self, col: str, max_length: int) -> str:
+        """สร้าง WHERE condition สำหรับหาข้อมูลที่ยาวเกินกำหนด"""
+        return f"LEN(ISNULL({self.safe_column_name(col)}, '')) > {max_length}"
+    
+    def _build_length_example_expression(self, col: str) -> str:
+        """ตัวอย่างข้อมูลที่ยาวเกิน (แสดงเฉพาะ 30 ตัวอักษรแรก)"""
+        return f"LEFT({self.safe_column_name(col)}, 30) + '...'"
+    
+    def get_rule_fragments(self, columns: List, **kwargs) -> List[Dict]:
+        """
+        สร้าง rule fragments ของความยาว string สำหรับ single-pass validation
+        
+        Args:
+            columns: List of tuples (column_name, max_length)
+            **kwargs: Additional parameters
+            
+        Returns:
+            List[Dict]: Rule fragments
+        """
+        return [
+            self.create_rule(
+                'string_length_validation', col,
+                self._build_length_error_condition(col, max_length),
+                self._build_length_example_expression(col),
+                max_length=max_length
+            )
+            for col, max_length in columns
+        ]
+    
     def get_string_columns_with_length(self, required_cols: Dict) -> List[Tuple[str, int]]:
         """
         ดึงรายชื่อคอลัมน์ที่เป็นประเภท string พร้อมความยาวสูงสุด
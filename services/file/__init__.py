@@ -7,9 +7,16 @@ Provides modular file services for reading, processing, and managing files
 from .file_reader_service import FileReaderService
 from .data_processor_service import DataProcessorService
 from .file_management_service import FileManagementService
+from .file_fingerprint_cache import FileFingerprintCache, file_fingerprint_cache
+from .header_matcher import HeaderMatcher
+from .parse_cache import ParseCache
 
 __all__ = [
     'FileReaderService',
     'DataProcessorService',
-    'FileManagementService'
+    'FileManagementService',
+    'FileFingerprintCache',
+    'file_fingerprint_cache',
+    'HeaderMatcher',
+    'ParseCache'
 ]
\ No newline at end of file
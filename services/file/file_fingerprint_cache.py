@@ -0,0 +1,217 @@
+"""
+File Fingerprint Cache for PIPELINE_SQLSERVER
+
+Per-session cache of what the pipeline learns about a file before ingest:
+the first rows (header peek), the detected logic type, the CSV encoding and
+the row count. Entries are keyed on (path, size, mtime) so a changed file is
+read again, while detect, preview and read of the same file share one peek.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, List, Optional, Tuple
+
+import pandas as pd
+
+from constants import FileConstants
+from utils.csv_utils import confirm_csv_encoding, count_csv_rows, detect_csv_encoding
+from utils.helpers import compute_file_hash
+
+
+@dataclass
+class FileFingerprint:
+    """Cached facts about one version (size, mtime) of a file"""
+    path: str
+    size: int
+    mtime_ns: int
+    peek: Optional[pd.DataFrame] = None  # first rows read with header=None
+    peek_rows: int = 0  # rows requested when peek was read
+    encoding: Optional[str] = None  # CSV only
+    encoding_confirmed: bool = False  # encoding checked against the whole file
+    row_count: Optional[int] = None
+    row_count_estimated: bool = False
+    detected_logic_type: Optional[str] = None
+    detected_settings_key: Optional[str] = None  # column settings the detection was made with
+    content_hash: Optional[str] = None
+
+
+class FileFingerprintCache:
+    """
+    Thread-safe LRU cache of FileFingerprint entries
+
+    Values are computed outside the lock; two threads asking for the same new
+    file at once may both read it, which is harmless.
+    """
+
+    def __init__(self, max_entries: int = FileConstants.FINGERPRINT_CACHE_SIZE) -> None:
+        """
+        Initialize cache
+
+        Args:
+            max_entries: Maximum number of files kept (least recently used are dropped)
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, FileFingerprint]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, file_path: str) -> FileFingerprint:
+        """
+        Get the entry for the current version of a file (a new empty entry if it changed)
+
+        Args:
+            file_path: File path
+
+        Returns:
+            FileFingerprint: Cached entry
+        """
+        path = os.path.abspath(file_path)
+        stat = os.stat(path)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or entry.size != stat.st_size or entry.mtime_ns != stat.st_mtime_ns:
+                entry = FileFingerprint(path=path, size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+                self._entries[path] = entry
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return entry
+
+    def get_encoding(self, file_path: str) -> str:
+        """CSV encoding (BOM + sample detection, once per file version)"""
+        entry = self.get(file_path)
+        if entry.encoding is None:
+            entry.encoding = detect_csv_encoding(file_path)
+        return entry.encoding
+
+    def get_confirmed_encoding(self, file_path: str) -> str:
+        """CSV encoding checked against the whole file, for reads that cannot switch encoding half way"""
+        entry = self.get(file_path)
+        if not entry.encoding_confirmed:
+            entry.encoding = confirm_csv_encoding(file_path, self.get_encoding(file_path))
+            entry.encoding_confirmed = True
+        return entry.encoding
+
+    def get_row_count(self, file_path: str) -> Tuple[int, bool]:
+        """CSV data row count as (rows, is_estimate), counted once per file version"""
+        entry = self.get(file_path)
+        if entry.row_count is None:
+            entry.row_count, entry.row_count_estimated = count_csv_rows(file_path)
+        return entry.row_count, entry.row_count_estimated
+
+    def get_content_hash(self, file_path: str) -> str:
+        """Hash of the file content, computed once per file version"""
+        entry = self.get(file_path)
+        if entry.content_hash is None:
+            entry.content_hash = compute_file_hash(file_path)
+        return entry.content_hash
+
+    def get_peek(self, file_path: str, nrows: int = FileConstants.FINGERPRINT_PEEK_ROWS) -> pd.DataFrame:
+        """
+        First rows of the first sheet / CSV read without a header row
+
+        Args:
+            file_path: File path
+            nrows: Minimum number of rows needed (header row included)
+
+        Returns:
+            pd.DataFrame: Peek rows (may be shorter than nrows for small files)
+        """
+        entry = self.get(file_path)
+        if entry.peek is None or entry.peek_rows < nrows:
+            nrows = max(nrows, FileConstants.FINGERPRINT_PEEK_ROWS)
+            lower = file_path.lower()
+            if lower.endswith('.csv'):
+                peek = pd.read_csv(file_path, header=None, nrows=nrows, encoding=self.get_encoding(file_path))
+            elif lower.endswith('.xls'):
+                peek = pd.read_excel(file_path, header=None, nrows=nrows, engine='xlrd')
+            else:
+                peek = pd.read_excel(file_path, header=None, nrows=nrows)
+            entry.peek, entry.peek_rows = peek, nrows
+        return entry.peek.head(nrows)
+
+    def get_header_columns(self, file_path: str) -> List[Any]:
+        """
+        Column names of the first row, named the way pandas does with header=0
+        (blank → 'Unnamed: n', duplicates → 'name.1', whole floats → int)
+
+        Args:
+            file_path: File path
+
+        Returns:
+            List[Any]: Column names (empty list for an empty file)
+        """
+        peek = self.get_peek(file_path)
+        if peek.empty:
+            return []
+
+        columns = []
+        seen = {}
+        for idx, value in enumerate(peek.iloc[0].tolist()):
+            if pd.isna(value):
+                value = f"Unnamed: {idx}"
+            elif isinstance(value, float) and value.is_integer():
+                value = int(value)
+            if value in seen:
+                seen[value] += 1
+                value = f"{value}.{seen[value]}"
+            else:
+                seen[value] = 0
+            columns.append(value)
+        return columns
+
+    def get_detected_logic_type(self, file_path: str, settings_key: str) -> Tuple[bool, Optional[str]]:
+        """
+        Cached logic type detection result
+
+        Args:
+            file_path: File path
+            settings_key: Signature of the column settings used for detection
+
+        Returns:
+            Tuple[bool, Optional[str]]: (cache hit, logic type or None)
+        """
+        entry = self.get(file_path)
+        if entry.detected_settings_key == settings_key:
+            return True, entry.detected_logic_type
+        return False, None
+
+    def set_detected_logic_type(self, file_path: str, settings_key: str, logic_type: Optional[str]) -> None:
+        """Store logic type detection result for the current file version"""
+        entry = self.get(file_path)
+        entry.detected_logic_type = logic_type
+        entry.detected_settings_key = settings_key
+
+    def merge(self, fingerprint: FileFingerprint) -> None:
+        """
+        Adopt an entry built elsewhere (e.g. by a detection worker process)
+
+        Ignored when the file has changed since the entry was built
+
+        Args:
+            fingerprint: Entry to adopt
+        """
+        try:
+            stat = os.stat(fingerprint.path)
+        except OSError:
+            return
+        if stat.st_size != fingerprint.size or stat.st_mtime_ns != fingerprint.mtime_ns:
+            return
+        with self._lock:
+            self._entries[fingerprint.path] = fingerprint
+            self._entries.move_to_end(fingerprint.path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, file_path: Optional[str] = None) -> None:
+        """Drop one file (or every file when file_path is None)"""
+        with self._lock:
+            if file_path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(os.path.abspath(file_path), None)
+
+
+# Shared instance for the session (detect, preview and read use the same entries)
+file_fingerprint_cache = FileFingerprintCache()
@@ -9,11 +9,37 @@ import json
 import os
 import re
 import threading
-from typing import Optional, Dict, Any
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Optional, Dict, Any, Iterable, Iterator, Tuple
 
 import pandas as pd
 
-from constants import PathConstants
+from config.json_manager import json_manager
+from constants import FileConstants, PathConstants
+from utils.csv_utils import arrow_batch_to_frame, csv_encoding_fallbacks, is_pyarrow_available, iter_arrow_csv_batches
+from .file_fingerprint_cache import file_fingerprint_cache
+from .header_matcher import HeaderMatcher
+
+
+# FileReaderService ของ worker process ที่ใช้ตรวจประเภทไฟล์ (สร้างครั้งเดียวต่อ process)
+_worker_reader = None
+
+
+def _init_detect_worker(column_settings: Dict) -> None:
+    """Create the reader used by a detection worker process"""
+    global _worker_reader
+    _worker_reader = FileReaderService(log_callback=lambda msg: None)
+    _worker_reader.column_settings = column_settings
+
+
+def _detect_file_type_worker(file_path: str):
+    """Detect one file in a worker process, return (logic_type, fingerprint entry)"""
+    logic_type = _worker_reader.detect_file_type(file_path)
+    try:
+        fingerprint = file_fingerprint_cache.get(file_path)
+    except OSError:
+        fingerprint = None
+    return logic_type, fingerprint
 
 
 class FileReaderService:
@@ -49,6 +75,9 @@ class FileReaderService:
         self._cache_lock = threading.Lock()
         self._settings_loaded = False
         
+        # ตัวจับคู่ header ที่คอมไพล์จาก column_settings (สร้างใหม่เมื่อ settings เปลี่ยน)
+        self._header_matcher = None
+        
         self.load_settings()
     
     def load_settings(self) -> None:
@@ -149,90 +178,136 @@ class FileReaderService:
             if not self.column_settings:
                 return None
 
-            # อ่านหัวตารางบางส่วนเพื่อเดาประเภทไฟล์
-            if file_path.lower().endswith('.csv'):
-                df_peek = pd.read_csv(file_path, header=None, nrows=2, encoding='utf-8')
-            elif file_path.lower().endswith('.xls'):
-                # สำหรับไฟล์ .xls ใช้ xlrd engine
-                df_peek = pd.read_excel(file_path, header=None, nrows=2, engine='xlrd')
-            else:
-                # สำหรับไฟล์ .xlsx
-                df_peek = pd.read_excel(file_path, header=None, nrows=2)
+            # ผลการ detect ผูกกับ column settings ที่ใช้ ถ้า settings เปลี่ยนต้อง detect ใหม่
+            matcher = self._get_header_matcher()
+            hit, logic_type = file_fingerprint_cache.get_detected_logic_type(file_path, matcher.signature)
+            if hit:
+                return logic_type
 
-            # ตรวจสอบทุก header row ที่เป็นไปได้
-            for row in range(min(2, df_peek.shape[0])):
-                header_row = set(self.normalize_col(col) for col in df_peek.iloc[row].values if not pd.isna(col))
-                
-                # ถ้าไม่มี header ใน row นี้ ข้าม
-                if not header_row:
-                    continue
-                
-                # หา logic_type ที่ตรงกันมากที่สุด
-                best_match = None
-                best_score = 0
-                
-                for logic_type, mapping in self.column_settings.items():
-                    if not mapping:  # ข้าม mapping ที่ว่าง
-                        continue
-                    
-                    required_keys = set(self.normalize_col(c) for c in mapping.keys() if c)
-                    required_vals = set(self.normalize_col(c) for c in mapping.values() if c)
-                    
-                    # ตรวจสอบว่าเป็น identity mapping หรือไม่
-                    is_identity_mapping = (required_keys == required_vals)
-                    
-                    if is_identity_mapping:
-                        # สำหรับ identity mapping ใช้การจับคู่แบบตรง
-                        match_count = len(header_row & required_keys)
-                        total_required = len(required_keys)
-                        
-                        # ใช้เกณฑ์แบบปรับตัว: อย่างน้อย 5 คอลัมน์ตรง หรือ 10% สำหรับ config ขนาดใหญ่
-                        if total_required > 0:
-                            score = match_count / total_required
-                            if total_required >= 50:
-                                # สำหรับ config ขนาดใหญ่ (50+ คอลัมน์) ใช้เกณฑ์ 10% หรืออย่างน้อย 5 คอลัมน์
-                                min_threshold = max(0.1, 5/total_required)
-                            elif total_required >= 20:
-                                # สำหรับ config ขนาดกลาง (20-49 คอลัมน์) ใช้เกณฑ์ 20% หรืออย่างน้อย 5 คอลัมน์  
-                                min_threshold = max(0.2, 5/total_required)
-                            else:
-                                # สำหรับ config ขนาดเล็ก (< 20 คอลัมน์) ใช้เกณฑ์ 30%
-                                min_threshold = 0.3
-                            
-                            if score >= min_threshold and score > best_score:
-                                best_match = logic_type
-                                best_score = score
-                    else:
-                        # สำหรับ mapping ปกติ ตรวจสอบทั้ง keys และ values
-                        keys_match = len(header_row & required_keys)
-                        vals_match = len(header_row & required_vals)
-                        
-                        # เลือกทิศทางที่มี match มากกว่า
-                        if keys_match > vals_match:
-                            score = keys_match / len(required_keys) if required_keys else 0
-                        else:
-                            score = vals_match / len(required_vals) if required_vals else 0
-                        
-                        # ใช้เกณฑ์แบบปรับตัวเดียวกัน
-                        total_keys = len(required_keys) if keys_match > vals_match else len(required_vals)
-                        if total_keys >= 50:
-                            min_threshold = max(0.1, 5/total_keys)
-                        elif total_keys >= 20:
-                            min_threshold = max(0.2, 5/total_keys)
-                        else:
-                            min_threshold = 0.3
-                            
-                        if score >= min_threshold and score > best_score:
-                            best_match = logic_type
-                            best_score = score
-                
-                if best_match:
-                    return best_match
-            
-            return None
+            # อ่านหัวตารางบางส่วนเพื่อเดาประเภทไฟล์ (peek ถูก cache ไว้ใช้ต่อตอน preview/read)
+            df_peek = file_fingerprint_cache.get_peek(file_path).head(2)
+            logic_type = self._match_logic_type(df_peek, matcher)
+            file_fingerprint_cache.set_detected_logic_type(file_path, matcher.signature, logic_type)
+            return logic_type
         except Exception:
             return None
 
+    def detect_file_types(self, file_paths: Iterable[str], max_workers: int = 1,
+                          cancel_event: Optional[threading.Event] = None) -> Iterator[Tuple[str, Optional[str]]]:
+        """
+        Detect the logic type of many files, yielding each result as soon as it is ready
+
+        Header parsing is CPU bound (GIL), so with max_workers > 1 files are detected
+        in a process pool. Peeks read by the workers are added to the fingerprint
+        cache so preview/read of the same files do not open them again.
+
+        Args:
+            file_paths: Files to detect
+            max_workers: Worker processes (0 = CPU count, 1 = detect in this process)
+            cancel_event: Stop yielding (and drop pending files) once set
+
+        Yields:
+            Tuple[str, Optional[str]]: (file path, logic type or None) in completion order
+        """
+        file_paths = list(file_paths)
+        workers = min(max_workers if max_workers > 0 else (os.cpu_count() or 1), len(file_paths))
+
+        pending = file_paths
+        if workers > 1 and len(file_paths) >= FileConstants.PARALLEL_SCAN_MIN_FILES and self.column_settings:
+            # ไฟล์ที่ detect ไว้แล้ว (ไฟล์ไม่เปลี่ยน, settings ไม่เปลี่ยน) ไม่ต้องส่งเข้า pool
+            matcher = self._get_header_matcher()
+            pending = []
+            for file_path in file_paths:
+                if cancel_event is not None and cancel_event.is_set():
+                    return
+                try:
+                    hit, logic_type = file_fingerprint_cache.get_detected_logic_type(file_path, matcher.signature)
+                except OSError:
+                    hit, logic_type = False, None
+                if hit:
+                    yield file_path, logic_type
+                else:
+                    pending.append(file_path)
+
+            if len(pending) >= FileConstants.PARALLEL_SCAN_MIN_FILES:
+                pending = yield from self._detect_in_process_pool(pending, min(workers, len(pending)), cancel_event)
+
+        # detect ใน process นี้ (ไฟล์น้อย, workers = 1 หรือ pool ใช้งานไม่ได้)
+        for file_path in pending:
+            if cancel_event is not None and cancel_event.is_set():
+                return
+            yield file_path, self.detect_file_type(file_path)
+
+    def _detect_in_process_pool(self, file_paths, workers, cancel_event):
+        """
+        Detect files in a process pool, yielding results as they complete
+
+        Returns:
+            List[str]: Files not detected (pool failed to start or broke), empty when all were yielded
+        """
+        remaining = list(file_paths)
+        futures = {}
+        try:
+            executor = ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_detect_worker,
+                initargs=(self.column_settings,),
+            )
+        except Exception as e:
+            self.log_callback(f"⚠️ Parallel file detection unavailable, detecting sequentially: {e}")
+            return remaining
+
+        try:
+            futures = {executor.submit(_detect_file_type_worker, file_path): file_path for file_path in file_paths}
+            for future in as_completed(futures):
+                if cancel_event is not None and cancel_event.is_set():
+                    return []
+                file_path = futures[future]
+                try:
+                    logic_type, fingerprint = future.result()
+                except Exception:
+                    # worker ล้ม (เช่น process ถูก kill) ให้ detect ไฟล์นี้ใน process หลักแทน
+                    logic_type = self.detect_file_type(file_path)
+                else:
+                    if fingerprint is not None:
+                        file_fingerprint_cache.merge(fingerprint)
+                remaining.remove(file_path)
+                yield file_path, logic_type
+            return []
+        except Exception as e:
+            self.log_callback(f"⚠️ Parallel file detection failed, detecting the rest sequentially: {e}")
+            return remaining
+        finally:
+            # ยกเลิกไฟล์ที่ยังไม่เริ่ม (cancel_futures ต้องใช้ Python 3.9+)
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    def _get_header_matcher(self):
+        """Header matcher for the current column settings (rebuilt only when the settings change)"""
+        settings = self.column_settings
+        # แก้ settings ในที่เดิม (pop/กำหนดค่าใหม่) ก็เปลี่ยน signature
+        signature = HeaderMatcher.settings_signature(settings)
+        if self._header_matcher is None or self._header_matcher.signature != signature:
+            self._header_matcher = HeaderMatcher(settings, self.normalize_col)
+        return self._header_matcher
+
+    def _match_logic_type(self, df_peek, matcher):
+        """หา logic type ที่ตรงกับ header ในแถวแรกๆ ของไฟล์มากที่สุด (None ถ้าไม่ผ่านเกณฑ์)"""
+        # ตรวจสอบทุก header row ที่เป็นไปได้
+        for row in range(min(2, df_peek.shape[0])):
+            header_row = set(self.normalize_col(col) for col in df_peek.iloc[row].values if not pd.isna(col))
+            
+            # ถ้าไม่มี header ใน row นี้ ข้าม
+            if not header_row:
+                continue
+            
+            best_match = matcher.match(header_row)
+            if best_match:
+                return best_match
+        
+        return None
+
     def build_rename_mapping_for_dataframe(self, df_columns, logic_type):
         """
         สร้าง mapping สำหรับ df.rename(columns=...) โดยอัตโนมัติให้ทิศทางถูกต้อง
@@ -400,14 +475,7 @@ class FileReaderService:
             
             # อ่านไฟล์
             if file_type == 'csv':
-                # รองรับไฟล์ภาษาไทย: UTF-8 → cp874 → latin1
-                try:
-                    df = pd.read_csv(file_path, encoding='utf-8')
-                except UnicodeDecodeError:
-                    try:
-                        df = pd.read_csv(file_path, encoding='cp874')
-                    except UnicodeDecodeError:
-                        df = pd.read_csv(file_path, encoding='latin1')
+                df = self._read_csv_basic(file_path)
             elif file_type == 'excel_xls':
                 # สำหรับไฟล์ .xls ใช้ xlrd engine
                 df = pd.read_excel(file_path, sheet_name=0, engine='xlrd')
@@ -427,6 +495,31 @@ class FileReaderService:
             self.log_callback(f"❌ {error_msg}")
             return False, error_msg
 
+    def _read_csv_basic(self, file_path):
+        """Read a whole CSV file (Arrow all-string reader when available, else pandas)"""
+        use_arrow = (
+            json_manager.get('app_settings', 'csv_reader', FileConstants.CSV_READER_AUTO) != FileConstants.CSV_READER_PANDAS
+            and is_pyarrow_available()
+        )
+        # รองรับไฟล์ภาษาไทย: เดา encoding จาก BOM/sample แล้วอ่านครั้งเดียว
+        # ถ้าข้อมูลหลัง sample decode ไม่ได้ ลอง candidate ที่เหลือ (cp874) ก่อน latin1
+        encoding = file_fingerprint_cache.get_encoding(file_path)
+        candidates = [encoding] + csv_encoding_fallbacks(encoding)
+        for candidate in candidates[:-1]:
+            try:
+                return self._read_csv_with_encoding(file_path, candidate, use_arrow)
+            except UnicodeDecodeError:
+                continue
+        return self._read_csv_with_encoding(file_path, candidates[-1], use_arrow)
+
+    def _read_csv_with_encoding(self, file_path, encoding, use_arrow):
+        """Read a whole CSV file with one encoding"""
+        if not use_arrow:
+            return pd.read_csv(file_path, encoding=encoding)
+        # Arrow ไม่ต้องเดาชนิดข้อมูล เพราะทุกคอลัมน์ลง staging เป็น NVARCHAR(MAX) อยู่แล้ว
+        frames = [arrow_batch_to_frame(batch) for batch in iter_arrow_csv_batches(file_path, encoding)]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
     def read_file_with_mapping(self, file_path, logic_type):
         """
         อ่านไฟล์และ apply column mapping
@@ -484,7 +577,7 @@ class FileReaderService:
             
             # อ่านแค่ส่วนบน
             if file_type == 'csv':
-                df = pd.read_csv(file_path, nrows=num_rows, encoding='utf-8')
+                df = pd.read_csv(file_path, nrows=num_rows, encoding=file_fingerprint_cache.get_encoding(file_path))
             elif file_type == 'excel_xls':
                 df = pd.read_excel(file_path, sheet_name=0, nrows=num_rows, engine='xlrd')
             else:
@@ -540,8 +633,7 @@ class FileReaderService:
             # นับจำนวนแถวโดยประมาณ (สำหรับไฟล์ใหญ่)
             try:
                 if file_type == 'csv':
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        row_count = sum(1 for line in f) - 1  # ลบ header
+                    row_count, _ = file_fingerprint_cache.get_row_count(file_path)
                 elif file_type == 'excel_xls':
                     # สำหรับ Excel .xls ใช้ xlrd engine
                     df_shape = pd.read_excel(file_path, sheet_name=0, engine='xlrd').shape
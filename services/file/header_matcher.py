@@ -0,0 +1,140 @@
+"""
+Header Matcher for PIPELINE_SQLSERVER
+
+Precompiled logic type detection: an inverted index from normalized column
+name to the logic types that use it, with per-type sizes and thresholds
+computed once. A header row is scored against every logic type with a
+single counting pass over its column names.
+"""
+
+import hashlib
+import json
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+
+class _LogicTypeEntry(NamedTuple):
+    """Precomputed sizes and thresholds of one logic type"""
+    logic_type: str
+    is_identity: bool
+    key_count: int
+    value_count: int
+    key_threshold: float
+    value_threshold: float
+
+
+def match_threshold(total: int) -> float:
+    """
+    Minimum score for a logic type with `total` columns
+
+    At least 5 columns or 10% for 50+ columns, 5 columns or 20% for 20-49, 30% otherwise
+    """
+    if total >= 50:
+        return max(0.1, 5 / total)
+    if total >= 20:
+        return max(0.2, 5 / total)
+    return 0.3
+
+
+class HeaderMatcher:
+    """
+    Matches a file's header row to the best logic type of the column settings
+
+    Scoring and tie-breaking are the same as the previous per-type loop:
+    - identity mappings score matched columns / configured columns
+    - other mappings use whichever side (source or target names) matches more,
+      the target side when both match equally
+    - the first logic type (settings order) with the highest passing score wins
+    """
+
+    @staticmethod
+    def settings_signature(column_settings: Dict) -> str:
+        """
+        Content signature of column settings (sha1 of the JSON, in settings order)
+
+        Args:
+            column_settings: {logic_type: {source column: target column}}
+
+        Returns:
+            str: Hex digest that changes whenever a mapping or the logic type order changes
+        """
+        # ไม่ sort keys เพราะลำดับ logic type มีผลกับการตัดสินเมื่อคะแนนเท่ากัน
+        return hashlib.sha1(
+            json.dumps(column_settings, ensure_ascii=False, default=str).encode('utf-8')
+        ).hexdigest()
+
+    def __init__(self, column_settings: Dict, normalize: Callable[[str], str]) -> None:
+        """
+        Build the index from column settings
+
+        Args:
+            column_settings: {logic_type: {source column: target column}}
+            normalize: Column name normalization function
+        """
+        self.signature = self.settings_signature(column_settings)
+        self._entries: List[_LogicTypeEntry] = []
+        # ชื่อคอลัมน์ → [(ลำดับ logic type, อยู่ใน keys, อยู่ใน values)]
+        self._index: Dict[str, List[Tuple[int, bool, bool]]] = {}
+
+        for logic_type, mapping in column_settings.items():
+            if not mapping or not isinstance(mapping, dict):
+                continue
+
+            keys = set(normalize(c) for c in mapping.keys() if c)
+            values = set(normalize(c) for c in mapping.values() if c)
+            type_idx = len(self._entries)
+            self._entries.append(_LogicTypeEntry(
+                logic_type=logic_type,
+                is_identity=(keys == values),
+                key_count=len(keys),
+                value_count=len(values),
+                key_threshold=match_threshold(len(keys)),
+                value_threshold=match_threshold(len(values)),
+            ))
+            for name in keys | values:
+                self._index.setdefault(name, []).append((type_idx, name in keys, name in values))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def match(self, header_names: Iterable[str]) -> Optional[str]:
+        """
+        Find the logic type whose columns best match a header row
+
+        Args:
+            header_names: Normalized column names of one header row
+
+        Returns:
+            Optional[str]: Best logic type, or None when no type passes its threshold
+        """
+        key_hits: Dict[int, int] = {}
+        value_hits: Dict[int, int] = {}
+        for name in set(header_names):
+            for type_idx, in_keys, in_values in self._index.get(name, ()):
+                if in_keys:
+                    key_hits[type_idx] = key_hits.get(type_idx, 0) + 1
+                if in_values:
+                    value_hits[type_idx] = value_hits.get(type_idx, 0) + 1
+
+        best_match = None
+        best_score = 0
+        # ไล่ตามลำดับใน settings และใช้ > เพื่อให้ type แรกชนะเมื่อคะแนนเท่ากัน
+        for type_idx in sorted(key_hits.keys() | value_hits.keys()):
+            entry = self._entries[type_idx]
+            keys_match = key_hits.get(type_idx, 0)
+            values_match = value_hits.get(type_idx, 0)
+
+            if entry.is_identity:
+                score = keys_match / entry.key_count
+                threshold = entry.key_threshold
+            elif keys_match > values_match:
+                score = keys_match / entry.key_count
+                threshold = entry.key_threshold
+            else:
+                score = values_match / entry.value_count if entry.value_count else 0
+                threshold = entry.value_threshold
+
+            if score >= threshold and score > best_score:
+                best_match = entry.logic_type
+                best_score = score
+
+        return best_match
@@ -0,0 +1,243 @@
+"""
+Parse Cache for PIPELINE_SQLSERVER
+
+On-disk cache of parsed Excel sources stored as Parquet. Every cell is kept as
+the staging text it is loaded into NVARCHAR(MAX) with, so a rerun of the same
+file (e.g. after fixing dtype settings) streams the cached text instead of
+parsing the workbook again.
+
+- Key: content hash of the file + reader settings + cache format version
+- Entries are written to a temporary file and renamed when complete
+- Size-bounded: least recently used entries are evicted above max_bytes
+"""
+
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Callable, Iterator, List, Optional
+
+import pandas as pd
+
+from constants import FileConstants
+
+
+# Schema metadata keys
+_HEADERS_KEY = b'pipeline.headers'
+_SOURCE_KEY = b'pipeline.source'
+
+
+class ParseCache:
+    """
+    Size-bounded LRU cache of parsed sources (one Parquet file per entry)
+
+    Requires pyarrow. Last use is tracked with the file mtime, which is
+    refreshed on every hit.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int, log_callback: Optional[Callable[[str], None]] = None) -> None:
+        """
+        Initialize cache
+
+        Args:
+            cache_dir: Folder holding the cached Parquet files
+            max_bytes: Maximum total size of the cache
+            log_callback: Function for logging
+        """
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_bytes = max_bytes
+        self.log_callback = log_callback if log_callback else print
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(content_hash: str, reader_key: str) -> str:
+        """
+        Cache key of one source file read with one reader configuration
+
+        Args:
+            content_hash: Hash of the file content
+            reader_key: Reader settings that change the parsed result (file type, backend)
+
+        Returns:
+            str: Cache key (hex)
+        """
+        raw = f"{content_hash}|{reader_key}|v{FileConstants.PARSE_CACHE_FORMAT_VERSION}"
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.parquet")
+
+    def contains(self, key: str) -> bool:
+        """Whether a complete entry exists for the key"""
+        return os.path.isfile(self._entry_path(key))
+
+    def iter_chunks(self, key: str, chunk_size: int, string_dtype: Any = None) -> Iterator[pd.DataFrame]:
+        """
+        Stream a cached entry as DataFrame chunks of staging text
+
+        Args:
+            key: Cache key
+            chunk_size: Rows per chunk
+            string_dtype: pandas dtype (or dtype name) of the string columns (default: string[pyarrow])
+
+        Yields:
+            pd.DataFrame: Chunks with the original headers
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        path = self._entry_path(key)
+        # ใช้ mtime เป็นเวลาใช้งานล่าสุดสำหรับ LRU
+        os.utime(path, None)
+
+        string_dtype = pd.api.types.pandas_dtype(string_dtype or "string[pyarrow]")
+        types_mapper = {pa.string(): string_dtype}.get
+
+        parquet_file = pq.ParquetFile(path)
+        try:
+            metadata = parquet_file.schema_arrow.metadata or {}
+            headers = json.loads(metadata[_HEADERS_KEY].decode('utf-8'))
+            for batch in parquet_file.iter_batches(batch_size=chunk_size):
+                chunk = batch.to_pandas(types_mapper=types_mapper)
+                chunk.columns = headers
+                yield chunk
+        finally:
+            parquet_file.close()
+
+    def write_through(self, key: str, chunks: Iterator[pd.DataFrame], source_name: str = "",
+                      is_cancelled: Optional[Callable[[], bool]] = None) -> Iterator[pd.DataFrame]:
+        """
+        Pass chunks through while writing them to a new cache entry
+
+        The entry is published (renamed into place) only when every chunk was
+        written; a cancelled, failed or abandoned read leaves no entry behind.
+
+        Args:
+            key: Cache key
+            chunks: Chunks of staging text (string or object columns)
+            source_name: Source file name stored in the entry metadata
+            is_cancelled: Returns True when the read was cancelled (partial result)
+
+        Yields:
+            pd.DataFrame: The same chunks, unchanged
+        """
+        import pyarrow.parquet as pq
+
+        final_path = self._entry_path(key)
+        tmp_path = f"{final_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        writer = None
+        schema = None
+        complete = False
+        try:
+            for chunk in chunks:
+                try:
+                    if writer is None:
+                        schema = self._build_schema(list(chunk.columns), source_name)
+                        writer = pq.ParquetWriter(tmp_path, schema)
+                    writer.write_table(self._chunk_to_table(chunk, schema))
+                except Exception as e:
+                    # เขียน cache ไม่ได้ไม่ควรทำให้การอ่านไฟล์ล้ม
+                    self.log_callback(f"⚠️ Parse cache write skipped: {e}")
+                    writer = self._discard(writer, tmp_path)
+                    yield chunk
+                    yield from chunks
+                    return
+                yield chunk
+            complete = writer is not None and not (is_cancelled and is_cancelled())
+        finally:
+            if complete:
+                writer.close()
+                os.replace(tmp_path, final_path)
+                self.log_callback(f"💾 Parse cache saved ({os.path.getsize(final_path) / 1024 / 1024:.1f} MB)")
+                self.evict(keep=final_path)
+            else:
+                self._discard(writer, tmp_path)
+
+    @staticmethod
+    def _build_schema(headers: List[Any], source_name: str):
+        """All-string schema with positional field names (headers may repeat or not be strings)"""
+        import pyarrow as pa
+
+        fields = [pa.field(f"c{idx}", pa.string()) for idx in range(len(headers))]
+        metadata = {
+            _HEADERS_KEY: json.dumps(headers, ensure_ascii=False, default=str).encode('utf-8'),
+            _SOURCE_KEY: source_name.encode('utf-8'),
+        }
+        return pa.schema(fields, metadata=metadata)
+
+    @staticmethod
+    def _chunk_to_table(chunk: pd.DataFrame, schema):
+        """Convert a chunk of staging text to an Arrow table"""
+        import pyarrow as pa
+
+        arrays = [
+            pa.array(chunk.iloc[:, col_idx], type=pa.string(), from_pandas=True)
+            for col_idx in range(len(chunk.columns))
+        ]
+        return pa.Table.from_arrays(arrays, schema=schema)
+
+    @staticmethod
+    def _discard(writer, tmp_path: str) -> None:
+        """Close and remove an unfinished entry"""
+        try:
+            if writer is not None:
+                writer.close()
+        except Exception:
+            pass
+        try:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        except OSError:
+            pass
+        return None
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """
+        Remove least recently used entries until the cache fits in max_bytes
+
+        Args:
+            keep: Entry path never removed (the one just written)
+
+        Returns:
+            int: Number of entries removed
+        """
+        with self._lock:
+            entries = []
+            for name in os.listdir(self.cache_dir):
+                if not name.endswith('.parquet'):
+                    continue
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            removed = 0
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                removed += 1
+
+        if removed:
+            self.log_callback(f"🧹 Parse cache: evicted {removed} old entries")
+        return removed
+
+    def clear(self) -> None:
+        """Remove every cached entry"""
+        with self._lock:
+            for name in os.listdir(self.cache_dir):
+                if name.endswith('.parquet') or name.endswith('.tmp'):
+                    try:
+                        os.remove(os.path.join(self.cache_dir, name))
+                    except OSError:
+                        pass
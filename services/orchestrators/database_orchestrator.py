@@ -132,21 +132,65 @@ class DatabaseOrchestrator:
         """Check and create schemas as specified if they don't exist"""
         return self.schema_service.ensure_schemas_exist(schema_names)
 
-    def upload_data(self, df, logic_type, required_cols, schema_name='bronze', log_func=None, force_recreate=False, clear_existing=True):
+    def upload_data(self, df, logic_type, required_cols, schema_name='bronze', log_func=None, force_recreate=False, clear_existing=True,
+                    phase_callback=None, cancel_token=None):
         """
         อัปโหลดข้อมูลไปยังฐานข้อมูล: สร้างตารางใหม่ตาม config, insert เฉพาะคอลัมน์ที่ตั้งค่าไว้, ถ้า schema DB ไม่ตรงให้ drop และสร้างตารางใหม่
         
         Args:
-            df: DataFrame ที่จะอัปโหลด
+            df: DataFrame ที่จะอัปโหลด หรือ iterable ของ DataFrame chunks (streaming)
             logic_type: ประเภทไฟล์
             required_cols: คอลัมน์และชนิดข้อมูลที่ต้องการ
             schema_name: ชื่อ schema ในฐานข้อมูล
             log_func: ฟังก์ชันสำหรับ log
             force_recreate: บังคับสร้างตารางใหม่ (ใช้เมื่อมีการปรับปรุงชนิดข้อมูลอัตโนมัติ)
             clear_existing: ล้างข้อมูลเดิมหรือไม่ (default True เพื่อความเข้ากันได้แบบเดิม)
+            phase_callback: รับ (phase, info) เมื่อ staging/validation/batch ของ transfer/transfer เสร็จแล้ว (run journal)
+            cancel_token: CancellationToken ของงาน เมื่อถูก set จะยกเลิก statement ที่กำลังรันและลบ staging/work tables
         """
         return self.upload_service.upload_data(
-            df, logic_type, required_cols, schema_name, log_func, force_recreate, clear_existing
+            df, logic_type, required_cols, schema_name, log_func, force_recreate, clear_existing, phase_callback,
+            cancel_token=cancel_token
+        )
+
+    def get_last_upload(self):
+        """Target table and row count of the last successful upload_data ({} if it failed)"""
+        return dict(self.upload_service.last_upload)
+
+    def resume_transfer(self, logic_type, required_cols, schema_name='bronze', log_func=None, phase_callback=None,
+                        cancel_token=None):
+        """
+        ทำ transfer ที่ถูกขัดจังหวะต่อจาก batch สุดท้ายที่ commit แล้ว
+        
+        Args:
+            logic_type: ประเภทไฟล์
+            required_cols: คอลัมน์และชนิดข้อมูลที่ต้องการ
+            schema_name: ชื่อ schema ในฐานข้อมูล
+            log_func: ฟังก์ชันสำหรับ log
+            phase_callback: เหมือนใน upload_data
+            cancel_token: เหมือนใน upload_data
+        """
+        return self.upload_service.resume_transfer(
+            logic_type, required_cols, schema_name, log_func, phase_callback, cancel_token=cancel_token
+        )
+
+    def resume_from_staging(self, logic_type, required_cols, schema_name='bronze', log_func=None,
+                            expected_rows=None, phase_callback=None, cancel_token=None):
+        """
+        validate และ transfer staging table ที่ค้างจากรอบที่ถูกขัดจังหวะ โดยไม่อ่านไฟล์ใหม่
+        
+        Args:
+            logic_type: ประเภทไฟล์
+            required_cols: คอลัมน์และชนิดข้อมูลที่ต้องการ
+            schema_name: ชื่อ schema ในฐานข้อมูล
+            log_func: ฟังก์ชันสำหรับ log
+            expected_rows: จำนวนแถวที่รอบเดิม stage ไว้ (ต้องตรงกัน)
+            phase_callback: เหมือนใน upload_data
+            cancel_token: เหมือนใน upload_data
+        """
+        return self.upload_service.resume_from_staging(
+            logic_type, required_cols, schema_name, log_func, expected_rows, phase_callback,
+            cancel_token=cancel_token
         )
 
     def validate_data_in_staging(self, staging_table, logic_type, required_cols, 
@@ -16,6 +16,9 @@ Usage examples:
     # Normal usage (original interface)
     success, df = file_service.read_excel_file("data.xlsx", "sales_data")
     
+    # Streaming usage (bounded memory, pass chunks straight to upload_data)
+    success, chunks = file_service.read_excel_file_chunks("data.csv", "sales_data")
+    
     # Separate usage
     file_info = file_service.get_file_info("data.xlsx")
     validation = file_service.validate_file_before_processing("data.xlsx", "sales_data")
@@ -23,14 +26,21 @@ Usage examples:
 
 from typing import Optional, Tuple
 import logging
+import threading
+import time
 
 from services.file import (
     FileReaderService,
     DataProcessorService,
-    FileManagementService
+    FileManagementService,
+    ParseCache,
+    file_fingerprint_cache
 )
 from performance_optimizations import PerformanceOptimizer
-from config.json_manager import load_column_settings, load_dtype_settings
+from config.json_manager import json_manager, load_column_settings, load_dtype_settings
+from constants import FileConstants, PathConstants
+from utils.csv_utils import is_pyarrow_available
+from utils.helpers import estimate_xlsx_rows
 
 
 class FileOrchestrator:
@@ -72,6 +82,12 @@ class FileOrchestrator:
         
         # สร้าง performance optimizer
         self.performance_optimizer = PerformanceOptimizer(self.log_callback)
+        self.performance_optimizer.set_fingerprint_cache(file_fingerprint_cache)
+        
+        # performance optimizer (chunk size, reader backends, stats) ใช้ร่วมกัน อ่านเต็มไฟล์ได้ทีละไฟล์
+        # การอ่านแบบ stream ใช้ optimizer ของตัวเองต่อการเรียก (_new_performance_optimizer)
+        self._read_lock = threading.Lock()
+        self._cancellation_token = self.performance_optimizer.cancellation_token
         
         # เก็บ reference สำหรับ backward compatibility
         self.search_path = self.file_reader.search_path
@@ -94,23 +110,15 @@ class FileOrchestrator:
             tuple: (success, result/error_message, columns_info)
         """
         try:
-            import pandas as pd
-            
-            # อ่านเฉพาะแถวแรกๆ เพื่อดูโครงสร้างคอลัมน์
-            if file_path.lower().endswith('.csv'):
-                try:
-                    preview_df = pd.read_csv(file_path, nrows=max_rows, encoding='utf-8')
-                except UnicodeDecodeError:
-                    preview_df = pd.read_csv(file_path, nrows=max_rows, encoding='tis-620')
-            else:
-                # สำหรับ Excel
-                preview_df = pd.read_excel(file_path, nrows=max_rows)
+            # ใช้แถวแรกๆ ที่อ่านไว้แล้วตอน detect (cache ตาม path/size/mtime) ไม่ต้องเปิดไฟล์ซ้ำ
+            peek = file_fingerprint_cache.get_peek(file_path, max_rows + 1)
+            preview_rows = max(len(peek) - 1, 0)  # ไม่นับแถว header
             
-            if preview_df.empty:
+            if preview_rows == 0:
                 return False, "File is empty", None
             
             # ดึงชื่อคอลัมน์จาก preview
-            file_columns = list(preview_df.columns)
+            file_columns = file_fingerprint_cache.get_header_columns(file_path)
             
             # Apply column mapping เพื่อดูว่าคอลัมน์จะถูก rename อย่างไร
             col_map = self.file_reader.build_rename_mapping_for_dataframe(file_columns, logic_type)
@@ -130,7 +138,7 @@ class FileOrchestrator:
                 'mapped_columns': mapped_columns,
                 'column_mapping': col_map,
                 'total_columns': len(file_columns),
-                'preview_rows': len(preview_df)
+                'preview_rows': preview_rows
             }
             
             if success:
@@ -150,6 +158,13 @@ class FileOrchestrator:
             logic_type: File type
             No automatic correction system is used
         """
+        # upload job หลายประเภทเรียกพร้อมกันได้: parse ติด GIL อยู่แล้ว จึงอ่านทีละไฟล์
+        # ขณะที่ job อื่นทำงานฝั่งฐานข้อมูล (staging/validation/transfer) ต่อไปได้
+        with self._read_lock:
+            return self._read_excel_file(file_path, logic_type)
+    
+    def _read_excel_file(self, file_path, logic_type):
+        """Read a whole file (caller holds _read_lock)"""
         try:
             # รีเซ็ต log flags สำหรับไฟล์ใหม่
             self.data_processor._reset_log_flags()
@@ -162,6 +177,7 @@ class FileOrchestrator:
             else:
                 file_type = 'excel'
             
+            self._configure_readers()
             success, df = self.performance_optimizer.read_large_file_chunked(file_path, file_type)
             if not success:
                 return False, "Unable to read file"
@@ -172,8 +188,11 @@ class FileOrchestrator:
                 self.log_callback(f"🔄 Renamed columns by mapping ({len(col_map)} columns)")
                 df.rename(columns=col_map, inplace=True)
             
-            # ปรับปรุง memory usage
-            df = self.performance_optimizer.optimize_memory_usage(df)
+            # raw ingest: คอลัมน์เป็น string อยู่แล้ว category/downcast จะถูกแปลงกลับเป็นข้อความตอนลง staging อยู่ดี
+            if not self.performance_optimizer.raw_ingest:
+                optimize_start = time.perf_counter()
+                df = self.performance_optimizer.optimize_memory_usage(df)
+                self.log_callback(f"⏱️ Memory optimization took {time.perf_counter() - optimize_start:.1f}s")
             
             # หมายเหตุ: การตรวจสอบข้อมูลจะทำใน staging table ด้วย SQL แทน pandas
             self.log_callback(f"🔄 Ingest as NVARCHAR(MAX) first, then validate/convert using SQL")
@@ -189,6 +208,90 @@ class FileOrchestrator:
             self.log_callback(error_msg)
             return False, error_msg
     
+    def read_excel_file_chunks(self, file_path, logic_type):
+        """
+        Stream Excel or CSV file as renamed DataFrame chunks (memory stays bounded by chunk size)
+        
+        Args:
+            file_path: File path
+            logic_type: File type
+            
+        Returns:
+            tuple: (success, chunk iterator or error message)
+        """
+        try:
+            # รีเซ็ต log flags สำหรับไฟล์ใหม่
+            self.data_processor._reset_log_flags()
+            
+            if file_path.lower().endswith('.csv'):
+                file_type = 'csv'
+            elif file_path.lower().endswith('.xls'):
+                file_type = 'excel_xls'
+            else:
+                file_type = 'excel'
+            
+            # upload job หลายประเภทอ่านพร้อมกันได้ จึงไม่ใช้ optimizer ที่ใช้ร่วมกัน
+            optimizer = self._new_performance_optimizer()
+            chunks = self._iter_renamed_chunks(optimizer, file_path, file_type, logic_type)
+            
+            # pipeline_queue_size > 0: parse ใน background thread ขณะที่ upload chunk ก่อนหน้า
+            queue_size = json_manager.get('app_settings', 'pipeline_queue_size', 2)
+            if queue_size and queue_size > 0:
+                chunks = optimizer.prefetch_chunks(chunks, queue_size)
+            
+            return True, chunks
+            
+        except Exception as e:
+            error_msg = f"❌ Error while reading file: {e}"
+            self.log_callback(error_msg)
+            return False, error_msg
+    
+    def _configure_readers(self, optimizer=None):
+        """Apply reader backends from app settings to a performance optimizer (the shared one by default)"""
+        optimizer = optimizer or self.performance_optimizer
+        optimizer.set_excel_reader(json_manager.get('app_settings', 'excel_reader', 'auto'))
+        optimizer.set_csv_reader(json_manager.get('app_settings', 'csv_reader', 'auto'))
+        optimizer.set_raw_ingest(json_manager.get('app_settings', 'raw_ingest', False))
+        optimizer.set_parse_cache(self._get_parse_cache())
+    
+    def _new_performance_optimizer(self):
+        """Performance optimizer of one streaming read (own chunk size, reader settings, stats and cancel token)"""
+        optimizer = PerformanceOptimizer(self.log_callback)
+        optimizer.set_fingerprint_cache(file_fingerprint_cache)
+        optimizer.set_cancellation_token(self._cancellation_token)
+        self._configure_readers(optimizer)
+        return optimizer
+    
+    def _get_parse_cache(self):
+        """Parse cache from app settings (None when disabled or pyarrow is not installed)"""
+        if not json_manager.get('app_settings', 'parse_cache', False):
+            return None
+        if not is_pyarrow_available():
+            self.log_callback("⚠️ parse_cache requires pyarrow - Excel files will be parsed without cache")
+            return None
+        
+        cache_dir = json_manager.get('app_settings', 'parse_cache_dir', '') or PathConstants.PARSE_CACHE_DIR
+        max_mb = json_manager.get('app_settings', 'parse_cache_max_mb', FileConstants.PARSE_CACHE_MAX_MB)
+        try:
+            return ParseCache(cache_dir, int(max_mb) * 1024 * 1024, self.log_callback)
+        except Exception as e:
+            self.log_callback(f"⚠️ Parse cache unavailable ({e}) - Excel files will be parsed without cache")
+            return None
+    
+    def _iter_renamed_chunks(self, optimizer, file_path, file_type, logic_type):
+        """Yield chunks from a performance optimizer with column mapping applied"""
+        col_map = None
+        for chunk in optimizer.iter_file_chunks(file_path, file_type):
+            # ทุก chunk ใช้ header เดียวกัน จึงสร้าง mapping ครั้งเดียวจาก chunk แรก
+            if col_map is None:
+                col_map = self.file_reader.build_rename_mapping_for_dataframe(chunk.columns, logic_type) or {}
+                if col_map:
+                    self.log_callback(f"🔄 Renamed columns by mapping ({len(col_map)} columns)")
+                self.log_callback("🔄 Streaming chunks as NVARCHAR(MAX) into staging, then validate/convert using SQL")
+            if col_map:
+                chunk = chunk.rename(columns=col_map)
+            yield chunk
+    
     # ========================
     # Delegation Methods
     # ========================
@@ -198,6 +301,12 @@ class FileOrchestrator:
         self.search_path = path
         self.file_reader.set_search_path(path)
 
+    def set_cancellation_token(self, token):
+        """Stop file reads and chunk prefetching when the token of the current operation is set"""
+        # streaming read ที่เริ่มแล้วเก็บ token ของ operation ตัวเองไว้ใน optimizer ของมัน
+        self._cancellation_token = token
+        self.performance_optimizer.set_cancellation_token(token)
+
     def find_data_files(self):
         """Find Excel and CSV files in specified path"""
         return self.file_reader.find_data_files()
@@ -206,6 +315,26 @@ class FileOrchestrator:
         """Detect file type"""
         return self.file_reader.detect_file_type(file_path)
 
+    def get_content_hash(self, file_path):
+        """Hash of the file content (cached per file version)"""
+        return file_fingerprint_cache.get_content_hash(file_path)
+
+    def estimate_row_count(self, file_path):
+        """Cheap data row estimate (CSV newline scan, .xlsx sheet dimension), None when unknown"""
+        lower = file_path.lower()
+        try:
+            if lower.endswith('.csv'):
+                return file_fingerprint_cache.get_row_count(file_path)[0]
+            if lower.endswith('.xlsx'):
+                return estimate_xlsx_rows(file_path)
+        except OSError:
+            pass
+        return None
+
+    def detect_file_types(self, file_paths, max_workers=1, cancel_event=None):
+        """Detect file types of many files (process pool when max_workers > 1), yields (file_path, logic_type)"""
+        return self.file_reader.detect_file_types(file_paths, max_workers, cancel_event)
+
     def get_column_name_mapping(self, file_type):
         """Get column name mapping by file type"""
         return self.file_reader.get_column_name_mapping(file_type)
@@ -6,8 +6,17 @@ Contains utility and helper services
 
 from .permission_checker_service import PermissionCheckerService
 from .preload_service import PreloadService
+from .ingest_manifest_service import IngestManifestService
+from .run_journal_service import RunJournalService
+from .folder_watch_service import FolderWatchService
+from .job_scheduler_service import JobSchedulerService, UploadJob
 
 __all__ = [
     'PermissionCheckerService',
-    'PreloadService'
+    'PreloadService',
+    'IngestManifestService',
+    'RunJournalService',
+    'FolderWatchService',
+    'JobSchedulerService',
+    'UploadJob'
 ]
\ No newline at end of file
@@ -0,0 +1,222 @@
+"""
+Folder Watch Service for PIPELINE_SQLSERVER
+
+Long-running watch of a source folder for `auto_process_cli.py --watch`.
+New files are reported by the OS file system notifications through watchdog
+(inotify on Linux) when it is installed, otherwise by polling the folder.
+A file is handed over only once its size and modification time have stopped
+changing (it is no longer being copied), and arrivals are batched over a short
+window so a burst of files is processed in one run.
+"""
+
+import importlib.util
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from constants import FileConstants
+
+
+def is_watchdog_available() -> bool:
+    """Check whether watchdog is installed"""
+    return importlib.util.find_spec("watchdog") is not None
+
+
+class FolderWatchService:
+    """
+    Watches the top level of one folder for new or changed data files
+
+    Subfolders (e.g. where uploaded files are moved) are not watched.
+    """
+
+    def __init__(self, folder: str, settle_seconds: float = FileConstants.WATCH_SETTLE_SECONDS,
+                 batch_seconds: float = FileConstants.WATCH_BATCH_SECONDS,
+                 poll_seconds: float = FileConstants.WATCH_POLL_SECONDS,
+                 log_callback: Optional[Callable[[str], None]] = None) -> None:
+        """
+        Initialize Folder Watch Service
+
+        Args:
+            folder: Folder to watch
+            settle_seconds: Time a file's size and mtime must stay unchanged before it is ready
+            batch_seconds: Time to wait for more files after the first ready file
+            poll_seconds: Folder scan interval when watchdog is not available
+            log_callback: Function for logging
+        """
+        self.folder = os.path.abspath(folder)
+        self.settle_seconds = settle_seconds
+        self.batch_seconds = batch_seconds
+        self.poll_seconds = poll_seconds
+        self.log_callback = log_callback if log_callback else print
+        self.logger = logging.getLogger(__name__)
+
+        self._events: "queue.Queue[str]" = queue.Queue()
+        self._stop_event = threading.Event()
+        self._observer = None
+        # สถานะไฟล์ล่าสุดที่เห็นในโฟลเดอร์ (ใช้ในโหมด polling)
+        self._snapshot: Dict[str, Tuple[int, int]] = {}
+
+    @staticmethod
+    def is_data_file(file_path: str) -> bool:
+        """Whether a path is a data file the pipeline reads (Office lock files are ignored)"""
+        name = os.path.basename(file_path)
+        if name.startswith('~$') or name.startswith('.'):
+            return False
+        return os.path.splitext(name)[1].lower() in FileConstants.SUPPORTED_EXTENSIONS
+
+    def start(self) -> None:
+        """
+        Start receiving file notifications
+
+        Call before processing the files already in the folder, so files that
+        arrive meanwhile are not missed.
+        """
+        self._stop_event.clear()
+        self._snapshot = self._scan()
+        if is_watchdog_available():
+            try:
+                self._observer = self._start_observer()
+                self.log_callback(f"👀 Watching {self.folder} (file system notifications)")
+                return
+            except Exception as e:
+                self.log_callback(f"⚠️ File system notifications unavailable ({e}), polling instead")
+        self._observer = None
+        self.log_callback(f"👀 Watching {self.folder} (polling every {self.poll_seconds:g} seconds)")
+
+    def _start_observer(self):
+        """Start a watchdog observer that queues the paths of created, modified and moved-in files"""
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+
+        events = self._events
+
+        class _Handler(FileSystemEventHandler):
+            def on_created(self, event):
+                if not event.is_directory:
+                    events.put(event.src_path)
+
+            def on_modified(self, event):
+                if not event.is_directory:
+                    events.put(event.src_path)
+
+            def on_moved(self, event):
+                if not event.is_directory:
+                    events.put(event.dest_path)
+
+        observer = Observer()
+        observer.schedule(_Handler(), self.folder, recursive=False)
+        observer.daemon = True
+        observer.start()
+        return observer
+
+    def stop(self) -> None:
+        """Stop watching (run() returns after its current tick)"""
+        self._stop_event.set()
+        if self._observer is not None:
+            try:
+                self._observer.stop()
+                self._observer.join(timeout=5)
+            except Exception:
+                pass
+            self._observer = None
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        """(size, mtime) of every data file at the top level of the folder"""
+        snapshot = {}
+        try:
+            with os.scandir(self.folder) as entries:
+                for entry in entries:
+                    if entry.is_file() and self.is_data_file(entry.path):
+                        try:
+                            stat = entry.stat()
+                        except OSError:
+                            continue
+                        snapshot[os.path.abspath(entry.path)] = (stat.st_size, stat.st_mtime_ns)
+        except OSError as e:
+            self.logger.warning(f"Could not scan {self.folder}: {e}")
+        return snapshot
+
+    def _poll_changes(self) -> List[str]:
+        """Files that are new or changed since the previous scan"""
+        snapshot = self._scan()
+        changed = [path for path, state in snapshot.items() if self._snapshot.get(path) != state]
+        self._snapshot = snapshot
+        return changed
+
+    @staticmethod
+    def _stat(file_path: str) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(file_path)
+            return stat.st_size, stat.st_mtime_ns
+        except OSError:
+            return None
+
+    @staticmethod
+    def _can_open(file_path: str) -> bool:
+        """Whether the file can be opened for reading (Windows locks files that are still being copied)"""
+        try:
+            with open(file_path, 'rb'):
+                return True
+        except OSError:
+            return False
+
+    def run(self, on_batch: Callable[[List[str]], None]) -> None:
+        """
+        Hand over batches of settled new files until stop() is called
+
+        Args:
+            on_batch: Called with the paths of a batch of ready files (in the calling thread)
+        """
+        # path → (size, mtime, เวลาที่เปลี่ยนล่าสุด)
+        pending: Dict[str, Tuple[int, int, float]] = {}
+        ready: List[str] = []
+        batch_started = None
+        tick = min(self.poll_seconds, 1.0) if self._observer is None else 0.5
+        next_poll = time.monotonic() + self.poll_seconds
+
+        while not self._stop_event.is_set():
+            try:
+                paths = [self._events.get(timeout=tick)]
+            except queue.Empty:
+                paths = []
+            while True:
+                try:
+                    paths.append(self._events.get_nowait())
+                except queue.Empty:
+                    break
+
+            now = time.monotonic()
+            if self._observer is None and now >= next_poll:
+                paths.extend(self._poll_changes())
+                next_poll = now + self.poll_seconds
+
+            for path in paths:
+                path = os.path.abspath(path)
+                if os.path.dirname(path) != self.folder or not self.is_data_file(path) or path in ready:
+                    continue
+                state = self._stat(path)
+                if state is not None and (path not in pending or pending[path][:2] != state):
+                    pending[path] = (state[0], state[1], now)
+
+            # ไฟล์ที่ขนาดและ mtime ไม่เปลี่ยนครบ settle_seconds ถือว่าคัดลอกเสร็จแล้ว
+            for path, (size, mtime_ns, changed_at) in list(pending.items()):
+                state = self._stat(path)
+                if state is None:
+                    del pending[path]
+                elif state != (size, mtime_ns):
+                    pending[path] = (state[0], state[1], now)
+                elif now - changed_at >= self.settle_seconds and self._can_open(path):
+                    del pending[path]
+                    ready.append(path)
+                    if batch_started is None:
+                        batch_started = now
+
+            if ready and now - batch_started >= self.batch_seconds:
+                batch, ready, batch_started = ready, [], None
+                batch = [path for path in batch if os.path.exists(path)]
+                if batch:
+                    self.log_callback(f"📥 {len(batch)} new file(s) ready: {', '.join(os.path.basename(p) for p in batch)}")
+                    on_batch(batch)
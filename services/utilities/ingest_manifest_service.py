@@ -0,0 +1,117 @@
+"""
+Ingest Manifest Service for PIPELINE_SQLSERVER
+
+Local SQLite record of every file loaded into SQL Server, keyed by the hash of
+the file content. Auto process checks it before parsing a file, so a file that
+was copied back or resent is skipped (or flagged) instead of being reloaded.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import datetime
+from typing import Dict, Optional
+
+from constants import PathConstants
+
+
+class IngestManifestService:
+    """
+    Ingest manifest (SQLite)
+
+    One row per (content hash, logic type): file name and size, target table,
+    row count and load time of the last successful load.
+    """
+
+    def __init__(self, db_path: Optional[str] = None) -> None:
+        """
+        Initialize Ingest Manifest Service
+
+        Args:
+            db_path: SQLite file path (default: config/ingest_manifest.db)
+        """
+        self.db_path = db_path or PathConstants.INGEST_MANIFEST_FILE
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection (the schema is created on first use)"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        if not self._initialized:
+            with self._lock:
+                if not self._initialized:
+                    conn.execute("""
+                        CREATE TABLE IF NOT EXISTS ingest_manifest (
+                            content_hash TEXT NOT NULL,
+                            logic_type TEXT NOT NULL,
+                            file_name TEXT NOT NULL,
+                            file_size INTEGER NOT NULL,
+                            target_table TEXT,
+                            row_count INTEGER,
+                            loaded_at TEXT NOT NULL,
+                            PRIMARY KEY (content_hash, logic_type)
+                        )
+                    """)
+                    conn.commit()
+                    self._initialized = True
+        return conn
+
+    def find_loaded(self, content_hash: str) -> Optional[Dict]:
+        """
+        Last successful load of a file content
+
+        Args:
+            content_hash: Hash of the file content
+
+        Returns:
+            Optional[Dict]: Manifest row (file_name, logic_type, target_table, row_count, loaded_at), None if never loaded
+        """
+        try:
+            with closing(self._connect()) as conn:
+                row = conn.execute(
+                    "SELECT * FROM ingest_manifest WHERE content_hash = ? ORDER BY loaded_at DESC LIMIT 1",
+                    (content_hash,)
+                ).fetchone()
+            return dict(row) if row else None
+        except sqlite3.Error as e:
+            self.logger.warning(f"Could not read ingest manifest: {e}")
+            return None
+
+    def record_load(self, content_hash: str, file_path: str, logic_type: str,
+                    target_table: Optional[str] = None, row_count: Optional[int] = None) -> bool:
+        """
+        Record a successful load
+
+        Args:
+            content_hash: Hash of the file content
+            file_path: Loaded file (name and size are stored)
+            logic_type: File type
+            target_table: Table the file was loaded into (schema.table)
+            row_count: Rows loaded
+
+        Returns:
+            bool: Whether the row was written
+        """
+        try:
+            file_size = os.path.getsize(file_path) if os.path.exists(file_path) else 0
+            with closing(self._connect()) as conn:
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO ingest_manifest
+                        (content_hash, logic_type, file_name, file_size, target_table, row_count, loaded_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (
+                        content_hash, logic_type, os.path.basename(file_path), file_size,
+                        target_table, row_count, datetime.now().isoformat(sep=' ', timespec='seconds')
+                    )
+                )
+                conn.commit()
+            return True
+        except (sqlite3.Error, OSError) as e:
+            self.logger.warning(f"Could not write ingest manifest: {e}")
+            return False
@@ -0,0 +1,215 @@
+"""
+Job Scheduler Service for PIPELINE_SQLSERVER
+
+Orders the upload jobs of an auto process run by estimated cost, so one very
+large file does not delay every small file found after it. The cost of a job
+is estimated from its file sizes and row estimates with the throughput of
+recent loads of the same logic type (kept in a local SQLite history).
+
+Policies:
+- sjf: shortest estimated load time first (lowest mean time until each table is loaded)
+- fifo: the order the files were found in
+- priority: logic types listed in job_priority first (in that order), then shortest first
+
+Jobs that load the same table keep their discovery order under every policy: with
+clear_existing each job replaces the table, so the last file found must load last.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+from contextlib import closing
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from constants import FileConstants, PathConstants
+
+
+@dataclass
+class UploadJob:
+    """One upload_data call of auto process: files of one logic type"""
+    logic_type: str
+    file_paths: List[str]
+    order: int  # position in discovery order
+    total_bytes: int = 0
+    estimated_rows: Optional[int] = None  # None when a file has no cheap estimate
+    estimated_seconds: float = 0.0
+    target_table: Optional[str] = None  # table the job loads (logic type when not resolved)
+
+
+class JobSchedulerService:
+    """
+    Cost estimates and ordering of auto process upload jobs
+
+    Load history is one row per successful job: logic type, bytes, rows and seconds.
+    """
+
+    def __init__(self, history_path: Optional[str] = None) -> None:
+        """
+        Initialize Job Scheduler Service
+
+        Args:
+            history_path: SQLite file path of the load history (default: config/load_history.db)
+        """
+        self.history_path = history_path or PathConstants.LOAD_HISTORY_FILE
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._initialized = False
+        self._throughput: Optional[Dict[str, Tuple[float, Optional[float]]]] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection (the schema is created on first use)"""
+        conn = sqlite3.connect(self.history_path, timeout=30)
+        if not self._initialized:
+            with self._lock:
+                if not self._initialized:
+                    conn.execute("""
+                        CREATE TABLE IF NOT EXISTS load_history (
+                            id INTEGER PRIMARY KEY AUTOINCREMENT,
+                            logic_type TEXT NOT NULL,
+                            total_bytes INTEGER NOT NULL,
+                            row_count INTEGER,
+                            seconds REAL NOT NULL,
+                            loaded_at TEXT NOT NULL
+                        )
+                    """)
+                    conn.commit()
+                    self._initialized = True
+        return conn
+
+    def record_load(self, logic_type: str, total_bytes: int, row_count: Optional[int], seconds: float) -> None:
+        """
+        Add a successful job to the load history
+
+        Args:
+            logic_type: File type
+            total_bytes: Size of the job's files
+            row_count: Rows loaded (None if unknown)
+            seconds: Wall time from first read to committed transfer
+        """
+        if seconds <= 0:
+            return
+        try:
+            with closing(self._connect()) as conn:
+                conn.execute(
+                    "INSERT INTO load_history (logic_type, total_bytes, row_count, seconds, loaded_at) VALUES (?, ?, ?, ?, ?)",
+                    (logic_type, total_bytes, row_count, seconds, datetime.now().isoformat(sep=' ', timespec='seconds'))
+                )
+                conn.commit()
+            self._throughput = None
+        except sqlite3.Error as e:
+            self.logger.warning(f"Could not write load history: {e}")
+
+    def get_throughput(self) -> Dict[str, Tuple[float, Optional[float]]]:
+        """
+        Throughput of recent loads per logic type
+
+        Returns:
+            Dict[str, Tuple[float, Optional[float]]]: {logic_type: (bytes/sec, rows/sec or None)}
+        """
+        if self._throughput is not None:
+            return self._throughput
+
+        throughput = {}
+        try:
+            with closing(self._connect()) as conn:
+                rows = conn.execute("""
+                    SELECT logic_type, total_bytes, row_count, seconds FROM (
+                        SELECT logic_type, total_bytes, row_count, seconds,
+                               ROW_NUMBER() OVER (PARTITION BY logic_type ORDER BY id DESC) AS rn
+                        FROM load_history
+                    ) WHERE rn <= ?
+                """, (FileConstants.SCHEDULER_HISTORY_LOADS,)).fetchall()
+        except sqlite3.Error as e:
+            self.logger.warning(f"Could not read load history: {e}")
+            rows = []
+
+        # logic_type → [bytes, seconds, rows, seconds ของ load ที่รู้จำนวนแถว]
+        totals: Dict[str, List[float]] = {}
+        for logic_type, total_bytes, row_count, seconds in rows:
+            sums = totals.setdefault(logic_type, [0.0, 0.0, 0.0, 0.0])
+            sums[0] += total_bytes
+            sums[1] += seconds
+            if row_count:
+                sums[2] += row_count
+                sums[3] += seconds
+        for logic_type, (bytes_sum, seconds_sum, rows_sum, rows_seconds) in totals.items():
+            throughput[logic_type] = (bytes_sum / seconds_sum, rows_sum / rows_seconds if rows_seconds else None)
+
+        self._throughput = throughput
+        return throughput
+
+    def build_jobs(self, groups: Sequence[Tuple[str, List[str]]],
+                   row_estimator: Optional[Callable[[str], Optional[int]]] = None,
+                   table_resolver: Optional[Callable[[str], str]] = None) -> List[UploadJob]:
+        """
+        Create jobs with cost estimates
+
+        Args:
+            groups: (logic_type, file_paths) in discovery order
+            row_estimator: Cheap row count estimate of a file (None when unknown)
+            table_resolver: Target table of a logic type (the logic type itself when not given)
+
+        Returns:
+            List[UploadJob]: Jobs in discovery order
+        """
+        throughput = self.get_throughput()
+        default_bytes_per_sec = FileConstants.SCHEDULER_DEFAULT_MB_PER_SEC * 1024 * 1024
+        jobs = []
+        for order, (logic_type, file_paths) in enumerate(groups):
+            job = UploadJob(logic_type=logic_type, file_paths=list(file_paths), order=order,
+                            target_table=table_resolver(logic_type) if table_resolver else logic_type)
+            file_rows = []
+            for file_path in file_paths:
+                try:
+                    job.total_bytes += os.path.getsize(file_path)
+                except OSError:
+                    pass
+                file_rows.append(row_estimator(file_path) if row_estimator else None)
+            if all(rows is not None for rows in file_rows):
+                job.estimated_rows = sum(file_rows)
+
+            bytes_per_sec, rows_per_sec = throughput.get(logic_type, (default_bytes_per_sec, None))
+            # ใช้ rows/sec เมื่อทั้งประวัติและไฟล์มีจำนวนแถว (ขนาดไฟล์ต่อแถวต่างกันมากระหว่าง xlsx กับ csv)
+            if rows_per_sec and job.estimated_rows is not None:
+                job.estimated_seconds = job.estimated_rows / rows_per_sec
+            else:
+                job.estimated_seconds = job.total_bytes / bytes_per_sec
+            jobs.append(job)
+        return jobs
+
+    @staticmethod
+    def schedule(jobs: List[UploadJob], policy: str = FileConstants.SCHEDULE_SJF,
+                 priorities: Optional[Sequence[str]] = None) -> List[UploadJob]:
+        """
+        Order jobs by policy
+
+        Args:
+            jobs: Jobs in discovery order
+            policy: 'sjf', 'fifo' or 'priority'
+            priorities: Logic types to run first, most important first (priority policy)
+
+        Returns:
+            List[UploadJob]: Jobs in run order (jobs of one table stay in discovery order)
+        """
+        if policy == FileConstants.SCHEDULE_FIFO:
+            return sorted(jobs, key=lambda job: job.order)
+        if policy == FileConstants.SCHEDULE_PRIORITY:
+            rank = {logic_type: idx for idx, logic_type in enumerate(priorities or [])}
+            ordered = sorted(jobs, key=lambda job: (rank.get(job.logic_type, len(rank)), job.estimated_seconds, job.order))
+        else:
+            ordered = sorted(jobs, key=lambda job: (job.estimated_seconds, job.order))
+
+        # จัดลำดับใหม่ได้เฉพาะระหว่างตารางต่างกัน: ตำแหน่งของงานตารางเดียวกันถูกเติมตามลำดับที่พบไฟล์
+        by_table: Dict[str, List[UploadJob]] = {}
+        for job in sorted(jobs, key=lambda job: job.order):
+            by_table.setdefault(job.target_table or job.logic_type, []).append(job)
+        next_index = {table: 0 for table in by_table}
+        result = []
+        for job in ordered:
+            table = job.target_table or job.logic_type
+            result.append(by_table[table][next_index[table]])
+            next_index[table] += 1
+        return result
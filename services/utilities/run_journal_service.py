@@ -0,0 +1,205 @@
+"""
+Run Journal Service for PIPELINE_SQLSERVER
+
+Local SQLite checkpoint journal of auto process runs. Every file of a run has
+its phase (checked → parsed → staged → validated → transferred → moved) written as soon
+as the phase is durable, together with the staging table and the last
+committed transfer batch, so `auto_process_cli.py --resume` continues an
+interrupted run from the last durable point instead of reloading every file.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from constants import FileConstants, PathConstants
+
+
+# ลำดับของ phase ใช้เทียบว่าไฟล์ไปถึงขั้นไหนแล้ว
+PHASE_ORDER = [
+    FileConstants.PHASE_PENDING,
+    FileConstants.PHASE_CHECKED,
+    FileConstants.PHASE_PARSED,
+    FileConstants.PHASE_STAGED,
+    FileConstants.PHASE_VALIDATED,
+    FileConstants.PHASE_TRANSFERRED,
+    FileConstants.PHASE_MOVED,
+]
+
+
+class RunJournalService:
+    """
+    Run journal (SQLite)
+
+    One row per run (folder, start/finish time, status) and one row per file
+    of a run (content hash, logic type, phase, staging table, committed batch).
+    Every update is committed immediately.
+    """
+
+    RUN_RUNNING = "running"
+    RUN_COMPLETED = "completed"
+    RUN_ABANDONED = "abandoned"  # superseded by a new run of the same folder
+
+    def __init__(self, db_path: Optional[str] = None) -> None:
+        """
+        Initialize Run Journal Service
+
+        Args:
+            db_path: SQLite file path (default: config/run_journal.db)
+        """
+        self.db_path = db_path or PathConstants.RUN_JOURNAL_FILE
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection (the schema is created on first use)"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        if not self._initialized:
+            with self._lock:
+                if not self._initialized:
+                    conn.executescript("""
+                        CREATE TABLE IF NOT EXISTS journal_runs (
+                            run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                            folder TEXT NOT NULL,
+                            status TEXT NOT NULL,
+                            started_at TEXT NOT NULL,
+                            finished_at TEXT
+                        );
+                        CREATE TABLE IF NOT EXISTS journal_files (
+                            run_id INTEGER NOT NULL,
+                            file_path TEXT NOT NULL,
+                            content_hash TEXT,
+                            logic_type TEXT,
+                            phase TEXT NOT NULL,
+                            staging_table TEXT,
+                            staged_rows INTEGER,
+                            committed_row_id INTEGER,
+                            error TEXT,
+                            updated_at TEXT NOT NULL,
+                            PRIMARY KEY (run_id, file_path)
+                        );
+                    """)
+                    conn.commit()
+                    self._initialized = True
+        return conn
+
+    @staticmethod
+    def _now() -> str:
+        return datetime.now().isoformat(sep=' ', timespec='seconds')
+
+    def start_run(self, folder: str) -> Optional[int]:
+        """
+        Start a new run (unfinished earlier runs of the folder are marked abandoned)
+
+        Args:
+            folder: Source folder of the run
+
+        Returns:
+            Optional[int]: Run id, None if the journal could not be written
+        """
+        folder = os.path.abspath(folder)
+        try:
+            with closing(self._connect()) as conn:
+                # รอบใหม่โหลดทุกไฟล์เอง รอบเก่าที่ค้างจึงไม่ต้อง resume อีก
+                conn.execute(
+                    "UPDATE journal_runs SET status = ?, finished_at = ? WHERE folder = ? AND status = ?",
+                    (self.RUN_ABANDONED, self._now(), folder, self.RUN_RUNNING)
+                )
+                cursor = conn.execute(
+                    "INSERT INTO journal_runs (folder, status, started_at) VALUES (?, ?, ?)",
+                    (folder, self.RUN_RUNNING, self._now())
+                )
+                conn.commit()
+                return cursor.lastrowid
+        except sqlite3.Error as e:
+            self.logger.warning(f"Could not write run journal: {e}")
+            return None
+
+    def find_unfinished_run(self, folder: str) -> Optional[Dict]:
+        """
+        Latest run of a folder that did not finish (the process was killed or crashed)
+
+        Args:
+            folder: Source folder
+
+        Returns:
+            Optional[Dict]: Run row (run_id, folder, status, started_at), None if there is none
+        """
+        try:
+            with closing(self._connect()) as conn:
+                row = conn.execute(
+                    "SELECT * FROM journal_runs WHERE folder = ? AND status = ? ORDER BY run_id DESC LIMIT 1",
+                    (os.path.abspath(folder), self.RUN_RUNNING)
+                ).fetchone()
+            return dict(row) if row else None
+        except sqlite3.Error as e:
+            self.logger.warning(f"Could not read run journal: {e}")
+            return None
+
+    def finish_run(self, run_id: int, status: str = RUN_COMPLETED) -> None:
+        """Mark a run as finished (it is no longer offered for --resume)"""
+        try:
+            with closing(self._connect()) as conn:
+                conn.execute(
+                    "UPDATE journal_runs SET status = ?, finished_at = ? WHERE run_id = ?",
+                    (status, self._now(), run_id)
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            self.logger.warning(f"Could not write run journal: {e}")
+
+    def set_phase(self, run_id: Optional[int], file_paths: List[str], phase: str, **fields) -> None:
+        """
+        Record the phase a group of files has durably reached
+
+        Args:
+            run_id: Run id (None = journal disabled, nothing is written)
+            file_paths: Files of the same upload batch
+            phase: New phase (FileConstants.PHASE_*)
+            **fields: Other columns to set (content_hash, logic_type, staging_table,
+                      staged_rows, committed_row_id, error)
+        """
+        if run_id is None or not file_paths:
+            return
+        allowed = ('content_hash', 'logic_type', 'staging_table', 'staged_rows', 'committed_row_id', 'error')
+        fields = {name: value for name, value in fields.items() if name in allowed}
+        try:
+            with closing(self._connect()) as conn:
+                for file_path in file_paths:
+                    conn.execute(
+                        "INSERT OR IGNORE INTO journal_files (run_id, file_path, phase, updated_at) VALUES (?, ?, ?, ?)",
+                        (run_id, os.path.abspath(file_path), phase, self._now())
+                    )
+                    assignments = ", ".join([f"{name} = ?" for name in fields] + ["phase = ?", "updated_at = ?"])
+                    conn.execute(
+                        f"UPDATE journal_files SET {assignments} WHERE run_id = ? AND file_path = ?",
+                        (*fields.values(), phase, self._now(), run_id, os.path.abspath(file_path))
+                    )
+                conn.commit()
+        except sqlite3.Error as e:
+            self.logger.warning(f"Could not write run journal: {e}")
+
+    def get_files(self, run_id: int) -> List[Dict]:
+        """Files of a run with their last recorded phase"""
+        try:
+            with closing(self._connect()) as conn:
+                rows = conn.execute(
+                    "SELECT * FROM journal_files WHERE run_id = ? ORDER BY file_path", (run_id,)
+                ).fetchall()
+            return [dict(row) for row in rows]
+        except sqlite3.Error as e:
+            self.logger.warning(f"Could not read run journal: {e}")
+            return []
+
+    @staticmethod
+    def phase_reached(phase: str, target: str) -> bool:
+        """Whether phase is at or after target (failed files reach nothing)"""
+        if phase not in PHASE_ORDER or target not in PHASE_ORDER:
+            return False
+        return PHASE_ORDER.index(phase) >= PHASE_ORDER.index(target)
@@ -0,0 +1,75 @@
+"""Tests for the Arrow CSV reader in utils.csv_utils"""
+
+import pytest
+
+pytest.importorskip("pandas")
+pytest.importorskip("pyarrow")
+
+from utils.csv_utils import arrow_batch_to_frame, iter_arrow_csv_batches
+
+
+def read_rows(path, **kwargs):
+    """All batches of a file as {column: values}"""
+    columns = {}
+    for batch in iter_arrow_csv_batches(str(path), "utf-8", **kwargs):
+        for name, values in batch.to_pydict().items():
+            columns.setdefault(name, []).extend(values)
+    return columns
+
+
+def test_all_columns_are_strings_and_empty_values_are_null(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_bytes(b"id,amount,name\n1,2.50,x\n2,,y\n")
+
+    batches = list(iter_arrow_csv_batches(str(path), "utf-8"))
+    assert all(str(field.type) == "string" for batch in batches for field in batch.schema)
+    assert read_rows(path) == {"id": ["1", "2"], "amount": ["2.50", None], "name": ["x", "y"]}
+
+
+def test_quoted_line_break_in_values_and_header(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_bytes(b'id,"multi\nline"\n1,"a\nb"\n2,"c, d"\n')
+
+    assert read_rows(path) == {"id": ["1", "2"], "multi\nline": ["a\nb", "c, d"]}
+
+
+def test_header_is_dropped_once_across_small_blocks(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_bytes(b"a,b\n" + b"".join(f"{i},v{i}\n".encode() for i in range(50)))
+
+    rows = read_rows(path, block_size=32)
+    assert rows["a"] == [str(i) for i in range(50)]
+    assert rows["b"] == [f"v{i}" for i in range(50)]
+
+
+def test_duplicate_header_names_are_numbered_like_pandas(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_bytes(b"a,a,b\n1,2,3\n")
+
+    batch = next(iter_arrow_csv_batches(str(path), "utf-8"))
+    assert list(arrow_batch_to_frame(batch).columns) == ["a", "a.1", "b"]
+
+
+def test_utf8_bom_is_not_part_of_the_first_column(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_bytes(b"\xef\xbb\xbfa,b\n1,2\n")
+
+    assert read_rows(path) == {"a": ["1"], "b": ["2"]}
+
+
+def test_header_only_and_empty_files_yield_nothing(tmp_path):
+    header_only = tmp_path / "header.csv"
+    header_only.write_bytes(b"a,b\n")
+    empty = tmp_path / "empty.csv"
+    empty.write_bytes(b"")
+
+    assert list(iter_arrow_csv_batches(str(header_only), "utf-8")) == []
+    assert list(iter_arrow_csv_batches(str(empty), "utf-8")) == []
+
+
+def test_invalid_utf8_is_raised_as_unicode_error(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_bytes("a,b\n".encode() + "สินค้า,1\n".encode("cp874"))
+
+    with pytest.raises(UnicodeDecodeError):
+        list(iter_arrow_csv_batches(str(path), "utf-8"))
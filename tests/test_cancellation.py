@@ -0,0 +1,62 @@
+"""Tests for utils.cancellation engine hooks"""
+
+import pytest
+
+pytest.importorskip("pandas")
+sqlalchemy = pytest.importorskip("sqlalchemy")
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from utils.cancellation import CancellationToken, OperationCancelledError, cancellation_scope, is_cancelled, watch_engine
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    watch_engine(engine)
+    yield engine
+    engine.dispose()
+
+
+def test_statement_under_token_unregisters_cursor(engine):
+    token = CancellationToken()
+    with cancellation_scope(token), engine.connect() as conn:
+        assert conn.execute(text("SELECT 1")).scalar() == 1
+    assert not token._cursors
+
+
+def test_failing_statement_keeps_driver_error_and_unregisters_cursor(engine):
+    token = CancellationToken()
+    with cancellation_scope(token), engine.connect() as conn:
+        with pytest.raises(OperationalError, match="no such table"):
+            conn.execute(text("SELECT * FROM missing_table"))
+    assert not token._cursors
+
+
+def test_cancelled_token_stops_next_statement(engine):
+    token = CancellationToken()
+    token.cancel()
+    with cancellation_scope(token), engine.connect() as conn:
+        with pytest.raises(OperationCancelledError):
+            conn.execute(text("SELECT 1"))
+    assert not token._cursors
+
+
+def test_cleanup_scope_is_not_cancellable(engine):
+    token = CancellationToken()
+    token.cancel()
+    with cancellation_scope(token):
+        with cancellation_scope(None), engine.connect() as conn:
+            assert conn.execute(text("SELECT 1")).scalar() == 1
+
+
+def test_is_cancelled_checks_error_and_current_token():
+    assert is_cancelled(OperationCancelledError("Operation cancelled"))
+    assert not is_cancelled(RuntimeError("driver error"))
+    token = CancellationToken()
+    with cancellation_scope(token):
+        assert not is_cancelled(RuntimeError("driver error"))
+        token.cancel()
+        assert is_cancelled(RuntimeError("driver error"))
+    assert not is_cancelled()
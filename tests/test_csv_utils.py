@@ -0,0 +1,66 @@
+"""Tests for CSV encoding detection and row counting in utils.csv_utils"""
+
+import codecs
+
+import pytest
+
+pytest.importorskip("pandas")
+
+from utils.csv_utils import confirm_csv_encoding, count_csv_rows, detect_csv_encoding
+
+
+THAI = "ชื่อ,จำนวน\nสินค้า,1\n"
+
+
+def write(tmp_path, name, data):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+@pytest.mark.parametrize("data, expected", [
+    (b"a,b\n1,2\n", "utf-8"),
+    (THAI.encode("utf-8"), "utf-8"),
+    (codecs.BOM_UTF8 + b"a,b\n1,2\n", "utf-8"),
+    (codecs.BOM_UTF16_LE + "a,b\n".encode("utf-16-le"), "utf-16"),
+    (THAI.encode("cp874"), "cp874"),
+    (b"a,b\n\x81,2\n", "latin1"),  # 0x81 is undefined in utf-8 and cp874
+])
+def test_detect_csv_encoding(tmp_path, data, expected):
+    assert detect_csv_encoding(write(tmp_path, "data.csv", data)) == expected
+
+
+def test_detect_ignores_multibyte_character_cut_at_sample_end(tmp_path):
+    data = "a,b\n".encode("utf-8") + "ก".encode("utf-8") * 10
+    path = write(tmp_path, "data.csv", data)
+
+    # sample ends in the middle of the 3-byte character
+    assert detect_csv_encoding(path, sample_size=len(data) - 1) == "utf-8"
+
+
+def test_confirm_falls_back_when_data_after_the_sample_does_not_decode(tmp_path):
+    data = b"a,b\n" + b"1,2\n" * 100 + THAI.encode("cp874")
+    path = write(tmp_path, "data.csv", data)
+
+    encoding = detect_csv_encoding(path, sample_size=64)
+    assert encoding == "utf-8"
+    assert confirm_csv_encoding(path, encoding, sample_size=64) == "cp874"
+
+
+@pytest.mark.parametrize("data, expected", [
+    (b"", 0),
+    (b"a,b\n", 0),
+    (b"a,b\n1,2\n3,4\n", 2),
+    (b"a,b\n1,2\n3,4", 2),  # last row without a trailing newline
+    (b"a,b\r\n1,2\r\n", 1),
+])
+def test_count_csv_rows_exact(tmp_path, data, expected):
+    assert count_csv_rows(write(tmp_path, "data.csv", data)) == (expected, False)
+
+
+def test_count_csv_rows_estimates_large_files(tmp_path):
+    path = write(tmp_path, "data.csv", b"a,b\n" + b"1,2\n" * 1000)
+
+    rows, estimated = count_csv_rows(path, exact_limit=100)
+    assert estimated
+    assert rows == 1000
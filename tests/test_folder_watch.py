@@ -0,0 +1,80 @@
+"""Tests for services.utilities.folder_watch_service"""
+
+import os
+import threading
+
+import pytest
+
+# services/__init__ imports the file and database services
+pytest.importorskip("pandas")
+pytest.importorskip("sqlalchemy")
+
+from services.utilities.folder_watch_service import FolderWatchService
+
+
+def make_service(folder, **kwargs):
+    options = dict(settle_seconds=0.2, batch_seconds=0.2, poll_seconds=0.05, log_callback=lambda msg: None)
+    options.update(kwargs)
+    return FolderWatchService(str(folder), **options)
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("sales.csv", True),
+    ("sales.XLSX", True),
+    ("~$sales.xlsx", False),  # Office lock file
+    (".sales.csv.swp", False),
+    ("notes.txt", False),
+])
+def test_is_data_file(name, expected):
+    assert FolderWatchService.is_data_file(os.path.join("in", name)) is expected
+
+
+def test_poll_reports_new_and_changed_top_level_data_files(tmp_path):
+    (tmp_path / "old.csv").write_text("a\n1\n")
+    (tmp_path / "Uploaded").mkdir()
+    service = make_service(tmp_path)
+    service._snapshot = service._scan()
+
+    (tmp_path / "new.csv").write_text("a\n1\n")
+    (tmp_path / "notes.txt").write_text("x")
+    (tmp_path / "Uploaded" / "moved.csv").write_text("a\n1\n")
+    assert service._poll_changes() == [str(tmp_path / "new.csv")]
+    assert service._poll_changes() == []
+
+    (tmp_path / "old.csv").write_text("a\n1\n2\n")
+    assert service._poll_changes() == [str(tmp_path / "old.csv")]
+
+
+def test_settled_files_are_handed_over_in_one_batch(tmp_path):
+    service = make_service(tmp_path)
+    batches = []
+
+    def on_batch(batch):
+        batches.append(sorted(batch))
+        service.stop()
+
+    (tmp_path / "a.csv").write_text("a\n1\n")
+    (tmp_path / "b.csv").write_text("a\n1\n")
+    (tmp_path / "skip.txt").write_text("x")
+    worker = threading.Thread(target=service.run, args=(on_batch,), daemon=True)
+    worker.start()
+    worker.join(timeout=10)
+
+    assert not worker.is_alive()
+    assert batches == [[str(tmp_path / "a.csv"), str(tmp_path / "b.csv")]]
+
+
+def test_file_removed_before_settling_is_dropped(tmp_path):
+    service = make_service(tmp_path, settle_seconds=0.5)
+    batches = []
+    gone = tmp_path / "gone.csv"
+    gone.write_text("a\n1\n")
+
+    timer = threading.Timer(0.2, gone.unlink)
+    stopper = threading.Timer(1.5, service.stop)
+    timer.start()
+    stopper.start()
+    service.run(batches.append)
+    stopper.cancel()
+
+    assert batches == []
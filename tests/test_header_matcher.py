@@ -0,0 +1,101 @@
+"""Tests for services.file.header_matcher"""
+
+import random
+
+import pytest
+
+# services/__init__ imports the file and database services
+pytest.importorskip("pandas")
+pytest.importorskip("sqlalchemy")
+
+from services.file.header_matcher import HeaderMatcher, match_threshold
+
+
+def normalize(name):
+    return str(name).strip().lower()
+
+
+def previous_loop_match(column_settings, header_row):
+    """Per-type loop that detect_file_type used before the matcher (reference for scoring and ties)"""
+    best_match = None
+    best_score = 0
+    for logic_type, mapping in column_settings.items():
+        if not mapping:
+            continue
+        required_keys = set(normalize(c) for c in mapping.keys() if c)
+        required_vals = set(normalize(c) for c in mapping.values() if c)
+        if required_keys == required_vals:
+            total = len(required_keys)
+            score = len(header_row & required_keys) / total
+        else:
+            keys_match = len(header_row & required_keys)
+            vals_match = len(header_row & required_vals)
+            if keys_match > vals_match:
+                score = keys_match / len(required_keys) if required_keys else 0
+                total = len(required_keys)
+            else:
+                score = vals_match / len(required_vals) if required_vals else 0
+                total = len(required_vals)
+        if score >= match_threshold(total) and score > best_score:
+            best_match = logic_type
+            best_score = score
+    return best_match
+
+
+SETTINGS = {
+    "sales": {"Date": "date", "Amount": "amount", "Customer": "customer"},
+    "sales_copy": {"Date": "date", "Amount": "amount", "Customer": "customer"},
+    "stock": {"sku": "sku", "qty": "qty", "warehouse": "warehouse"},
+    "empty": {},
+}
+
+
+@pytest.mark.parametrize("header, expected", [
+    ({"date", "amount", "customer"}, "sales"),  # equal scores: the first type in settings order wins
+    ({"sku", "qty"}, "stock"),
+    ({"sku"}, "stock"),  # 1/3 passes the 30% threshold
+    ({"unknown", "columns"}, None),
+    (set(), None),
+])
+def test_match_and_tie_break(header, expected):
+    matcher = HeaderMatcher(SETTINGS, normalize)
+
+    assert matcher.match(header) == expected
+    assert previous_loop_match(SETTINGS, header) == expected
+
+
+def test_source_and_target_names_both_match():
+    settings = {"orders": {"Order No": "order_id", "Total": "total_amount", "Ship Date": "ship_date"}}
+    matcher = HeaderMatcher(settings, normalize)
+
+    assert matcher.match({"order no", "total", "ship date"}) == "orders"
+    assert matcher.match({"order_id", "total_amount", "ship_date"}) == "orders"
+
+
+def test_matches_previous_loop_on_random_settings():
+    rng = random.Random(415)
+    names = [f"col{i}" for i in range(40)]
+    for _ in range(200):
+        settings = {}
+        for type_idx in range(rng.randint(1, 6)):
+            keys = rng.sample(names, rng.randint(1, 25))
+            if rng.random() < 0.5:
+                mapping = {k: k for k in keys}
+            else:
+                mapping = {k: rng.choice(names) for k in keys}
+            settings[f"type{type_idx}"] = mapping
+        matcher = HeaderMatcher(settings, normalize)
+        for _ in range(10):
+            header = set(rng.sample(names, rng.randint(0, 30)))
+            assert matcher.match(header) == previous_loop_match(settings, header), (settings, header)
+
+
+def test_signature_follows_content_and_order():
+    settings = {"a": {"x": "x"}, "b": {"y": "y"}}
+    signature = HeaderMatcher.settings_signature(settings)
+
+    assert HeaderMatcher(settings, normalize).signature == signature
+    assert HeaderMatcher.settings_signature({"a": {"x": "x"}, "b": {"y": "y"}}) == signature
+    assert HeaderMatcher.settings_signature({"b": {"y": "y"}, "a": {"x": "x"}}) != signature
+    settings["a"]["z"] = "z"
+    assert HeaderMatcher.settings_signature(settings) != signature
@@ -0,0 +1,51 @@
+"""Tests for services.utilities.ingest_manifest_service"""
+
+import pytest
+
+# services/__init__ imports the file and database services
+pytest.importorskip("pandas")
+pytest.importorskip("sqlalchemy")
+
+from services.utilities.ingest_manifest_service import IngestManifestService
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    return IngestManifestService(str(tmp_path / "ingest_manifest.db"))
+
+
+def test_recorded_load_is_found_by_content_hash(manifest, tmp_path):
+    data_file = tmp_path / "sales.csv"
+    data_file.write_bytes(b"a,b\n1,2\n")
+
+    assert manifest.find_loaded("h1") is None
+    assert manifest.record_load("h1", str(data_file), "sales", "bronze.sales", 1)
+
+    loaded = manifest.find_loaded("h1")
+    assert loaded["file_name"] == "sales.csv"
+    assert loaded["file_size"] == data_file.stat().st_size
+    assert loaded["logic_type"] == "sales"
+    assert loaded["target_table"] == "bronze.sales"
+    assert loaded["row_count"] == 1
+    assert loaded["loaded_at"]
+    assert manifest.find_loaded("other") is None
+
+
+def test_reload_of_the_same_content_replaces_the_row(manifest, tmp_path):
+    first = tmp_path / "sales.csv"
+    first.write_bytes(b"a,b\n1,2\n")
+    copy = tmp_path / "sales_copy.csv"
+    copy.write_bytes(first.read_bytes())
+
+    manifest.record_load("h1", str(first), "sales", "bronze.sales", 1)
+    manifest.record_load("h1", str(copy), "sales", "bronze.sales", 1)
+
+    assert manifest.find_loaded("h1")["file_name"] == "sales_copy.csv"
+
+
+def test_file_moved_before_recording_is_stored_with_size_zero(manifest, tmp_path):
+    assert manifest.record_load("h1", str(tmp_path / "gone.csv"), "sales")
+
+    loaded = manifest.find_loaded("h1")
+    assert loaded["file_size"] == 0
+    assert loaded["row_count"] is None
@@ -0,0 +1,100 @@
+"""Tests for services.utilities.job_scheduler_service"""
+
+import pytest
+
+# services/__init__ imports the file and database services
+pytest.importorskip("pandas")
+pytest.importorskip("sqlalchemy")
+
+from constants import FileConstants
+from services.utilities.job_scheduler_service import JobSchedulerService, UploadJob
+
+
+def job(name, order, seconds, logic_type=None, table=None):
+    logic_type = logic_type or name.rstrip("0123456789")
+    return UploadJob(logic_type=logic_type, file_paths=[name], order=order,
+                     estimated_seconds=seconds, target_table=table or logic_type)
+
+
+def run_order(jobs, *args):
+    return [j.file_paths[0] for j in JobSchedulerService.schedule(jobs, *args)]
+
+
+JOBS = [
+    job("big", 0, 90),
+    job("small", 1, 5),
+    job("mid", 2, 30),
+]
+
+
+def test_sjf_runs_shortest_first():
+    assert run_order(JOBS) == ["small", "mid", "big"]
+
+
+def test_fifo_keeps_discovery_order():
+    assert run_order(list(reversed(JOBS)), FileConstants.SCHEDULE_FIFO) == ["big", "small", "mid"]
+
+
+def test_priority_types_first_then_shortest():
+    assert run_order(JOBS, FileConstants.SCHEDULE_PRIORITY, ["big"]) == ["big", "small", "mid"]
+
+
+def test_equal_estimates_keep_discovery_order():
+    jobs = [job("b", 0, 10), job("a", 1, 10)]
+
+    assert run_order(jobs) == ["b", "a"]
+
+
+def test_jobs_of_one_table_keep_discovery_order():
+    # each per-file job replaces the table: the last file found must load last
+    jobs = [
+        job("sales1", 0, 90),
+        job("stock1", 1, 20),
+        job("sales2", 2, 1),
+        job("hr1", 3, 5),
+    ]
+
+    assert run_order(jobs) == ["sales1", "hr1", "stock1", "sales2"]
+    assert run_order(jobs, FileConstants.SCHEDULE_PRIORITY, ["stock"]) == ["stock1", "sales1", "hr1", "sales2"]
+
+
+def test_logic_types_mapped_to_the_same_table_are_not_reordered():
+    jobs = [
+        job("a1", 0, 50, logic_type="a", table="shared"),
+        job("b1", 1, 1, logic_type="b", table="shared"),
+    ]
+
+    assert run_order(jobs) == ["a1", "b1"]
+
+
+def test_build_jobs_estimates_cost_and_target_table(tmp_path):
+    small = tmp_path / "small.csv"
+    small.write_bytes(b"x" * 1024)
+    large = tmp_path / "large.csv"
+    large.write_bytes(b"x" * 4096)
+    scheduler = JobSchedulerService(str(tmp_path / "load_history.db"))
+
+    jobs = scheduler.build_jobs(
+        [("sales", [str(large)]), ("stock", [str(small)])],
+        row_estimator=lambda path: 10,
+        table_resolver=lambda logic_type: f"tbl_{logic_type}",
+    )
+
+    assert [j.total_bytes for j in jobs] == [4096, 1024]
+    assert [j.estimated_rows for j in jobs] == [10, 10]
+    assert [j.target_table for j in jobs] == ["tbl_sales", "tbl_stock"]
+    assert jobs[0].estimated_seconds > jobs[1].estimated_seconds
+
+
+def test_load_history_throughput_drives_the_estimate(tmp_path):
+    data_file = tmp_path / "sales.csv"
+    data_file.write_bytes(b"x" * 1000)
+    scheduler = JobSchedulerService(str(tmp_path / "load_history.db"))
+
+    scheduler.record_load("sales", 1000, 100, 2.0)
+
+    assert scheduler.get_throughput() == {"sales": (500.0, 50.0)}
+    rows_job = scheduler.build_jobs([("sales", [str(data_file)])], row_estimator=lambda path: 200)[0]
+    bytes_job = scheduler.build_jobs([("sales", [str(data_file)])])[0]
+    assert rows_job.estimated_seconds == pytest.approx(4.0)  # 200 rows at 50 rows/sec
+    assert bytes_job.estimated_seconds == pytest.approx(2.0)  # no row estimate: 1000 bytes at 500 bytes/sec
@@ -0,0 +1,39 @@
+"""Tests for the upsert row hash expression in utils.sql_utils"""
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from sqlalchemy.types import DATE, DateTime, Float, Integer, NVARCHAR
+
+from utils.sql_utils import get_row_hash_expression
+
+
+def test_every_column_is_rendered_deterministically_in_order():
+    expression = get_row_hash_expression({
+        "name": NVARCHAR(100),
+        "born": DATE(),
+        "seen_at": DateTime(),
+        "score": Float(),
+        "visits": Integer(),
+    })
+
+    assert expression == (
+        "HASHBYTES('SHA2_256', CONCAT("
+        "ISNULL(CAST([name] AS NVARCHAR(MAX)), NCHAR(0)), NCHAR(31), "
+        "ISNULL(CONVERT(NVARCHAR(30), [born], 126), NCHAR(0)), NCHAR(31), "
+        "ISNULL(CONVERT(NVARCHAR(30), [seen_at], 126), NCHAR(0)), NCHAR(31), "
+        "ISNULL(CONVERT(NVARCHAR(30), [score], 2), NCHAR(0)), NCHAR(31), "
+        "ISNULL(CAST([visits] AS NVARCHAR(MAX)), NCHAR(0)), N''))"
+    )
+
+
+def test_single_column_still_gives_concat_two_arguments():
+    assert get_row_hash_expression({"name": NVARCHAR(10)}) == (
+        "HASHBYTES('SHA2_256', CONCAT(ISNULL(CAST([name] AS NVARCHAR(MAX)), NCHAR(0)), N''))"
+    )
+
+
+def test_no_columns_gives_a_constant_hash():
+    # every column is a key column: no CONCAT(), which needs at least two arguments
+    assert get_row_hash_expression({}) == "HASHBYTES('SHA2_256', N'')"
@@ -0,0 +1,74 @@
+"""Tests for services.utilities.run_journal_service"""
+
+import os
+
+import pytest
+
+# services/__init__ imports the file and database services
+pytest.importorskip("pandas")
+pytest.importorskip("sqlalchemy")
+
+from constants import FileConstants
+from services.utilities.run_journal_service import RunJournalService
+
+
+@pytest.fixture
+def journal(tmp_path):
+    return RunJournalService(str(tmp_path / "run_journal.db"))
+
+
+def test_phases_and_fields_round_trip(journal, tmp_path):
+    folder = str(tmp_path)
+    file_a, file_b = str(tmp_path / "a.csv"), str(tmp_path / "b.csv")
+    run_id = journal.start_run(folder)
+
+    journal.set_phase(run_id, [file_a, file_b], FileConstants.PHASE_PENDING)
+    journal.set_phase(run_id, [file_a], FileConstants.PHASE_CHECKED, logic_type="sales", content_hash="h1")
+    journal.set_phase(run_id, [file_a], FileConstants.PHASE_STAGED, staging_table="sales__stg", staged_rows=10)
+    journal.set_phase(run_id, [file_a], FileConstants.PHASE_VALIDATED, committed_row_id=5, unknown="ignored")
+    journal.set_phase(run_id, [file_b], FileConstants.PHASE_FAILED, error="bad columns")
+
+    files = {os.path.basename(entry["file_path"]): entry for entry in journal.get_files(run_id)}
+    assert files["a.csv"]["phase"] == FileConstants.PHASE_VALIDATED
+    assert files["a.csv"]["logic_type"] == "sales"
+    assert files["a.csv"]["content_hash"] == "h1"
+    assert files["a.csv"]["staging_table"] == "sales__stg"
+    assert files["a.csv"]["staged_rows"] == 10
+    assert files["a.csv"]["committed_row_id"] == 5
+    assert files["b.csv"]["phase"] == FileConstants.PHASE_FAILED
+    assert files["b.csv"]["error"] == "bad columns"
+
+
+def test_unfinished_run_is_found_until_finished(journal, tmp_path):
+    folder = str(tmp_path)
+    run_id = journal.start_run(folder)
+
+    assert journal.find_unfinished_run(folder)["run_id"] == run_id
+    journal.finish_run(run_id)
+    assert journal.find_unfinished_run(folder) is None
+
+
+def test_new_run_abandons_the_unfinished_one(journal, tmp_path):
+    folder = str(tmp_path)
+    first = journal.start_run(folder)
+    second = journal.start_run(folder)
+
+    assert second != first
+    assert journal.find_unfinished_run(folder)["run_id"] == second
+
+
+def test_disabled_journal_writes_nothing(journal, tmp_path):
+    journal.set_phase(None, [str(tmp_path / "a.csv")], FileConstants.PHASE_STAGED)
+
+    assert journal.get_files(None) == []
+
+
+@pytest.mark.parametrize("phase, target, reached", [
+    (FileConstants.PHASE_STAGED, FileConstants.PHASE_STAGED, True),
+    (FileConstants.PHASE_TRANSFERRED, FileConstants.PHASE_STAGED, True),
+    (FileConstants.PHASE_PARSED, FileConstants.PHASE_STAGED, False),
+    (FileConstants.PHASE_CHECKED, FileConstants.PHASE_PARSED, False),
+    (FileConstants.PHASE_FAILED, FileConstants.PHASE_PENDING, False),
+])
+def test_phase_reached(phase, target, reached):
+    assert RunJournalService.phase_reached(phase, target) is reached
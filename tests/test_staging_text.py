@@ -0,0 +1,53 @@
+"""Tests for the staging text conversion in utils.helpers"""
+
+from datetime import date, datetime, time
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+np = pytest.importorskip("numpy")
+
+from utils.helpers import frame_to_staging_rows, to_staging_text
+
+
+@pytest.mark.parametrize("value", [None, float("nan"), np.float64("nan"), pd.NA, pd.NaT])
+def test_missing_values_are_null(value):
+    assert to_staging_text(value) is None
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("abc", "abc"),
+    (3.0, "3"),
+    (np.float64(2.5), "2.5"),
+    (1e-05, "0.00001"),
+    (1.5e20, "150000000000000000000"),
+    (np.int64(7), "7"),
+    (True, "1"),
+    (np.bool_(False), "0"),
+    (datetime(2024, 1, 2, 3, 4, 5), "2024-01-02 03:04:05"),
+    (pd.Timestamp("2024-01-02 03:04:05"), "2024-01-02 03:04:05"),
+    (date(2024, 1, 2), "2024-01-02"),
+    (time(12, 30), "12:30:00"),
+])
+def test_values_convert_to_text_accepted_by_try_convert(value, expected):
+    assert to_staging_text(value) == expected
+
+
+def test_frame_rows_keep_nullable_ints_and_floats_as_text():
+    df = pd.DataFrame({
+        "id": pd.array([1, None, 3], dtype="Int64"),
+        "amount": [1.0, 2.5, None],
+        "name": ["x", None, "z"],
+    })
+
+    assert frame_to_staging_rows(df) == [
+        ("1", "1", "x"),
+        (None, "2.5", None),
+        ("3", None, "z"),
+    ]
+
+
+def test_frame_rows_follow_requested_column_order():
+    df = pd.DataFrame({"a": [1, 2], "b": ["x", "y"]})
+
+    assert frame_to_staging_rows(df, ["b", "a"]) == [("x", "1"), ("y", "2")]
@@ -2,11 +2,17 @@
 import os
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from tkinter import messagebox, filedialog
-import pandas as pd
 from utils.logger import setup_file_logging, cleanup_old_log_files
 from config.json_manager import json_manager
+from constants import DatabaseConstants, FileConstants
+from performance_optimizations import format_file_size
+from services.utilities.ingest_manifest_service import IngestManifestService
+from services.utilities.run_journal_service import RunJournalService
+from services.utilities.job_scheduler_service import JobSchedulerService
+from utils.cancellation import CancellationToken
 
 
 class FileHandler:
@@ -24,6 +30,22 @@ class FileHandler:
         self.db_service = db_service
         self.file_mgmt_service = file_mgmt_service
         self.log = log_callback
+        self.scan_cancel_event = threading.Event()
+        
+        # ไฟล์ที่เคยโหลดแล้ว (ตาม hash ของเนื้อไฟล์) และตัวเลือกให้โหลดซ้ำ (CLI --reprocess)
+        self.ingest_manifest = IngestManifestService()
+        self.reprocess_loaded = False
+        
+        # checkpoint journal ของ auto process และตัวเลือกให้ทำรอบที่ค้างต่อ (CLI --resume)
+        self.run_journal = RunJournalService()
+        self.resume_run = False
+        self.journal_run_id = None
+        
+        # ลำดับงานอัปโหลดของ auto process ตามต้นทุนโดยประมาณ
+        self.job_scheduler = JobSchedulerService()
+        
+        # token ของงานอัปโหลด/auto process ที่กำลังรัน (สร้างใหม่ทุกครั้งที่เริ่มงาน)
+        self.cancel_token = CancellationToken()
     
     def browse_excel_path(self, save_callback):
         """Select folder for file search"""
@@ -38,6 +60,97 @@ class FileHandler:
         thread = threading.Thread(target=self._check_files, args=(ui_callbacks,))
         thread.start()
     
+    def cancel_scan(self):
+        """Stop a running file scan (files already found stay in the list)"""
+        self.scan_cancel_event.set()
+    
+    def cancel_operation(self):
+        """
+        Cancel the running upload or auto process
+        
+        File reads stop, the SQL statement running on the server is cancelled and the
+        staging/work tables of the interrupted load are dropped; upload jobs that have
+        not started are skipped.
+        """
+        self.cancel_token.cancel()
+    
+    def _start_cancellable_operation(self):
+        """New cancellation token for an upload or auto process, shared with the file readers"""
+        self.cancel_token = CancellationToken()
+        self.file_service.set_cancellation_token(self.cancel_token)
+    
+    def _get_manifest_mode(self):
+        """What auto process does with files already loaded: 'skip', 'flag' or 'off'"""
+        mode = json_manager.get('app_settings', 'ingest_manifest', FileConstants.MANIFEST_SKIP)
+        if mode not in (FileConstants.MANIFEST_SKIP, FileConstants.MANIFEST_FLAG, FileConstants.MANIFEST_OFF):
+            return FileConstants.MANIFEST_SKIP
+        return mode
+    
+    def _filter_loaded_files(self, data_files):
+        """
+        Drop files whose content was already loaded (ingest manifest), before any parsing
+        
+        Args:
+            data_files: Files found in the source folder
+            
+        Returns:
+            list: Files to process
+        """
+        mode = self._get_manifest_mode()
+        if mode == FileConstants.MANIFEST_OFF:
+            return data_files
+        if self.reprocess_loaded:
+            self.log("🔁 Reprocess enabled: files already loaded will be loaded again")
+            return data_files
+        
+        remaining = []
+        for file_path in data_files:
+            try:
+                loaded = self.ingest_manifest.find_loaded(self.file_service.get_content_hash(file_path))
+            except OSError as e:
+                self.log(f"⚠️ Could not hash {os.path.basename(file_path)}: {e}")
+                loaded = None
+            
+            if not loaded:
+                remaining.append(file_path)
+                continue
+            
+            rows = f"{loaded['row_count']:,} rows" if loaded.get('row_count') is not None else "unknown rows"
+            detail = f"{loaded['file_name']} → {loaded['target_table']} ({rows}) at {loaded['loaded_at']}"
+            if mode == FileConstants.MANIFEST_FLAG:
+                self.log(f"⚠️ Already loaded, loading again: {os.path.basename(file_path)} (same content as {detail})")
+                remaining.append(file_path)
+            else:
+                self.log(f"⏭️ Skipping already loaded file: {os.path.basename(file_path)} (same content as {detail})")
+        
+        skipped = len(data_files) - len(remaining)
+        if skipped:
+            self.log(f"⏭️ Skipped {skipped} already loaded files (use --reprocess or ingest_manifest='flag' to load them)")
+        return remaining
+    
+    def _record_loaded_file(self, file_path, logic_type, row_count=None):
+        """Add a successfully loaded file to the ingest manifest (must run before the file is moved)"""
+        if self._get_manifest_mode() == FileConstants.MANIFEST_OFF:
+            return
+        try:
+            last_upload = self.db_service.get_last_upload()
+            self.ingest_manifest.record_load(
+                self.file_service.get_content_hash(file_path),
+                file_path,
+                logic_type,
+                last_upload.get('table'),
+                row_count if row_count is not None else last_upload.get('rows'),
+            )
+        except Exception as e:
+            self.log(f"⚠️ Could not record {os.path.basename(file_path)} in ingest manifest: {e}")
+    
+    def _get_scan_workers(self):
+        """Number of processes used to detect file types (0 = CPU count)"""
+        try:
+            return int(json_manager.get('app_settings', 'scan_workers', FileConstants.SCAN_WORKERS_DEFAULT))
+        except Exception:
+            return FileConstants.SCAN_WORKERS_DEFAULT
+    
     def _check_files(self, ui_callbacks):
         """Check files in specified path"""
         try:
@@ -63,19 +176,27 @@ class FileHandler:
             
             found_files_count = 0
             total_files = len(data_files)
+            self.scan_cancel_event.clear()
             
-            for i, file in enumerate(data_files):
+            # ตรวจประเภทไฟล์แบบขนาน ผลลัพธ์ทยอยเข้ารายการตามลำดับที่เสร็จ
+            results = self.file_service.detect_file_types(data_files, self._get_scan_workers(), self.scan_cancel_event)
+            for i, (file, logic_type) in enumerate(results):
                 # คำนวณ progress ที่ถูกต้อง (0.2 - 0.8)
-                progress = 0.2 + (0.6 * (i / total_files))  # 20% - 80%
-                ui_callbacks['update_progress'](progress, f"Checking file: {os.path.basename(file)}", f"File {i+1} of {total_files}")
+                progress = 0.2 + (0.6 * ((i + 1) / total_files))  # 20% - 80%
+                ui_callbacks['update_progress'](progress, f"Checked file: {os.path.basename(file)}", f"File {i+1} of {total_files}")
                 
-                logic_type = self.file_service.detect_file_type(file)
                 if logic_type:
                     found_files_count += 1
                     self.log(f"✅ Found matching file: {os.path.basename(file)} [{logic_type}]")
                     ui_callbacks['add_file_to_list'](file, logic_type)
             
-            if found_files_count > 0:
+            if self.scan_cancel_event.is_set():
+                ui_callbacks['update_progress'](1.0, "Scan cancelled", f"Found {found_files_count} matching files before cancel")
+                ui_callbacks['update_status'](f"Scan cancelled ({found_files_count} matching files found)", True)
+                if found_files_count > 0:
+                    ui_callbacks['enable_select_all']()
+                self.log("🛑 File scan cancelled")
+            elif found_files_count > 0:
                 ui_callbacks['update_progress'](1.0, "Scan completed", f"Found {found_files_count} matching files")
                 ui_callbacks['update_status'](f"Found {found_files_count} matching files", False)
                 ui_callbacks['enable_select_all']()
@@ -118,10 +239,35 @@ class FileHandler:
             thread = threading.Thread(target=self._upload_selected_files, args=(selected, ui_callbacks))
             thread.start()
     
+    def _get_type_workers(self):
+        """
+        Number of logic types uploaded at the same time
+        
+        Capped so that every job can hold its connections at once: staging workers or
+        validation threads (whichever is more) plus the job's own connection, within the
+        engine pool + overflow.
+        """
+        try:
+            workers = int(json_manager.get('app_settings', 'upload_type_workers', DatabaseConstants.UPLOAD_TYPE_WORKERS))
+        except Exception:
+            workers = DatabaseConstants.UPLOAD_TYPE_WORKERS
+        try:
+            staging_workers = int(json_manager.get('app_settings', 'staging_upload_workers', 1) or 1)
+        except Exception:
+            staging_workers = 1
+        staging_workers = max(1, min(staging_workers, DatabaseConstants.STAGING_MAX_WORKERS))
+        connections_per_job = max(staging_workers, DatabaseConstants.VALIDATION_MAX_WORKERS) + 1
+        pool_jobs = (DatabaseConstants.ENGINE_POOL_SIZE + DatabaseConstants.ENGINE_MAX_OVERFLOW) // connections_per_job
+        capped = max(1, min(workers, DatabaseConstants.UPLOAD_TYPE_MAX_WORKERS, pool_jobs))
+        if capped < workers:
+            self.log(f"ℹ️ upload_type_workers limited to {capped} ({connections_per_job} connections per job)")
+        return capped
+    
     def _upload_selected_files(self, selected_files, ui_callbacks):
         """อัปโหลดไฟล์ที่เลือกไปยัง SQL Server"""
         # เริ่มจับเวลา
         upload_start_time = time.time()
+        self._start_cancellable_operation()
         
         # จัดกลุ่มไฟล์ตาม logic_type
         files_by_type = {}
@@ -131,9 +277,7 @@ class FileHandler:
             files_by_type[logic_type].append((file_path, chk))
         
         total_types = len(files_by_type)
-        completed_types = 0
         total_files = sum(len(files) for files in files_by_type.values())
-        processed_files = 0
         
         # สถิติการอัปโหลด
         upload_stats = {
@@ -144,205 +288,45 @@ class FileHandler:
             'failed_files': 0
         }
         
+        # ความคืบหน้ารวมทุก job: 1 หน่วยต่อไฟล์ที่อ่าน + 1 หน่วยต่อประเภทที่อัปโหลด
+        progress_state = {'done': 0, 'total': total_files + total_types}
+        stats_lock = threading.Lock()
+        
+        def report_progress(units, status, detail):
+            with stats_lock:
+                progress_state['done'] += units
+                progress = progress_state['done'] / progress_state['total']
+            ui_callbacks['update_progress'](progress, status, detail)
+        
         # แสดงสถานะเริ่มต้น
         ui_callbacks['set_progress_status']("Starting upload", f"Found {total_files} files from {total_types} types")
         
-        # Phase 1: Read and validate all files first
-        self.log("📖 Phase 1: Reading and validating all files...")
-        all_validated_data = {}  # {logic_type: (combined_df, files_info, required_cols)}
+        # แต่ละ logic type เขียนคนละตาราง จึงอ่าน+อัปโหลดเป็น job แยกที่รันพร้อมกันได้
+        workers = min(self._get_type_workers(), total_types) if total_types else 1
+        if workers > 1:
+            self.log(f"🧵 Uploading {total_types} file types with {workers} concurrent jobs")
         
         for logic_type, files in files_by_type.items():
-            try:
-                # เริ่มจับเวลาสำหรับประเภทไฟล์นี้
-                type_start_time = time.time()
-                upload_stats['by_type'][logic_type] = {
-                    'start_time': type_start_time,
-                    'files_count': len(files),
-                    'successful_files': 0,
-                    'failed_files': 0,
-                    'errors': [],
-                    'individual_processing_time': 0  # เก็บเวลารวมของประเภทนี้
-                }
-                
-                self.log(f"📖 Validating files of type {logic_type}")
-                
-                # อัปเดต Progress Bar ตามความคืบหน้า
-                progress = completed_types / total_types
-                ui_callbacks['update_progress'](progress, f"Validating type {logic_type}", f"Type {completed_types + 1} of {total_types}")
-                
-                # รวมข้อมูลจากทุกไฟล์ในประเภทเดียวกัน
-                all_dfs = []
-                valid_files_info = []
-                
-                for file_path, chk in files:
-                    try:
-                        processed_files += 1
-                        # จับเวลาสำหรับไฟล์นี้เฉพาะ
-                        file_start_time = time.time()
-                        
-                        # คำนวณ progress ที่ถูกต้อง (0.0 - 1.0)
-                        file_progress = (processed_files - 1) / total_files  # เริ่มจาก 0
-                        
-                        # อัปเดตความคืบหน้าระดับไฟล์
-                        ui_callbacks['update_progress'](file_progress, f"Checking columns: {os.path.basename(file_path)}", f"File {processed_files} of {total_files}")
-                        
-                        # ตรวจสอบคอลัมน์ก่อนโดยการ preview ไฟล์ (ประหยัดเวลา)
-                        success, result, columns_info = self.file_service.preview_file_columns(file_path, logic_type)
-                        if not success:
-                            self.log(f"❌ Column check failed for {os.path.basename(file_path)}: {result}")
-                            upload_stats['by_type'][logic_type]['failed_files'] += 1
-                            upload_stats['by_type'][logic_type]['errors'].append(f"{os.path.basename(file_path)}: {result}")
-                            upload_stats['failed_files'] += 1
-                            
-                            # คำนวณเวลาที่ใช้แม้เมื่อตรวจสอบคอลัมน์ล้มเหลว
-                            file_processing_time = time.time() - file_start_time
-                            upload_stats['by_type'][logic_type]['individual_processing_time'] += file_processing_time
-                            continue
-                        
-                        # อัปเดตความคืบหน้า - ตรวจสอบคอลัมน์ผ่านแล้ว
-                        ui_callbacks['update_progress'](file_progress, f"Columns OK, reading file: {os.path.basename(file_path)}", f"File {processed_files} of {total_files}")
-                        
-                        # อ่านไฟล์เต็มรูปแบบ (หลังจากตรวจสอบคอลัมน์ผ่านแล้ว)
-                        success, result = self.file_service.read_excel_file(file_path, logic_type)
-                        if not success:
-                            self.log(f"❌ Failed to read file {os.path.basename(file_path)}: {result}")
-                            upload_stats['by_type'][logic_type]['failed_files'] += 1
-                            upload_stats['by_type'][logic_type]['errors'].append(f"{os.path.basename(file_path)}: {result}")
-                            upload_stats['failed_files'] += 1
-                            
-                            # คำนวณเวลาที่ใช้แม้เมื่ออ่านไฟล์ล้มเหลว
-                            file_processing_time = time.time() - file_start_time
-                            upload_stats['by_type'][logic_type]['individual_processing_time'] += file_processing_time
-                            continue
-                        
-                        df = result
-                        
-                        # หมายเหตุ: การตรวจสอบข้อมูลรายละเอียดจะทำใน staging table ด้วย SQL
-                        # คอลัมน์ได้ถูกตรวจสอบแล้วด้วย preview_file_columns()
-                        
-                        all_dfs.append(df)
-                        valid_files_info.append((file_path, chk))
-                        upload_stats['by_type'][logic_type]['successful_files'] += 1
-                        self.log(f"✅ File validated and ready: {os.path.basename(file_path)}")
-                        
-                        # คำนวณเวลาที่ใช้สำหรับไฟล์นี้
-                        file_processing_time = time.time() - file_start_time
-                        upload_stats['by_type'][logic_type]['individual_processing_time'] += file_processing_time
-                        
-                    except Exception as e:
-                        error_msg = f"An error occurred while reading file {os.path.basename(file_path)}: {e}"
-                        self.log(f"❌ {error_msg}")
-                        upload_stats['by_type'][logic_type]['failed_files'] += 1
-                        upload_stats['by_type'][logic_type]['errors'].append(f"{os.path.basename(file_path)}: {str(e)}")
-                        upload_stats['failed_files'] += 1
-                        
-                        # คำนวณเวลาที่ใช้แม้เมื่อเกิดข้อผิดพลาด
-                        file_processing_time = time.time() - file_start_time
-                        upload_stats['by_type'][logic_type]['individual_processing_time'] += file_processing_time
-                
-                if not all_dfs:
-                    self.log(f"❌ No valid data from files of type {logic_type}")
-                    completed_types += 1
-                    continue
-                
-                # รวม DataFrame ทั้งหมด
-                combined_df = pd.concat(all_dfs, ignore_index=True)
-                
-                # แสดงสถานะการรวมข้อมูล
-                ui_callbacks['update_progress'](file_progress, f"Combining data for type {logic_type}", f"Combined {len(all_dfs)} files into {len(combined_df)} rows")
-                
-                # ใช้ dtype ที่ถูกต้อง
-                required_cols = self.file_service.get_required_dtypes(logic_type)
-                
-                # ตรวจสอบว่า required_cols ไม่ว่างเปล่า
-                if not required_cols:
-                    self.log(f"❌ No data type configuration found for {logic_type}")
-                    completed_types += 1
-                    continue
-                
-                # ตรวจสอบว่าข้อมูลไม่ว่างเปล่า
-                if combined_df.empty:
-                    self.log(f"❌ No valid data from files of type {logic_type}")
-                    completed_types += 1
-                    continue
-                
-                # เก็บข้อมูลที่ผ่านการตรวจสอบแล้ว
-                all_validated_data[logic_type] = (combined_df, valid_files_info, required_cols)
-                self.log(f"✅ Prepared {len(combined_df)} rows for type {logic_type}")
-                    
-                completed_types += 1
-                
-            except Exception as e:
-                error_msg = f"An error occurred while validating files of type {logic_type}: {e}"
-                self.log(f"❌ {error_msg}")
-                upload_stats['by_type'][logic_type]['errors'].append(error_msg)
-                completed_types += 1
-        
-        # Phase 2: Upload all validated data (with proper table clearing sequence)
-        if all_validated_data:
-            self.log("📤 Phase 2: Uploading all validated data...")
-            upload_count = 0
-            total_uploads = len(all_validated_data)
-            
-            for logic_type, (combined_df, valid_files_info, required_cols) in all_validated_data.items():
-                try:
-                    # จับเวลาเริ่มต้น Phase 2 สำหรับประเภทไฟล์นี้
-                    phase2_start_time = time.time()
-                    
-                    upload_progress = upload_count / total_uploads
-                    ui_callbacks['update_progress'](upload_progress, f"Uploading data for type {logic_type}", f"Upload {upload_count + 1} of {total_uploads}")
-                    
-                    self.log(f"📊 Uploading {len(combined_df)} rows for type {logic_type}")
-                    
-                    # Clear existing data only for the first upload of each table
-                    success, message = self.db_service.upload_data(
-                        combined_df, logic_type, required_cols, 
-                        log_func=self.log, clear_existing=True
-                    )
-                    
-                    if success:
-                        self.log(f"✅ {message}")
-                        upload_stats['successful_files'] += len(valid_files_info)
-                        for file_path, chk in valid_files_info:
-                            ui_callbacks['disable_checkbox'](chk)
-                            ui_callbacks['set_file_uploaded'](file_path)
-                            # ย้ายไฟล์ทันทีหลังอัปโหลดสำเร็จ
-                            try:
-                                move_success, move_result = self.file_service.move_uploaded_files([file_path], [logic_type])
-                                if move_success:
-                                    for original_path, new_path in move_result:
-                                        self.log(f"📦 Moved file to: {os.path.basename(new_path)}")
-                                else:
-                                    self.log(f"❌ Could not move file: {move_result}")
-                            except Exception as move_error:
-                                self.log(f"❌ An error occurred while moving file: {move_error}")
-                    else:
-                        # แสดงเฉพาะข้อความสรุปจากบริการฐานข้อมูล ไม่พิมพ์รายการคอลัมน์ทั้งหมด
-                        self.log(f"❌ {message}")
-                        upload_stats['by_type'][logic_type]['errors'].append(f"Database upload failed: {message}")
-                        upload_stats['failed_files'] += len(valid_files_info)
-                        
-                    upload_count += 1
-                    
-                    # คำนวณเวลา Phase 2 และรวมเข้าไปใน individual_processing_time
-                    phase2_time = time.time() - phase2_start_time
-                    if 'individual_processing_time' in upload_stats['by_type'][logic_type]:
-                        upload_stats['by_type'][logic_type]['individual_processing_time'] += phase2_time
-                        upload_stats['by_type'][logic_type]['processing_time'] = upload_stats['by_type'][logic_type]['individual_processing_time']
-                    
-                except Exception as e:
-                    error_msg = f"An error occurred while uploading data for type {logic_type}: {e}"
-                    self.log(f"❌ {error_msg}")
-                    upload_stats['by_type'][logic_type]['errors'].append(error_msg)
-                    upload_count += 1
-                    
-                    # คำนวณเวลา Phase 2 แม้เมื่อมีข้อผิดพลาดและรวมเข้าไปใน individual_processing_time
-                    phase2_time = time.time() - phase2_start_time
-                    if 'individual_processing_time' in upload_stats['by_type'][logic_type]:
-                        upload_stats['by_type'][logic_type]['individual_processing_time'] += phase2_time
-                        upload_stats['by_type'][logic_type]['processing_time'] = upload_stats['by_type'][logic_type]['individual_processing_time']
+            upload_stats['by_type'][logic_type] = {
+                'start_time': time.time(),
+                'files_count': len(files),
+                'successful_files': 0,
+                'failed_files': 0,
+                'errors': [],
+                'individual_processing_time': 0  # เก็บเวลารวมของประเภทนี้
+            }
+        
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="upload-type") as executor:
+                futures = [
+                    executor.submit(self._upload_logic_type, logic_type, files, upload_stats, stats_lock, report_progress, ui_callbacks)
+                    for logic_type, files in files_by_type.items()
+                ]
+                for future in as_completed(futures):
+                    future.result()
         else:
-            self.log("❌ No validated data to upload")
+            for logic_type, files in files_by_type.items():
+                self._upload_logic_type(logic_type, files, upload_stats, stats_lock, report_progress, ui_callbacks)
         
         # คำนวณเวลารวม
         total_upload_time = time.time() - upload_start_time
@@ -357,6 +341,144 @@ class FileHandler:
         # เปิดปุ่มทั้งหมดกลับมา
         ui_callbacks['enable_controls']()
     
+    def _upload_logic_type(self, logic_type, files, upload_stats, stats_lock, report_progress, ui_callbacks):
+        """
+        Job of one logic type: check the columns of its files, then stream them into its table
+        
+        Args:
+            logic_type: File type
+            files: [(file_path, checkbox)] of this type
+            upload_stats: Shared upload statistics (totals are updated under stats_lock)
+            stats_lock: Lock of the shared totals
+            report_progress: Function(units, status, detail) for the aggregated progress bar
+            ui_callbacks: UI callback functions
+        """
+        type_stats = upload_stats['by_type'][logic_type]
+        
+        # Phase 1: Check the columns of all files of this type
+        prepared = self._check_logic_type_files(logic_type, files, upload_stats, stats_lock, report_progress)
+        if prepared is None:
+            type_stats['processing_time'] = type_stats['individual_processing_time']
+            report_progress(1, f"Skipped upload for type {logic_type}", "No valid data")
+            return
+        valid_files_info, required_cols = prepared
+        
+        # Phase 2: Stream the files into one upload (ตารางเดียวกันถูกกันด้วย table lock ใน upload service)
+        # อ่านทีละ chunk เหมือน auto process หน่วยความจำจึงไม่โตตามขนาดไฟล์รวม
+        phase2_start_time = time.time()
+        try:
+            file_row_counts = {}  # {file_path: rows} สำหรับ ingest manifest
+            chunks = self._iter_tagged_file_chunks([file_path for file_path, _ in valid_files_info], logic_type, file_row_counts)
+            self.log(f"📊 Streaming rows of {len(valid_files_info)} file(s) for type {logic_type}")
+            
+            # Clear existing data only for the first upload of each table
+            success, message = self.db_service.upload_data(
+                chunks, logic_type, required_cols, 
+                log_func=self.log, clear_existing=True, cancel_token=self.cancel_token
+            )
+            
+            if success:
+                self.log(f"✅ {message}")
+                with stats_lock:
+                    upload_stats['successful_files'] += len(valid_files_info)
+                for file_path, chk in valid_files_info:
+                    ui_callbacks['disable_checkbox'](chk)
+                    ui_callbacks['set_file_uploaded'](file_path)
+                    self._record_loaded_file(file_path, logic_type, file_row_counts.get(file_path))
+                    # ย้ายไฟล์ทันทีหลังอัปโหลดสำเร็จ
+                    try:
+                        move_success, move_result = self.file_service.move_uploaded_files([file_path], [logic_type])
+                        if move_success:
+                            for original_path, new_path in move_result:
+                                self.log(f"📦 Moved file to: {os.path.basename(new_path)}")
+                        else:
+                            self.log(f"❌ Could not move file: {move_result}")
+                    except Exception as move_error:
+                        self.log(f"❌ An error occurred while moving file: {move_error}")
+            else:
+                # แสดงเฉพาะข้อความสรุปจากบริการฐานข้อมูล ไม่พิมพ์รายการคอลัมน์ทั้งหมด
+                self.log(f"❌ {message}")
+                type_stats['errors'].append(f"Database upload failed: {message}")
+                with stats_lock:
+                    upload_stats['failed_files'] += len(valid_files_info)
+            
+        except Exception as e:
+            error_msg = f"An error occurred while uploading data for type {logic_type}: {e}"
+            self.log(f"❌ {error_msg}")
+            type_stats['errors'].append(error_msg)
+            with stats_lock:
+                upload_stats['failed_files'] += len(valid_files_info)
+        finally:
+            # คำนวณเวลา Phase 2 และรวมเข้าไปใน individual_processing_time
+            type_stats['individual_processing_time'] += time.time() - phase2_start_time
+            type_stats['processing_time'] = type_stats['individual_processing_time']
+            report_progress(1, f"Uploaded type {logic_type}", f"{len(valid_files_info)} files")
+    
+    def _check_logic_type_files(self, logic_type, files, upload_stats, stats_lock, report_progress):
+        """
+        Check the columns of the files of one logic type (files are read later, while uploading)
+        
+        Returns:
+            tuple: (valid_files_info, required_cols), None when there is nothing to upload
+        """
+        type_stats = upload_stats['by_type'][logic_type]
+        
+        def add_failure(file_path, error_msg, file_start_time):
+            type_stats['failed_files'] += 1
+            type_stats['errors'].append(f"{os.path.basename(file_path)}: {error_msg}")
+            with stats_lock:
+                upload_stats['failed_files'] += 1
+            type_stats['individual_processing_time'] += time.time() - file_start_time
+        
+        try:
+            self.log(f"📖 Validating files of type {logic_type}")
+            
+            # ใช้ dtype ที่ถูกต้อง
+            required_cols = self.file_service.get_required_dtypes(logic_type)
+            
+            # ตรวจสอบว่า required_cols ไม่ว่างเปล่า
+            if not required_cols:
+                self.log(f"❌ No data type configuration found for {logic_type}")
+                return None
+            
+            valid_files_info = []
+            for file_path, chk in files:
+                # จับเวลาสำหรับไฟล์นี้เฉพาะ
+                file_start_time = time.time()
+                try:
+                    # ตรวจสอบคอลัมน์โดยการ preview ไฟล์ ข้อมูลจริงถูกอ่านแบบ stream ตอนอัปโหลด
+                    success, result, columns_info = self.file_service.preview_file_columns(file_path, logic_type)
+                    if not success:
+                        self.log(f"❌ Column check failed for {os.path.basename(file_path)}: {result}")
+                        add_failure(file_path, result, file_start_time)
+                        continue
+                    
+                    # หมายเหตุ: การตรวจสอบข้อมูลรายละเอียดจะทำใน staging table ด้วย SQL
+                    valid_files_info.append((file_path, chk))
+                    type_stats['successful_files'] += 1
+                    self.log(f"✅ File validated and ready: {os.path.basename(file_path)}")
+                    
+                    # คำนวณเวลาที่ใช้สำหรับไฟล์นี้
+                    type_stats['individual_processing_time'] += time.time() - file_start_time
+                    
+                except Exception as e:
+                    self.log(f"❌ An error occurred while reading file {os.path.basename(file_path)}: {e}")
+                    add_failure(file_path, str(e), file_start_time)
+                finally:
+                    report_progress(1, f"Checked file: {os.path.basename(file_path)}", f"Type {logic_type}")
+            
+            if not valid_files_info:
+                self.log(f"❌ No valid data from files of type {logic_type}")
+                return None
+            
+            return valid_files_info, required_cols
+            
+        except Exception as e:
+            error_msg = f"An error occurred while validating files of type {logic_type}: {e}"
+            self.log(f"❌ {error_msg}")
+            type_stats['errors'].append(error_msg)
+            return None
+    
     def _display_upload_summary(self, upload_stats, total_files):
         """แสดงรายงานสรุปการอัปโหลด"""
         self.log("========= Upload Summary Report ==========")
@@ -579,8 +701,15 @@ class FileHandler:
         
         return last_path  # Return path for further processing
     
-    def run_auto_process(self, folder_path, ui_callbacks):
-        """รันการประมวลผลอัตโนมัติใน thread แยก"""
+    def run_auto_process(self, folder_path, ui_callbacks, file_paths=None):
+        """
+        รันการประมวลผลอัตโนมัติใน thread แยก
+        
+        Args:
+            folder_path: โฟลเดอร์ต้นทาง
+            ui_callbacks: callbacks ของ UI
+            file_paths: ประมวลผลเฉพาะไฟล์เหล่านี้แทนการค้นหาทั้งโฟลเดอร์ (โหมด --watch)
+        """
         try:
             # ปิดปุ่มต่างๆ ระหว่างการทำงาน
             ui_callbacks['disable_controls']()
@@ -589,12 +718,18 @@ class FileHandler:
             ui_callbacks['reset_progress']()
             ui_callbacks['set_progress_status']("Starting auto processing", "Preparing system...")
             
+            self._start_cancellable_operation()
             self.log("🤖 Starting auto processing")
             self.log(f"📂 Source folder: {folder_path}")
             
             # === ประมวลผลไฟล์หลัก ===
             self.log("========= Processing files ==========")
-            self._auto_process_main_files(folder_path, ui_callbacks)
+            self._auto_process_main_files(folder_path, ui_callbacks, file_paths)
+            
+            if self.cancel_token.is_set():
+                self.log("🛑 Auto processing cancelled")
+                ui_callbacks['update_progress'](1.0, "Auto processing cancelled", "Remaining files were left in the source folder")
+                return
             
             self.log("==== Auto processing completed ======") 
             ui_callbacks['update_progress'](1.0, "Auto processing completed", "All steps completed successfully")
@@ -607,8 +742,141 @@ class FileHandler:
             # เปิดปุ่มกลับมา
             ui_callbacks['enable_controls']()
     
-    def _auto_process_main_files(self, folder_path, ui_callbacks):
-        """ประมวลผลไฟล์หลักอัตโนมัติ"""
+    def _journal(self, file_paths, phase, **fields):
+        """Write the phase of files of the current auto process run to the run journal"""
+        self.run_journal.set_phase(self.journal_run_id, file_paths, phase, **fields)
+    
+    def _get_journal_hash(self, file_path):
+        """Content hash stored in the journal (lets --resume notice a file that changed)"""
+        try:
+            return self.file_service.get_content_hash(file_path)
+        except OSError:
+            return None
+    
+    def _journal_phase_callback(self, file_paths, rows_by_file):
+        """
+        phase_callback for upload_data that journals the phases of one upload batch
+        
+        Args:
+            file_paths: Files streamed into the upload
+            rows_by_file: {file_path: rows}, complete once the staging phase is reported
+        """
+        def on_phase(phase, info):
+            if phase == FileConstants.PHASE_STAGED:
+                for file_path in file_paths:
+                    self._journal([file_path], phase, staging_table=info.get('staging_table'),
+                                  staged_rows=rows_by_file.get(file_path))
+            elif phase == FileConstants.PHASE_VALIDATED:
+                self._journal(file_paths, phase, committed_row_id=info.get('committed_row_id', 0))
+            else:
+                self._journal(file_paths, phase)
+        return on_phase
+    
+    def _start_journal_run(self, folder_path, process_stats):
+        """
+        Start the run in the run journal; with resume_run, first complete the interrupted run of the folder
+        
+        Returns:
+            int: Number of files of the interrupted run that were completed
+        """
+        self.journal_run_id = None
+        completed = 0
+        if self.resume_run:
+            run = self.run_journal.find_unfinished_run(folder_path)
+            if run:
+                self.journal_run_id = run['run_id']
+                self.log(f"⏩ Resuming interrupted run #{run['run_id']} started at {run['started_at']}")
+                completed = self._resume_journal_files(process_stats)
+            else:
+                self.log("ℹ️ No interrupted run found for this folder, starting a new run")
+        if self.journal_run_id is None:
+            self.journal_run_id = self.run_journal.start_run(folder_path)
+        return completed
+    
+    def _finish_journal_run(self, process_stats, resumed_files):
+        """Close the journal run when nothing else is left to process"""
+        if resumed_files:
+            for type_stats in process_stats['by_type'].values():
+                type_stats['processing_time'] = type_stats['individual_processing_time']
+            process_stats['total_time'] = time.time() - process_stats['start_time']
+            self._display_auto_process_summary(process_stats, resumed_files)
+        self.run_journal.finish_run(self.journal_run_id)
+    
+    def _resume_journal_files(self, process_stats):
+        """
+        Complete the files of the interrupted run from their last durable phase
+        
+        - transferred: only recorded in the manifest and moved
+        - staged / validated: the transfer resumes from the last committed batch, otherwise
+          the staging table is validated and transferred again; the file is not read again
+        - earlier phases, changed files or a staging table that is gone: left in the folder
+          and loaded again from the start by the rest of the run
+        
+        Returns:
+            int: Number of files completed
+        """
+        entries = [
+            entry for entry in self.run_journal.get_files(self.journal_run_id)
+            if os.path.exists(entry['file_path'])
+            and self.run_journal.phase_reached(entry['phase'], FileConstants.PHASE_STAGED)
+            and entry['phase'] != FileConstants.PHASE_MOVED
+        ]
+        
+        groups = {}
+        for entry in entries:
+            file_path = entry['file_path']
+            if entry['content_hash'] and entry['content_hash'] != self._get_journal_hash(file_path):
+                self.log(f"⚠️ {os.path.basename(file_path)} changed since the interrupted run, loading it again")
+                continue
+            groups.setdefault((entry['logic_type'], entry['phase'] == FileConstants.PHASE_TRANSFERRED), []).append(entry)
+        
+        completed = 0
+        for (logic_type, transferred), group in groups.items():
+            if self.cancel_token.is_set():
+                break
+            file_paths = [entry['file_path'] for entry in group]
+            rows_by_file = {entry['file_path']: entry['staged_rows'] for entry in group}
+            start_time = time.time()
+            
+            if not transferred:
+                required_cols = self.file_service.get_required_dtypes(logic_type)
+                phase_callback = self._journal_phase_callback(file_paths, rows_by_file)
+                success, message = False, ""
+                if any(entry['committed_row_id'] for entry in group):
+                    success, message = self.db_service.resume_transfer(
+                        logic_type, required_cols, log_func=self.log, phase_callback=phase_callback,
+                        cancel_token=self.cancel_token
+                    )
+                if not success:
+                    expected_rows = sum(rows or 0 for rows in rows_by_file.values())
+                    success, message = self.db_service.resume_from_staging(
+                        logic_type, required_cols, log_func=self.log,
+                        expected_rows=expected_rows, phase_callback=phase_callback,
+                        cancel_token=self.cancel_token
+                    )
+                if not success:
+                    self.log(f"⚠️ Could not resume {logic_type} ({message}), its files will be loaded again")
+                    continue
+                self.log(f"✅ Resumed {logic_type}: {message}")
+            
+            type_stats = self._get_type_stats(process_stats, logic_type)
+            type_stats['files_count'] += len(file_paths)
+            type_stats['successful_files'] += len(file_paths)
+            process_stats['successful_files'] += len(file_paths)
+            self._finish_loaded_files(file_paths, logic_type, rows_by_file)
+            type_stats['individual_processing_time'] += time.time() - start_time
+            completed += len(file_paths)
+        
+        if completed:
+            self.log(f"⏩ Completed {completed} files of the interrupted run without reading them again")
+        return completed
+    
+    def _is_batch_mode(self):
+        """Auto process loads all files of a logic type in one staging pass (batch_same_type_files)"""
+        return bool(json_manager.get('app_settings', 'batch_same_type_files', True))
+    
+    def _auto_process_main_files(self, folder_path, ui_callbacks, file_paths=None):
+        """ประมวลผลไฟล์หลักอัตโนมัติ (file_paths: เฉพาะไฟล์ที่ระบุ, None = ทุกไฟล์ในโฟลเดอร์)"""
         try:
             # เริ่มจับเวลา
             process_start_time = time.time()
@@ -616,182 +884,85 @@ class FileHandler:
             # ตั้ง search path ใหม่
             self.file_service.set_search_path(folder_path)
             
-            # ค้นหาไฟล์ข้อมูล
-            data_files = self.file_service.find_data_files()
+            # สถิติการประมวลผล
+            process_stats = {
+                'start_time': process_start_time,
+                'by_type': {},
+                'errors': [],
+                'successful_files': 0,
+                'failed_files': 0,
+                'availability_times': []
+            }
+            
+            # เริ่มรอบใน journal (--resume: ทำไฟล์ของรอบที่ค้างให้เสร็จก่อน)
+            resumed_files = self._start_journal_run(folder_path, process_stats)
+            
+            # ค้นหาไฟล์ข้อมูล (โหมด watch ส่งไฟล์ใหม่มาให้แล้ว ไม่ต้อง scan ทั้งโฟลเดอร์)
+            if file_paths is not None:
+                data_files = [file_path for file_path in file_paths if os.path.isfile(file_path)]
+            else:
+                data_files = self.file_service.find_data_files()
             
             if not data_files:
                 self.log("No data files found in source folder")
+                self._finish_journal_run(process_stats, resumed_files)
+                return
+            
+            # ตัดไฟล์ที่เคยโหลดแล้วออกก่อนอ่าน/parse ไฟล์ใดๆ
+            data_files = self._filter_loaded_files(data_files)
+            if not data_files:
+                self.log("No new data files to process")
+                self._finish_journal_run(process_stats, resumed_files)
                 return
             
             self.log(f"Found {len(data_files)} data files, starting processing...")
+            self._journal(data_files, FileConstants.PHASE_PENDING)
             
-            total_files = len(data_files)
-            processed_files = 0
-            successful_uploads = 0
+            total_files = len(data_files) + resumed_files
             
-            # สถิติการประมวลผล
-            process_stats = {
-                'start_time': process_start_time,
-                'by_type': {},
-                'errors': [],
-                'successful_files': 0,
-                'failed_files': 0
-            }
+            # ตรวจประเภทไฟล์ทั้งโฟลเดอร์แบบขนานก่อน ผลถูก cache ไว้ให้ detect_file_type ในลูปด้านล่าง
+            for _ in self.file_service.detect_file_types(data_files, self._get_scan_workers(), self.cancel_token):
+                pass
             
-            for file_path in data_files:
-                try:
-                    processed_files += 1
-                    # คำนวณ progress ที่ถูกต้อง (0.0 - 1.0)
-                    progress = (processed_files - 1) / total_files  # เริ่มจาก 0
-                    
-                    # อัปเดตความคืบหน้าแบบละเอียด
-                    ui_callbacks['update_progress'](progress, f"Processing file: {os.path.basename(file_path)}", f"File {processed_files} of {total_files}")
-                    
-                    self.log(f"📁 Processing file: {os.path.basename(file_path)}")
-                    
-                    # ตรวจหา logic_type
-                    logic_type = self.file_service.detect_file_type(file_path)
-                    if not logic_type:
-                        # ลองเดาจากชื่อไฟล์
-                        filename = os.path.basename(file_path).lower()
-                        for key in self.file_service.column_settings.keys():
-                            if key.lower() in filename:
-                                logic_type = key
-                                break
-                    
-                    if not logic_type:
-                        error_msg = f"Could not identify file type: {os.path.basename(file_path)}"
-                        self.log(f"❌ {error_msg}")
-                        process_stats['failed_files'] += 1
-                        process_stats['errors'].append(f"{os.path.basename(file_path)}: {error_msg}")
-                        continue
-                    
-                    # เริ่มจับเวลาสำหรับประเภทไฟล์นี้ (ถ้ายังไม่มี)
-                    if logic_type not in process_stats['by_type']:
-                        process_stats['by_type'][logic_type] = {
-                            'start_time': time.time(),
-                            'files_count': 0,
-                            'successful_files': 0,
-                            'failed_files': 0,
-                            'errors': [],
-                            'individual_processing_time': 0  # เก็บเวลารวมของประเภทนี้
-                        }
-                    
-                    # จับเวลาสำหรับไฟล์นี้เฉพาะ
-                    file_start_time = time.time()
-                    
-                    process_stats['by_type'][logic_type]['files_count'] += 1
-                    
-                    self.log(f"📋 Identified file type: {logic_type}")
-                    
-                    # ตรวจสอบคอลัมน์ก่อนโดยการ preview ไฟล์ (ประหยัดเวลา)
-                    success, result, columns_info = self.file_service.preview_file_columns(file_path, logic_type)
-                    if not success:
-                        error_msg = f"Column check failed: {result}"
-                        self.log(f"❌ {error_msg}")
-                        process_stats['by_type'][logic_type]['failed_files'] += 1
-                        process_stats['by_type'][logic_type]['errors'].append(f"{os.path.basename(file_path)}: {error_msg}")
-                        process_stats['failed_files'] += 1
-                        
-                        # คำนวณเวลาที่ใช้แม้เมื่อตรวจสอบคอลัมน์ล้มเหลว
-                        file_processing_time = time.time() - file_start_time
-                        process_stats['by_type'][logic_type]['individual_processing_time'] += file_processing_time
-                        continue
-                    
-                    # อ่านไฟล์เต็มรูปแบบ (หลังจากตรวจสอบคอลัมน์ผ่านแล้ว)
-                    success, result = self.file_service.read_excel_file(file_path, logic_type)
-                    if not success:
-                        error_msg = f"Could not read file: {result}"
-                        self.log(f"❌ {error_msg}")
-                        process_stats['by_type'][logic_type]['failed_files'] += 1
-                        process_stats['by_type'][logic_type]['errors'].append(f"{os.path.basename(file_path)}: {error_msg}")
-                        process_stats['failed_files'] += 1
-                        
-                        # คำนวณเวลาที่ใช้แม้เมื่ออ่านไฟล์ล้มเหลว
-                        file_processing_time = time.time() - file_start_time
-                        process_stats['by_type'][logic_type]['individual_processing_time'] += file_processing_time
-                        continue
-                    
-                    df = result
-                    
-                    # หมายเหตุ: การตรวจสอบข้อมูลรายละเอียดจะทำใน staging table ด้วย SQL
-                    
-                    # อัปโหลดข้อมูล
-                    required_cols = self.file_service.get_required_dtypes(logic_type)
-                    
-                    # ตรวจสอบว่า required_cols ไม่ว่างเปล่า
-                    if not required_cols:
-                        error_msg = f"No data type configuration found for {logic_type}"
-                        self.log(f"❌ {error_msg}")
-                        process_stats['by_type'][logic_type]['failed_files'] += 1
-                        process_stats['by_type'][logic_type]['errors'].append(f"{os.path.basename(file_path)}: {error_msg}")
-                        process_stats['failed_files'] += 1
-                        
-                        # คำนวณเวลาที่ใช้แม้เมื่อไม่พบ configuration
-                        file_processing_time = time.time() - file_start_time
-                        process_stats['by_type'][logic_type]['individual_processing_time'] += file_processing_time
-                        continue
-                    
-                    # ตรวจสอบว่าข้อมูลไม่ว่างเปล่า
-                    if df.empty:
-                        error_msg = f"File {os.path.basename(file_path)} has no data"
-                        self.log(f"❌ {error_msg}")
-                        process_stats['by_type'][logic_type]['failed_files'] += 1
-                        process_stats['by_type'][logic_type]['errors'].append(f"{os.path.basename(file_path)}: {error_msg}")
-                        process_stats['failed_files'] += 1
-                        
-                        # คำนวณเวลาที่ใช้แม้เมื่อไฟล์ว่างเปล่า
-                        file_processing_time = time.time() - file_start_time
-                        process_stats['by_type'][logic_type]['individual_processing_time'] += file_processing_time
-                        continue
-                    
-                    self.log(f"📊 Uploading {len(df)} rows for type {logic_type}")
-                    # Clear existing data on first upload for each type
-                    success, message = self.db_service.upload_data(df, logic_type, required_cols, log_func=self.log, clear_existing=True)
-                    
-                    if success:
-                        self.log(f"✅ Upload successful: {message}")
-                        successful_uploads += 1
-                        process_stats['by_type'][logic_type]['successful_files'] += 1
-                        process_stats['successful_files'] += 1
-                        
-                        # คำนวณเวลาที่ใช้สำหรับไฟล์นี้และเพิ่มเข้าไปในเวลารวม
-                        file_processing_time = time.time() - file_start_time
-                        process_stats['by_type'][logic_type]['individual_processing_time'] += file_processing_time
-                        
-                        # ย้ายไฟล์หลังอัปโหลดสำเร็จ
-                        try:
-                            move_success, move_result = self.file_service.move_uploaded_files([file_path], [logic_type])
-                            if move_success:
-                                for original_path, new_path in move_result:
-                                    self.log(f"📦 Moved file to: {os.path.basename(new_path)}")
-                            else:
-                                self.log(f"❌ Could not move file: {move_result}")
-                        except Exception as move_error:
-                            self.log(f"❌ An error occurred while moving file: {move_error}")
-                    else:
-                        # แสดงเฉพาะข้อความสรุปจากบริการฐานข้อมูล ไม่พิมพ์รายการคอลัมน์ทั้งหมด
-                        error_msg = f"Upload failed: {message}"
-                        self.log(f"❌ {error_msg}")
-                        process_stats['by_type'][logic_type]['failed_files'] += 1
-                        process_stats['by_type'][logic_type]['errors'].append(f"{os.path.basename(file_path)}: {error_msg}")
-                        process_stats['failed_files'] += 1
-                        
-                        # คำนวณเวลาที่ใช้สำหรับไฟล์นี้แม้เมื่อล้มเหลว
-                        file_processing_time = time.time() - file_start_time
-                        process_stats['by_type'][logic_type]['individual_processing_time'] += file_processing_time
-                        
-                except Exception as e:
-                    error_msg = f"An error occurred while processing {os.path.basename(file_path)}: {e}"
-                    self.log(f"❌ {error_msg}")
-                    if logic_type and logic_type in process_stats['by_type']:
-                        process_stats['by_type'][logic_type]['failed_files'] += 1
-                        process_stats['by_type'][logic_type]['errors'].append(f"{os.path.basename(file_path)}: {str(e)}")
-                        
-                        # คำนวณเวลาที่ใช้สำหรับไฟล์นี้แม้เมื่อเกิดข้อผิดพลาด
-                        file_processing_time = time.time() - file_start_time
-                        process_stats['by_type'][logic_type]['individual_processing_time'] += file_processing_time
-                    process_stats['failed_files'] += 1
+            # ตรวจประเภทและคอลัมน์ของทุกไฟล์ก่อน แล้วจัดกลุ่มตาม logic type
+            files_by_type = {}
+            for index, file_path in enumerate(data_files):
+                if self.cancel_token.is_set():
+                    break
+                # คำนวณ progress ที่ถูกต้อง (0.0 - 0.2)
+                ui_callbacks['update_progress'](0.2 * index / total_files, f"Checking file: {os.path.basename(file_path)}", f"File {index + 1} of {total_files}")
+                logic_type = self._prepare_auto_file(file_path, process_stats)
+                if logic_type:
+                    files_by_type.setdefault(logic_type, []).append(file_path)
+            
+            # batch: ไฟล์ประเภทเดียวกันเข้า staging เดียว validate/transfer ครั้งเดียว
+            batch_mode = self._is_batch_mode()
+            if batch_mode:
+                upload_groups = [(logic_type, files) for logic_type, files in files_by_type.items()]
+            else:
+                upload_groups = [(logic_type, [file_path]) for logic_type, files in files_by_type.items() for file_path in files]
+            
+            # เรียงงานตามต้นทุนโดยประมาณ (job_schedule) ไฟล์ใหญ่ไม่บังไฟล์เล็กที่อยู่ข้างหลัง
+            jobs = self._schedule_upload_jobs(upload_groups)
+            
+            for index, job in enumerate(jobs):
+                if self.cancel_token.is_set():
+                    self.log(f"🛑 Cancelled - {len(jobs) - index} upload job(s) not started, their files stay in the source folder")
+                    break
+                logic_type, file_paths = job.logic_type, job.file_paths
+                # คำนวณ progress ที่ถูกต้อง (0.2 - 1.0)
+                progress = 0.2 + 0.8 * index / len(jobs)
+                if len(file_paths) > 1:
+                    ui_callbacks['update_progress'](progress, f"Processing type: {logic_type}", f"{len(file_paths)} files in one batch")
+                else:
+                    ui_callbacks['update_progress'](progress, f"Processing file: {os.path.basename(file_paths[0])}", f"Upload {index + 1} of {len(jobs)}")
+                if self._auto_upload_files(logic_type, file_paths, process_stats, job):
+                    # เวลาตั้งแต่เริ่มรอบจนตารางพร้อมใช้
+                    process_stats['availability_times'].append(time.time() - process_start_time)
+            
+            if process_stats['availability_times']:
+                mean_availability = sum(process_stats['availability_times']) / len(process_stats['availability_times'])
+                self.log(f"⏱️ Mean time to availability: {mean_availability:.1f} seconds over {len(process_stats['availability_times'])} uploads")
             
             # ใช้เวลารวมที่คำนวณแยกสำหรับแต่ละประเภท
             for logic_type in process_stats['by_type']:
@@ -802,10 +973,13 @@ class FileHandler:
             process_stats['total_time'] = time.time() - process_start_time
             
             # อัปเดต progress เป็น 100% เมื่อเสร็จสิ้น
-            ui_callbacks['update_progress'](1.0, "Processing completed", f"Successfully processed {successful_uploads} of {total_files} files")
+            ui_callbacks['update_progress'](1.0, "Processing completed", f"Successfully processed {process_stats['successful_files']} of {total_files} files")
             
             # แสดงรายงานสรุป
             self._display_auto_process_summary(process_stats, total_files)
+            # รอบที่ถูกยกเลิกยังไม่ปิด ไฟล์ที่โหลดเสร็จแต่ยังไม่ย้ายจะถูกทำต่อด้วย --resume
+            if not self.cancel_token.is_set():
+                self.run_journal.finish_run(self.journal_run_id)
             
             # ล้าง list ไฟล์หลังจากประมวลผลเสร็จ เหมือนการอัปโหลดปกติ
             ui_callbacks['clear_file_list']()
@@ -814,6 +988,229 @@ class FileHandler:
         except Exception as e:
             self.log(f"❌ An error occurred while processing files: {e}")
     
+    def _get_type_stats(self, process_stats, logic_type):
+        """สถิติของ logic type (สร้างใหม่เมื่อเจอครั้งแรก)"""
+        if logic_type not in process_stats['by_type']:
+            process_stats['by_type'][logic_type] = {
+                'start_time': time.time(),
+                'files_count': 0,
+                'successful_files': 0,
+                'failed_files': 0,
+                'errors': [],
+                'individual_processing_time': 0  # เก็บเวลารวมของประเภทนี้
+            }
+        return process_stats['by_type'][logic_type]
+    
+    def _record_auto_failure(self, process_stats, logic_type, file_paths, error_msg, elapsed=0):
+        """บันทึกไฟล์ที่ล้มเหลวลงสถิติของ auto process"""
+        self.log(f"❌ {error_msg}")
+        self._journal(file_paths, FileConstants.PHASE_FAILED, logic_type=logic_type, error=error_msg)
+        process_stats['failed_files'] += len(file_paths)
+        if logic_type:
+            type_stats = self._get_type_stats(process_stats, logic_type)
+            type_stats['failed_files'] += len(file_paths)
+            type_stats['errors'].extend(f"{os.path.basename(file_path)}: {error_msg}" for file_path in file_paths)
+            type_stats['individual_processing_time'] += elapsed
+        else:
+            process_stats['errors'].extend(f"{os.path.basename(file_path)}: {error_msg}" for file_path in file_paths)
+    
+    def _prepare_auto_file(self, file_path, process_stats):
+        """
+        Identify a file's logic type and check its columns before anything is uploaded
+        
+        Returns:
+            Optional[str]: Logic type, None when the file cannot be processed
+        """
+        logic_type = None
+        file_start_time = time.time()
+        try:
+            self.log(f"📁 Checking file: {os.path.basename(file_path)}")
+            
+            # ตรวจหา logic_type
+            logic_type = self.file_service.detect_file_type(file_path)
+            if not logic_type:
+                # ลองเดาจากชื่อไฟล์
+                filename = os.path.basename(file_path).lower()
+                for key in self.file_service.column_settings.keys():
+                    if key.lower() in filename:
+                        logic_type = key
+                        break
+            
+            if not logic_type:
+                self._record_auto_failure(process_stats, None, [file_path], f"Could not identify file type: {os.path.basename(file_path)}")
+                return None
+            
+            self._get_type_stats(process_stats, logic_type)['files_count'] += 1
+            self.log(f"📋 Identified file type: {logic_type}")
+            
+            # ตรวจสอบคอลัมน์ก่อนโดยการ preview ไฟล์ (ประหยัดเวลา)
+            success, result, columns_info = self.file_service.preview_file_columns(file_path, logic_type)
+            if not success:
+                self._record_auto_failure(process_stats, logic_type, [file_path], f"Column check failed: {result}", time.time() - file_start_time)
+                return None
+            
+            self._get_type_stats(process_stats, logic_type)['individual_processing_time'] += time.time() - file_start_time
+            self._journal([file_path], FileConstants.PHASE_CHECKED, logic_type=logic_type,
+                          content_hash=self._get_journal_hash(file_path))
+            return logic_type
+            
+        except Exception as e:
+            error_msg = f"An error occurred while processing {os.path.basename(file_path)}: {e}"
+            self._record_auto_failure(process_stats, logic_type, [file_path], error_msg, time.time() - file_start_time)
+            return None
+    
+    def _get_job_policy(self):
+        """Order of auto process upload jobs from app settings: 'sjf' (default), 'fifo' or 'priority'"""
+        policy = json_manager.get('app_settings', 'job_schedule', FileConstants.SCHEDULE_SJF)
+        if policy not in (FileConstants.SCHEDULE_SJF, FileConstants.SCHEDULE_FIFO, FileConstants.SCHEDULE_PRIORITY):
+            return FileConstants.SCHEDULE_SJF
+        return policy
+    
+    def _schedule_upload_jobs(self, upload_groups):
+        """
+        Estimate the cost of each upload job and order the jobs by the configured policy
+        
+        Args:
+            upload_groups: [(logic_type, file_paths)] in discovery order
+            
+        Returns:
+            list: UploadJob in run order
+        """
+        policy = self._get_job_policy()
+        table_names = self.file_service.column_settings.get('__table_names__', {}) or {}
+        jobs = self.job_scheduler.build_jobs(
+            upload_groups, self.file_service.estimate_row_count,
+            lambda logic_type: table_names.get(logic_type) or logic_type
+        )
+        jobs = self.job_scheduler.schedule(jobs, policy, json_manager.get('app_settings', 'job_priority', []))
+        if len(jobs) > 1:
+            self.log(f"🗓️ Upload order ({policy}):")
+            for job in jobs:
+                rows = f"~{job.estimated_rows:,} rows, " if job.estimated_rows is not None else ""
+                self.log(
+                    f"   {job.logic_type}: {len(job.file_paths)} file(s), {format_file_size(job.total_bytes)}, "
+                    f"{rows}~{job.estimated_seconds:,.0f}s"
+                )
+        return jobs
+    
+    def _auto_upload_files(self, logic_type, file_paths, process_stats, job=None):
+        """
+        Stream one or more files of the same logic type into one upload_data call
+        
+        Every chunk is tagged with its file name (__source_file in staging), so a
+        batch is staged, validated and transferred once while each row keeps its origin.
+        
+        Args:
+            job: UploadJob of the files (its load time is added to the scheduler history)
+        
+        Returns:
+            int: Number of files uploaded
+        """
+        upload_start_time = time.time()
+        type_stats = self._get_type_stats(process_stats, logic_type)
+        try:
+            # อัปโหลดข้อมูล
+            required_cols = self.file_service.get_required_dtypes(logic_type)
+            
+            # ตรวจสอบว่า required_cols ไม่ว่างเปล่า
+            if not required_cols:
+                self._record_auto_failure(process_stats, logic_type, file_paths, f"No data type configuration found for {logic_type}")
+                return 0
+            
+            rows_by_file = {}
+            # parsed ถูกบันทึกเมื่ออ่านครบทุก chunk ของไฟล์แล้วเท่านั้น
+            chunks = self._iter_tagged_file_chunks(
+                file_paths, logic_type, rows_by_file,
+                on_file_read=lambda file_path: self._journal([file_path], FileConstants.PHASE_PARSED)
+            )
+            
+            # ไฟล์ว่างจะถูกตรวจใน upload_data (คืนค่า "Empty data")
+            if len(file_paths) > 1:
+                self.log(f"📦 Batch loading {len(file_paths)} files of type {logic_type} into one staging table")
+            self.log(f"📊 Streaming rows for type {logic_type}")
+            # Clear existing data on first upload for each type
+            success, message = self.db_service.upload_data(
+                chunks, logic_type, required_cols, log_func=self.log, clear_existing=True,
+                phase_callback=self._journal_phase_callback(file_paths, rows_by_file),
+                cancel_token=self.cancel_token
+            )
+            
+            if not success:
+                # แสดงเฉพาะข้อความสรุปจากบริการฐานข้อมูล ไม่พิมพ์รายการคอลัมน์ทั้งหมด
+                self._record_auto_failure(process_stats, logic_type, file_paths, f"Upload failed: {message}", time.time() - upload_start_time)
+                return 0
+            
+            self.log(f"✅ Upload successful: {message}")
+            type_stats['successful_files'] += len(file_paths)
+            process_stats['successful_files'] += len(file_paths)
+            type_stats['individual_processing_time'] += time.time() - upload_start_time
+            
+            if job is not None:
+                self.job_scheduler.record_load(
+                    logic_type, job.total_bytes, sum(rows_by_file.values()), time.time() - upload_start_time
+                )
+            self._finish_loaded_files(file_paths, logic_type, rows_by_file)
+            return len(file_paths)
+            
+        except Exception as e:
+            error_msg = f"An error occurred while processing {logic_type}: {e}"
+            self._record_auto_failure(process_stats, logic_type, file_paths, error_msg, time.time() - upload_start_time)
+            return 0
+    
+    def _finish_loaded_files(self, file_paths, logic_type, rows_by_file):
+        """Record loaded files in the ingest manifest, then move them to the uploaded folder"""
+        for file_path in file_paths:
+            self._record_loaded_file(file_path, logic_type, rows_by_file.get(file_path))
+            
+            # ย้ายไฟล์หลังอัปโหลดสำเร็จ
+            try:
+                move_success, move_result = self.file_service.move_uploaded_files([file_path], [logic_type])
+                if move_success:
+                    for original_path, new_path in move_result:
+                        self.log(f"📦 Moved file to: {os.path.basename(new_path)}")
+                    self._journal([file_path], FileConstants.PHASE_MOVED)
+                else:
+                    self.log(f"❌ Could not move file: {move_result}")
+            except Exception as move_error:
+                self.log(f"❌ An error occurred while moving file: {move_error}")
+    
+    def _iter_tagged_file_chunks(self, file_paths, logic_type, rows_by_file, on_file_read=None):
+        """
+        Chain the chunk streams of several files, adding the source file name to every chunk
+        
+        Files are opened one at a time, so memory stays bounded by one reader.
+        
+        Args:
+            file_paths: Files of the same logic type
+            logic_type: File type
+            rows_by_file: Filled with {file_path: rows read}
+            on_file_read: Optional function(file_path) called once every chunk of a file was yielded
+            
+        Raises:
+            RuntimeError: When a file cannot be read (the whole batch is not loaded)
+        """
+        for file_path in file_paths:
+            self.cancel_token.raise_if_cancelled()
+            file_name = os.path.basename(file_path)
+            self.log(f"📁 Reading file: {file_name}")
+            success, result = self.file_service.read_excel_file_chunks(file_path, logic_type)
+            if not success:
+                raise RuntimeError(f"Could not read file {file_name}: {result}")
+            
+            chunks = result
+            rows_by_file[file_path] = 0
+            try:
+                for chunk in chunks:
+                    chunk[DatabaseConstants.SOURCE_FILE_COLUMN] = file_name
+                    rows_by_file[file_path] += len(chunk)
+                    yield chunk
+                if on_file_read is not None:
+                    on_file_read(file_path)
+            finally:
+                # หยุด prefetch thread ของไฟล์นี้หากการอัปโหลดหยุดกลางทาง
+                if hasattr(chunks, 'close'):
+                    chunks.close()
+    
     def _auto_export_logs(self):
         """ส่งออก log อัตโนมัติไปยังโฟลเดอร์ log_pipeline และจัดการไฟล์เก่า"""
         try:
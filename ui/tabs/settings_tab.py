@@ -5,6 +5,7 @@ import customtkinter as ctk
 from tkinter import messagebox, filedialog
 import pandas as pd
 from constants import DatabaseConstants, FileConstants
+from utils.csv_utils import detect_csv_encoding
 
 
 class SettingsTab:
@@ -287,7 +288,7 @@ class SettingsTab:
         
         try:
             if file_path.lower().endswith('.csv'):
-                df = pd.read_csv(file_path, nrows=100, encoding='utf-8')
+                df = pd.read_csv(file_path, nrows=100, encoding=detect_csv_encoding(file_path))
             elif file_path.lower().endswith('.xls'):
                 # สำหรับไฟล์ .xls ใช้ xlrd engine
                 df = pd.read_excel(file_path, nrows=100, engine='xlrd')
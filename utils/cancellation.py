@@ -0,0 +1,162 @@
+"""
+Cooperative cancellation for PIPELINE_SQLSERVER
+
+One CancellationToken is created per operation (upload, auto process) and
+reaches every stage of it:
+- readers and the chunk prefetcher check it between chunks (it is a threading.Event)
+- every SQL statement run through a watched engine checks it before executing, and
+  the DBAPI cursor of a running statement is cancelled server-side (pyodbc
+  Cursor.cancel → SQLCancel) when the token is set
+- code that runs statements on raw DBAPI cursors registers them with register_cursor()
+
+The token of the current thread is set with cancellation_scope(); worker threads
+started by an operation enter the scope of the token they were given.
+"""
+
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+
+
+logger = logging.getLogger(__name__)
+
+_current = threading.local()
+
+
+class OperationCancelledError(Exception):
+    """Raised when an operation stops because its cancellation token was set"""
+
+
+class CancellationToken(threading.Event):
+    """
+    Cancellation flag that also cancels the SQL statements running under it
+
+    Set it with cancel() (or set()) from any thread.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._cursors = set()
+        self._cursors_lock = threading.Lock()
+
+    def set(self) -> None:
+        """Mark the operation cancelled and cancel every statement running under the token"""
+        super().set()
+        with self._cursors_lock:
+            cursors = list(self._cursors)
+        for cursor in cursors:
+            try:
+                cursor.cancel()
+            except Exception as e:
+                # driver ที่ไม่รองรับ cancel: statement จะจบเองแล้วหยุดที่ statement ถัดไป
+                logger.debug(f"Could not cancel running statement: {e}")
+
+    cancel = set
+
+    def raise_if_cancelled(self) -> None:
+        """Raise OperationCancelledError if the token was set"""
+        if self.is_set():
+            raise OperationCancelledError("Operation cancelled")
+
+    def _register(self, cursor) -> None:
+        with self._cursors_lock:
+            self._cursors.add(cursor)
+        # ยกเลิกระหว่างที่ลงทะเบียน: cancel() อาจไม่เห็น cursor นี้
+        if self.is_set():
+            self._unregister(cursor)
+            raise OperationCancelledError("Operation cancelled")
+
+    def _unregister(self, cursor) -> None:
+        with self._cursors_lock:
+            self._cursors.discard(cursor)
+
+
+def current_token() -> Optional[CancellationToken]:
+    """Cancellation token of the current thread (None outside a cancellation scope)"""
+    return getattr(_current, 'token', None)
+
+
+def is_cancelled(error: Exception = None) -> bool:
+    """
+    Whether the current operation was cancelled
+
+    A statement cancelled on the server fails with a driver error, so the token of
+    the current scope is checked too; such errors must be re-raised or reported as
+    a cancel, not as a failed load or invalid data.
+
+    Args:
+        error: Exception being handled (optional)
+    """
+    token = current_token()
+    return isinstance(error, OperationCancelledError) or (token is not None and token.is_set())
+
+
+@contextmanager
+def cancellation_scope(token: Optional[CancellationToken]) -> Iterator[Optional[CancellationToken]]:
+    """
+    Run the block under a token (None = not cancellable, e.g. cleanup after a cancel)
+
+    Args:
+        token: Token of the operation
+    """
+    previous = current_token()
+    _current.token = token
+    try:
+        yield token
+    finally:
+        _current.token = previous
+
+
+@contextmanager
+def register_cursor(cursor) -> Iterator[None]:
+    """Make a raw DBAPI cursor cancellable by the current thread's token while the block runs"""
+    token = current_token()
+    if token is None:
+        yield
+        return
+    token._register(cursor)
+    try:
+        yield
+    finally:
+        token._unregister(cursor)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    token = current_token()
+    if token is not None:
+        token._register(cursor)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    token = current_token()
+    if token is not None:
+        token._unregister(cursor)
+
+
+def _handle_error(exception_context):
+    # ExceptionContext ไม่มี cursor โดยตรง ต้องเอาจาก execution_context (None เมื่อ error ก่อนสร้าง context)
+    # hook นี้ต้องไม่ raise เอง ไม่เช่นนั้น error จริงของ driver จะหายไป
+    token = current_token()
+    if token is None:
+        return
+    execution_context = getattr(exception_context, 'execution_context', None)
+    cursor = getattr(execution_context, 'cursor', None)
+    if cursor is not None:
+        token._unregister(cursor)
+
+
+def watch_engine(engine) -> None:
+    """
+    Make every statement executed through a SQLAlchemy engine cancellable (idempotent)
+
+    Args:
+        engine: SQLAlchemy engine
+    """
+    if event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        return
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(engine, 'handle_error', _handle_error)
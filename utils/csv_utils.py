@@ -0,0 +1,267 @@
+"""
+CSV utility functions for PIPELINE_SQLSERVER
+
+- Encoding detection from the BOM plus a bounded sample decode
+- Row counting with a memory-mapped newline scan (estimated from byte size for very large files)
+- Arrow-based CSV reading: every column is parsed as a string because the data
+  lands in NVARCHAR(MAX) staging anyway, so no type inference is needed
+"""
+
+import codecs
+import csv
+import importlib.util
+import mmap
+import os
+from typing import Iterator, List, Tuple
+
+import pandas as pd
+
+from constants import FileConstants
+
+
+# BOM ที่ยาวกว่าต้องตรวจก่อน (UTF-32 LE ขึ้นต้นด้วย BOM ของ UTF-16 LE)
+_BOMS = [
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+
+
+def detect_csv_encoding(file_path: str, sample_size: int = FileConstants.CSV_ENCODING_SAMPLE_SIZE) -> str:
+    """
+    Detect CSV encoding from the BOM, otherwise by decoding a bounded sample
+
+    Candidates are tried in the same order as before (utf-8 → cp874 → latin1);
+    only the first sample_size bytes are read, never the whole file.
+    A UTF-8 BOM is reported as 'utf-8' (pandas and pyarrow skip it).
+
+    Args:
+        file_path: CSV file path
+        sample_size: Bytes to sample
+
+    Returns:
+        str: Encoding name
+    """
+    with open(file_path, 'rb') as f:
+        sample = f.read(sample_size)
+
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return encoding
+
+    for encoding in FileConstants.CSV_ENCODINGS:
+        # incremental decoder ไม่ error กับอักขระหลายไบต์ที่ถูกตัดท้าย sample
+        decoder = codecs.getincrementaldecoder(encoding)()
+        try:
+            decoder.decode(sample, final=len(sample) < sample_size)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return 'latin1'
+
+
+def csv_encoding_fallbacks(encoding: str) -> List[str]:
+    """
+    Encodings to try when data after the detection sample does not decode with encoding
+
+    Args:
+        encoding: Encoding that failed
+
+    Returns:
+        List[str]: Remaining candidates in detection order, latin1 last (never fails)
+    """
+    candidates = list(FileConstants.CSV_ENCODINGS)
+    remaining = candidates[candidates.index(encoding) + 1:] if encoding in candidates else []
+    return remaining + (['latin1'] if encoding != 'latin1' else [])
+
+
+def _decodes_fully(file_path: str, encoding: str, block_size: int) -> bool:
+    """Whether the whole file decodes with encoding (read in blocks, memory stays bounded)"""
+    decoder = codecs.getincrementaldecoder(encoding)()
+    try:
+        with open(file_path, 'rb') as f:
+            while True:
+                block = f.read(block_size)
+                if not block:
+                    decoder.decode(b'', final=True)
+                    return True
+                decoder.decode(block)
+    except UnicodeDecodeError:
+        return False
+
+
+def confirm_csv_encoding(file_path: str, encoding: str,
+                         sample_size: int = FileConstants.CSV_ENCODING_SAMPLE_SIZE) -> str:
+    """
+    Check an encoding detected from the sample against the whole file
+
+    Used before a file is streamed into staging, where a decode error after the
+    first chunks would fail the upload half way. Files no larger than the sample
+    were already fully decoded by detect_csv_encoding.
+
+    Args:
+        file_path: CSV file path
+        encoding: Encoding from detect_csv_encoding
+        sample_size: Bytes detect_csv_encoding sampled
+
+    Returns:
+        str: encoding, or the first fallback that decodes the whole file (latin1 last)
+    """
+    if encoding == 'latin1' or os.path.getsize(file_path) <= sample_size:
+        return encoding
+    for candidate in [encoding] + csv_encoding_fallbacks(encoding):
+        if candidate == 'latin1' or _decodes_fully(file_path, candidate, sample_size):
+            return candidate
+    return 'latin1'
+
+
+def count_csv_rows(file_path: str, exact_limit: int = FileConstants.CSV_EXACT_COUNT_LIMIT) -> Tuple[int, bool]:
+    """
+    Count data rows (excluding the header) of a CSV file
+
+    Files up to exact_limit bytes are counted with a memory-mapped newline scan;
+    larger files are estimated from the average line length of the first block,
+    so a multi-GB file is not read just to show a row count.
+    Newlines inside quoted values are counted as rows.
+
+    Args:
+        file_path: CSV file path
+        exact_limit: Largest file size in bytes that is counted exactly
+
+    Returns:
+        Tuple[int, bool]: (row count, True when the count is an estimate)
+    """
+    file_size = os.path.getsize(file_path)
+    if file_size == 0:
+        return 0, False
+
+    block_size = FileConstants.CSV_COUNT_BLOCK_SIZE
+    with open(file_path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if file_size > exact_limit:
+                sample = mm[:block_size]
+                sample_lines = sample.count(b'\n')
+                if sample_lines:
+                    estimated_lines = int(file_size * sample_lines / len(sample))
+                    return max(estimated_lines - 1, 0), True
+
+            lines = 0
+            for offset in range(0, file_size, block_size):
+                lines += mm[offset:offset + block_size].count(b'\n')
+            # บรรทัดสุดท้ายที่ไม่มี newline ปิดท้ายก็นับเป็นแถว
+            if mm[file_size - 1:file_size] != b'\n':
+                lines += 1
+
+    return max(lines - 1, 0), False
+
+
+def is_pyarrow_available() -> bool:
+    """Check whether pyarrow is installed"""
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def read_csv_header(file_path: str, encoding: str) -> List[str]:
+    """
+    Read the header row of a CSV file, de-duplicated the way pandas does ('A', 'A.1', ...)
+
+    Args:
+        file_path: CSV file path
+        encoding: File encoding
+
+    Returns:
+        List[str]: Column names (empty list for an empty file)
+    """
+    # utf-8-sig ตัด BOM ออกจากชื่อคอลัมน์แรก
+    if encoding.lower().replace('_', '-') in ('utf-8', 'utf8'):
+        encoding = 'utf-8-sig'
+    with open(file_path, 'r', encoding=encoding, newline='') as f:
+        header = next(csv.reader(f), [])
+
+    names = []
+    seen = {}
+    for name in header:
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def iter_arrow_csv_batches(file_path: str, encoding: str = 'utf-8',
+                           block_size: int = FileConstants.ARROW_CSV_BLOCK_SIZE) -> Iterator:
+    """
+    Stream a CSV file as pyarrow RecordBatches with an all-string schema
+
+    Blocks are parsed on pyarrow's thread pool; values pyarrow treats as null
+    ('', 'NULL', 'N/A', 'NaN', ...) become nulls, like pandas' default NA values.
+    Quoted values may contain line breaks. The header row is parsed by pyarrow as
+    the first data row and dropped, so a header spanning several physical lines is
+    skipped correctly; the columns get the de-duplicated names of read_csv_header.
+    Invalid UTF-8 data is raised as UnicodeDecodeError.
+
+    Args:
+        file_path: CSV file path
+        encoding: File encoding
+        block_size: Bytes parsed per block (roughly the size of one batch)
+
+    Yields:
+        pyarrow.RecordBatch: Batches of string columns
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    column_names = read_csv_header(file_path, encoding)
+    if not column_names:
+        return
+
+    # ชื่อชั่วคราว f0, f1, ... ให้ pyarrow แยก header ตามกฎ quote เดียวกับข้อมูล แล้วเปลี่ยนชื่อภายหลัง
+    generated_names = [f"f{i}" for i in range(len(column_names))]
+    read_options = pa_csv.ReadOptions(
+        use_threads=True,
+        block_size=block_size,
+        encoding=encoding,
+        column_names=generated_names,
+    )
+    parse_options = pa_csv.ParseOptions(newlines_in_values=True)
+    convert_options = pa_csv.ConvertOptions(
+        column_types={name: pa.string() for name in generated_names},
+        strings_can_be_null=True,
+    )
+
+    try:
+        reader = pa_csv.open_csv(file_path, read_options=read_options, parse_options=parse_options,
+                                 convert_options=convert_options)
+        try:
+            header_skipped = False
+            for batch in reader:
+                if not header_skipped and batch.num_rows:
+                    batch = batch.slice(1)
+                    header_skipped = True
+                if batch.num_rows:
+                    yield pa.RecordBatch.from_arrays(batch.columns, names=column_names)
+        finally:
+            reader.close()
+    except pa.ArrowInvalid as e:
+        # ข้อมูลไม่ใช่ UTF-8 ให้ผู้เรียกลอง encoding ถัดไปได้เหมือน pandas
+        if 'utf8' in str(e).lower().replace('-', ''):
+            raise UnicodeDecodeError(encoding, b'', 0, 1, str(e)) from e
+        raise
+
+
+def arrow_batch_to_frame(batch) -> pd.DataFrame:
+    """
+    Wrap a RecordBatch in a DataFrame of Arrow-backed string columns
+
+    The values stay in Arrow memory (no Python str objects per cell are created)
+
+    Args:
+        batch: pyarrow RecordBatch
+
+    Returns:
+        pd.DataFrame: Frame with string[pyarrow] (ArrowDtype) columns
+    """
+    return batch.to_pandas(types_mapper=pd.ArrowDtype)
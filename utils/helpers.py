@@ -4,11 +4,16 @@ Helper functions for PIPELINE_SQLSERVER
 Utility functions used across multiple parts of the application
 """
 
+import hashlib
 import os
 import re
+import posixpath
+import zipfile
+import xml.etree.ElementTree as ET
+import numpy as np
 import pandas as pd
-from datetime import datetime
-from typing import Optional, Union, Any
+from datetime import date, datetime, time
+from typing import Any, List, Optional, Sequence, Union
 from dateutil import parser
 
 from constants import FileConstants, RegexPatterns, ErrorMessages
@@ -145,6 +150,143 @@ def clean_numeric_value(value: Any) -> Optional[float]:
         return None
 
 
+def to_staging_text(value: Any) -> Optional[str]:
+    """
+    Convert a cell value to the text stored in NVARCHAR(MAX) staging columns
+    
+    Text is chosen so the typed conversion after staging accepts it: whole floats
+    without '.0', other floats in positional notation (TRY_CONVERT to DECIMAL
+    rejects '1e-05'), booleans as '1'/'0', timestamps in ISO format, and
+    missing values (None, NaN, NaT, pd.NA) as NULL
+    
+    Args:
+        value: Cell value from a DataFrame
+        
+    Returns:
+        Optional[str]: Staging text or None for missing values
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return value
+    if isinstance(value, bool) or getattr(getattr(value, 'dtype', None), 'kind', None) == 'b':
+        return '1' if value else '0'
+    if isinstance(value, (float, np.floating)):
+        if value != value:
+            return None
+        if float(value).is_integer():
+            return str(int(value))
+        return np.format_float_positional(value, trim='-')
+    try:
+        if pd.isna(value):
+            return None
+    except (TypeError, ValueError):
+        pass
+    if isinstance(value, datetime):
+        return value.isoformat(sep=' ')
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    return str(value)
+
+
+def frame_to_staging_rows(df: pd.DataFrame, columns: Optional[Sequence[str]] = None) -> List[tuple]:
+    """
+    Convert DataFrame rows to tuples of staging text for executemany
+    
+    Args:
+        df: DataFrame chunk to convert
+        columns: Columns to include in order (default: all columns)
+        
+    Returns:
+        List[tuple]: One tuple of Optional[str] per row
+    """
+    columns = list(df.columns) if columns is None else list(columns)
+    converted = []
+    for col in columns:
+        series = df[col]
+        if series.dtype.kind in 'iu' and isinstance(series.dtype, np.dtype):
+            # จำนวนเต็ม numpy ไม่มีค่าว่าง แปลงแบบ vectorized ได้เลย (Int64 แบบ nullable มี <NA> ต้องแปลงทีละค่า)
+            converted.append(series.astype(str).tolist())
+        elif series.dtype != object and pd.api.types.is_string_dtype(series.dtype):
+            # string dtype (เช่น string[pyarrow] จาก Arrow CSV reader) มีแต่ str หรือ NA ไม่ต้องแปลงทีละค่า
+            converted.append(series.astype(object).where(series.notna(), None).tolist())
+        else:
+            converted.append([to_staging_text(v) for v in series.tolist()])
+    return list(zip(*converted))
+
+
+def compute_file_hash(file_path: str, block_size: int = FileConstants.HASH_BLOCK_SIZE) -> str:
+    """
+    Hash the content of a file (BLAKE2b, 128-bit digest)
+    
+    Args:
+        file_path: File path
+        block_size: Bytes read per block
+        
+    Returns:
+        str: Hex digest of the file content
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _first_xlsx_sheet_path(archive: zipfile.ZipFile) -> Optional[str]:
+    """Archive path of the first worksheet listed in xl/workbook.xml, None when it can't be resolved"""
+    workbook = ET.fromstring(archive.read('xl/workbook.xml'))
+    # ชื่อ tag/attribute มี namespace ต่างกันตามโปรแกรมที่เขียนไฟล์ จึงเทียบเฉพาะ local name
+    first_sheet = next((el for el in workbook.iter() if el.tag.rsplit('}', 1)[-1] == 'sheet'), None)
+    if first_sheet is None:
+        return None
+    rel_id = next((value for key, value in first_sheet.attrib.items() if key.rsplit('}', 1)[-1] == 'id'), None)
+    if rel_id is None:
+        return None
+
+    rels = ET.fromstring(archive.read('xl/_rels/workbook.xml.rels'))
+    target = next(
+        (el.get('Target') for el in rels.iter()
+         if el.tag.rsplit('}', 1)[-1] == 'Relationship' and el.get('Id') == rel_id),
+        None,
+    )
+    if not target:
+        return None
+    # Target สัมพัทธ์กับโฟลเดอร์ xl/ หรือเป็น path เต็มเมื่อขึ้นต้นด้วย /
+    sheet_path = target.lstrip('/') if target.startswith('/') else posixpath.normpath(posixpath.join('xl', target))
+    return sheet_path if sheet_path in archive.namelist() else None
+
+
+def estimate_xlsx_rows(file_path: str) -> Optional[int]:
+    """
+    Data rows of the first worksheet of an .xlsx file from its <dimension> element
+    
+    The first sheet is resolved from xl/workbook.xml and its relationships (the sheet
+    pandas reads by default). Only the start of the sheet XML is read, so the estimate
+    costs no parsing; the dimension includes the header row and is not always written.
+    
+    Args:
+        file_path: .xlsx file path
+        
+    Returns:
+        Optional[int]: Data rows (header excluded), None when unknown
+    """
+    try:
+        with zipfile.ZipFile(file_path) as archive:
+            sheet_path = _first_xlsx_sheet_path(archive)
+            if sheet_path is None:
+                return None
+            with archive.open(sheet_path) as sheet:
+                head = sheet.read(FileConstants.XLSX_DIMENSION_PEEK_BYTES).decode('utf-8', errors='ignore')
+    except (OSError, KeyError, zipfile.BadZipFile, ET.ParseError):
+        return None
+    match = re.search(r'<dimension\s+ref="[A-Z]+(\d+)(?::[A-Z]+(\d+))?"', head)
+    if not match:
+        return None
+    last_row = int(match.group(2) or match.group(1))
+    return max(last_row - int(match.group(1)), 0)
+
+
 def format_error_message(error: Exception, context: str = "") -> str:
     """
     Format error message
@@ -2,6 +2,20 @@
 SQL utility functions for consistent data cleaning across the application
 """
 
+from typing import Dict, Optional
+
+from sqlalchemy.types import (
+    Integer as SA_Integer,
+    SmallInteger as SA_SmallInteger,
+    Float as SA_Float,
+    DECIMAL as SA_DECIMAL,
+    DATE as SA_DATE,
+    DateTime as SA_DateTime,
+    NVARCHAR as SA_NVARCHAR,
+    Text as SA_Text,
+    Boolean as SA_Boolean,
+)
+
 
 def get_numeric_cleaning_expression(col_name: str) -> str:
     """
@@ -66,4 +80,130 @@ def get_cleaning_expression(col_name: str, cleaning_type: str = 'basic') -> str:
     elif cleaning_type == 'date':
         return get_date_cleaning_expression(col_name)
     else:
-        raise ValueError(f"Unknown cleaning_type: {cleaning_type}")
\ No newline at end of file
+        raise ValueError(f"Unknown cleaning_type: {cleaning_type}")
+
+def get_transfer_date_cleaning_expression(col_name: str) -> str:
+    """
+    Generate SQL expression for cleaning date data before conversion in the transfer step
+    
+    Args:
+        col_name: Column name to clean
+        
+    Returns:
+        str: SQL expression with tab/newline characters removed and blanks as NULL
+    """
+    safe_col = f"[{col_name}]"
+    return f"NULLIF(LTRIM(RTRIM(REPLACE(REPLACE(REPLACE({safe_col}, CHAR(9), ''), CHAR(10), ''), CHAR(13), ''))), '')"
+
+
+def get_conversion_expression(col_name: str, sa_type_obj, date_format: str = 'UK') -> str:
+    """
+    Generate SQL expression converting an NVARCHAR staging column to its target type
+    
+    Args:
+        col_name: Staging column name
+        sa_type_obj: SQLAlchemy type from dtype settings
+        date_format: Date format preference ('UK' for DD-MM or 'US' for MM-DD)
+        
+    Returns:
+        str: SQL expression (NULL when the value cannot be converted)
+    """
+    col_ref = f"[{col_name}]"
+    
+    if isinstance(sa_type_obj, (SA_Integer, SA_SmallInteger)):
+        return f"TRY_CONVERT(INT, {get_numeric_cleaning_expression(col_name)})"
+    if isinstance(sa_type_obj, SA_Float):
+        return f"TRY_CONVERT(FLOAT, {get_numeric_cleaning_expression(col_name)})"
+    if isinstance(sa_type_obj, SA_DECIMAL):
+        precision = getattr(sa_type_obj, 'precision', 18) or 18
+        scale = getattr(sa_type_obj, 'scale', 2) or 2
+        return f"TRY_CONVERT(DECIMAL({precision},{scale}), {get_numeric_cleaning_expression(col_name)})"
+    if isinstance(sa_type_obj, (SA_DATE, SA_DateTime)):
+        date_cleaned = get_transfer_date_cleaning_expression(col_name)
+        if date_format == 'UK':  # DD-MM format priority
+            return f"COALESCE(TRY_CONVERT(DATETIME, {date_cleaned}, 103), TRY_CONVERT(DATETIME, {date_cleaned}, 121), TRY_CONVERT(DATETIME, {date_cleaned}, 101))"
+        # US format - MM-DD priority
+        return f"COALESCE(TRY_CONVERT(DATETIME, {date_cleaned}, 101), TRY_CONVERT(DATETIME, {date_cleaned}, 121), TRY_CONVERT(DATETIME, {date_cleaned}, 103))"
+    if isinstance(sa_type_obj, SA_Boolean):
+        return (
+            "CASE "
+            f"WHEN UPPER(LTRIM(RTRIM({col_ref}))) IN ('1','TRUE','Y','YES') THEN 1 "
+            f"WHEN UPPER(LTRIM(RTRIM({col_ref}))) IN ('0','FALSE','N','NO') THEN 0 "
+            "ELSE NULL END"
+        )
+    target = 'NVARCHAR(MAX)' if isinstance(sa_type_obj, SA_Text) else str(sa_type_obj).upper()
+    return f"TRY_CONVERT({target}, {col_ref})"
+
+
+def get_conversion_check(col_name: str, sa_type_obj) -> Optional[Dict[str, str]]:
+    """
+    Describe how a failed conversion of a staging column is detected
+    
+    The error condition contains a {converted} placeholder for the result of
+    get_conversion_expression(), so the check can reuse an already converted value.
+    
+    Args:
+        col_name: Staging column name
+        sa_type_obj: SQLAlchemy type from dtype settings
+        
+    Returns:
+        Optional[Dict[str, str]]: {'validation_type', 'error_condition', 'example_expression'}
+        or None when the type needs no check (e.g. NVARCHAR(MAX))
+    """
+    col_ref = f"[{col_name}]"
+    
+    if isinstance(sa_type_obj, (SA_Integer, SA_SmallInteger, SA_Float, SA_DECIMAL)):
+        validation_type = 'numeric_validation'
+        has_value = f"NULLIF({get_numeric_cleaning_expression(col_name)}, '') IS NOT NULL"
+    elif isinstance(sa_type_obj, (SA_DATE, SA_DateTime)):
+        validation_type = 'date_validation'
+        has_value = f"{get_transfer_date_cleaning_expression(col_name)} IS NOT NULL"
+    elif isinstance(sa_type_obj, SA_Boolean):
+        validation_type = 'boolean_validation'
+        has_value = f"NULLIF(LTRIM(RTRIM({col_ref})), '') IS NOT NULL"
+    elif isinstance(sa_type_obj, SA_NVARCHAR) and not isinstance(sa_type_obj, SA_Text) and getattr(sa_type_obj, 'length', None):
+        # ความยาวเกินไม่ทำให้ TRY_CONVERT คืน NULL จึงตรวจจากความยาวโดยตรง
+        return {
+            'validation_type': 'string_length_validation',
+            'error_condition': f"LEN(ISNULL({col_ref}, '')) > {sa_type_obj.length}",
+            'example_expression': f"LEFT({col_ref}, 30) + '...'",
+        }
+    else:
+        return None
+    
+    return {
+        'validation_type': validation_type,
+        'error_condition': f"{{converted}} IS NULL AND {has_value}",
+        'example_expression': col_ref,
+    }
+
+
+def get_row_hash_expression(columns: Dict) -> str:
+    """
+    Generate a SHA2_256 HASHBYTES expression over already converted columns
+    
+    Each value is rendered to text deterministically (ISO dates, full float precision)
+    and joined with a unit separator; NULL is encoded as NCHAR(0) so it differs from ''.
+    With no columns (every column is a key column) the hash is a constant, so matched
+    rows never count as changed.
+    
+    Args:
+        columns: Column names and SQLAlchemy types, in hashing order
+        
+    Returns:
+        str: VARBINARY(32) SQL expression
+    """
+    if not columns:
+        return "HASHBYTES('SHA2_256', N'')"
+    parts = []
+    for col_name, sa_type_obj in columns.items():
+        col_ref = f"[{col_name}]"
+        if isinstance(sa_type_obj, (SA_DATE, SA_DateTime)):
+            as_text = f"CONVERT(NVARCHAR(30), {col_ref}, 126)"
+        elif isinstance(sa_type_obj, SA_Float):
+            as_text = f"CONVERT(NVARCHAR(30), {col_ref}, 2)"
+        else:
+            as_text = f"CAST({col_ref} AS NVARCHAR(MAX))"
+        parts.append(f"ISNULL({as_text}, NCHAR(0))")
+    # CONCAT ต้องมีอย่างน้อย 2 อาร์กิวเมนต์
+    return f"HASHBYTES('SHA2_256', CONCAT({', NCHAR(31), '.join(parts)}, N''))"